@@ -0,0 +1,189 @@
+from functools import lru_cache
+import re
+
+try:
+    from blessed.colorspace import X11_COLORNAMES_TO_RGB, RGB_256TABLE
+except ImportError:  # blessed < 1.17 has no X11 color names
+    X11_COLORNAMES_TO_RGB, RGB_256TABLE = {}, []
+
+'''
+Converts text containing raw ANSI escape sequences, like the output of
+`ls --color=always`, `git log --color` or `top`, into the text of a block, with
+SGR sequences (colors and attributes) turned into blessed tags like
+{t.bold_red_on_blue}, and every other escape sequence dropped, so the text
+measures as wide as it looks.
+
+The AnsiParser is streaming: it keeps the style across calls to feed(), and
+holds back a sequence cut off at the end of the text it's fed until the rest of
+it arrives. Each tag it writes is the complete style of the text that follows
+it, preceded by {t.normal} when an attribute or color is turned off, so a row
+can start with the parser's `tag` and show correctly on its own.
+'''
+
+# CSI and OSC sequences, character set and other escapes, and a sequence cut off at the end
+_ESCAPE = re.compile(r'\x1b(?:\[([0-?]*)[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[ -/]+[0-~]'
+                     r'|[@-Z\\^_]|$)|\x1b\[[0-?]*[ -/]*$|\x1b\][^\x07\x1b]*$|\x1b[ -/]+$')
+
+_COLORS = ('black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white')
+_ATTRS = {1: 'bold', 2: 'dim', 3: 'italic', 4: 'underline', 5: 'blink', 7: 'reverse',
+          9: 'strikethrough', 53: 'overline'}
+_ATTRS_OFF = {22: ('bold', 'dim'), 23: ('italic',), 24: ('underline',), 25: ('blink',),
+              27: ('reverse',), 29: ('strikethrough',), 55: ('overline',)}
+_ORDER = ('bold', 'dim', 'italic', 'underline', 'blink', 'reverse', 'strikethrough', 'overline')
+
+# xterm's defaults, for the first 16 of the 256 colors when blessed has no table
+_BASIC_RGB = ((0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0), (0, 0, 238), (205, 0, 205),
+              (0, 205, 205), (229, 229, 229), (127, 127, 127), (255, 0, 0), (0, 255, 0),
+              (255, 255, 0), (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255))
+
+def _basic(n):
+    # The name of one of the first 16 colors
+    return _COLORS[n] if n < 8 else 'bright_' + _COLORS[n - 8]
+
+@lru_cache(maxsize=4096)
+def color_name(rgb):
+    '''The name blessed knows of the color closest to an (r, g, b) tuple.'''
+    def distance(item):
+        return sum((a - b) ** 2 for a, b in zip(item[1], rgb))
+    if X11_COLORNAMES_TO_RGB:
+        return min(X11_COLORNAMES_TO_RGB.items(), key=distance)[0]
+    return _basic(min(enumerate(_BASIC_RGB), key=distance)[0])
+
+def color256_name(n):
+    '''The name blessed knows of color n of the 256 xterm colors.'''
+    if n < 16:
+        return _basic(n)
+    rgb = tuple(RGB_256TABLE[n]) if RGB_256TABLE else _rgb256(n)
+    return color_name(rgb)
+
+def _rgb256(n):
+    if n >= 232:  # grays
+        level = 8 + (n - 232) * 10
+        return level, level, level
+    n -= 16
+    return tuple(0 if c == 0 else 55 + c * 40 for c in (n // 36, n // 6 % 6, n % 6))
+
+
+class AnsiParser(object):
+    '''Converts text with ANSI escape sequences into block text with tags, a piece
+    at a time. Not thread-safe.
+    '''
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._fg = self._bg = None
+        self._attrs = frozenset()
+        self._pending = ''
+
+    @property
+    def tag(self):
+        '''The tag for the current style, or '' if it's normal.'''
+        return _tag(self._fg, self._bg, self._attrs)
+
+    def feed(self, text):
+        '''Returns the text converted so far, holding back any incomplete sequence.'''
+        if self._pending:
+            text = self._pending + text
+            self._pending = ''
+        if '\x1b' not in text:
+            return text
+        out = []
+        prev_end = 0
+        for match in _ESCAPE.finditer(text):
+            start = match.start()
+            out.append(text[prev_end:start])
+            prev_end = match.end()
+            seq = match.group(0)
+            if prev_end == len(text) and not _complete(seq):
+                self._pending = seq
+                break
+            if seq.endswith('m') and match.group(1) is not None:
+                out.append(self._sgr(match.group(1)))
+        else:
+            out.append(text[prev_end:])
+        return ''.join(out)
+
+    def _sgr(self, params):
+        # Returns the tag for the change of style, if any
+        fg, bg, attrs = self._fg, self._bg, set(self._attrs)
+        codes = [int(p) if p.isdigit() else 0 for p in params.replace(':', ';').split(';')]
+        i = 0
+        while i < len(codes):
+            code = codes[i]
+            if code == 0:
+                fg = bg = None
+                attrs.clear()
+            elif code in _ATTRS:
+                attrs.add(_ATTRS[code])
+            elif code in _ATTRS_OFF:
+                attrs.difference_update(_ATTRS_OFF[code])
+            elif 30 <= code <= 37:
+                fg = _COLORS[code - 30]
+            elif 90 <= code <= 97:
+                fg = 'bright_' + _COLORS[code - 90]
+            elif 40 <= code <= 47:
+                bg = _COLORS[code - 40]
+            elif 100 <= code <= 107:
+                bg = 'bright_' + _COLORS[code - 100]
+            elif code == 39:
+                fg = None
+            elif code == 49:
+                bg = None
+            elif code in (38, 48) and i + 1 < len(codes):
+                name = None
+                if codes[i + 1] == 5 and i + 2 < len(codes):
+                    name = color256_name(min(255, codes[i + 2]))
+                    i += 2
+                elif codes[i + 1] == 2 and i + 4 < len(codes):
+                    name = color_name(tuple(min(255, c) for c in codes[i + 2:i + 5]))
+                    i += 4
+                if name:
+                    if code == 38:
+                        fg = name
+                    else:
+                        bg = name
+            i += 1
+        attrs = frozenset(attrs)
+        if (fg, bg, attrs) == (self._fg, self._bg, self._attrs):
+            return ''
+        removed = ((self._fg and not fg) or (self._bg and not bg) or not attrs >= self._attrs)
+        self._fg, self._bg, self._attrs = fg, bg, attrs
+        tag = _tag(fg, bg, attrs)
+        return '{t.normal}' + tag if removed or not tag else tag
+
+
+def _complete(seq):
+    # Whether a sequence found at the end of the text is all there
+    if seq == '\x1b':
+        return False
+    if seq.startswith('\x1b['):
+        return seq[-1:] >= '@' and seq[-1:] <= '~' and len(seq) > 2
+    if seq.startswith('\x1b]'):
+        return seq.endswith('\x07') or seq.endswith('\x1b\\')
+    return not ' ' <= seq[-1] <= '/'
+
+@lru_cache(maxsize=1024)
+def _tag(fg, bg, attrs):
+    parts = [a for a in _ORDER if a in attrs]
+    if fg:
+        parts.append(fg)
+    if bg:
+        parts.append('on_' + bg)
+    return '{t.' + '_'.join(parts) + '}' if parts else ''
+
+def ansi_to_tags(text):
+    '''Convert text with ANSI escape sequences into block text with tags.'''
+    return AnsiParser().feed(text)
+
+def strip_ansi(text):
+    '''Remove all ANSI escape sequences from text.'''
+    return _ESCAPE.sub('', text)
+
+def clean_row(row, parser=None):
+    '''Returns a row of output as text for a block: with its colors as tags if
+    there's a parser, starting with the parser's current style, and without any
+    other escape sequences, carriage returns or tabs.
+    '''
+    row = parser.tag + parser.feed(row) if parser else strip_ansi(row)
+    return row.replace('\r', '').replace('\t', '    ')
@@ -0,0 +1,289 @@
+from blessed import Terminal
+from contextlib import contextmanager
+from . import mouse
+from time import monotonic
+import abc
+import os
+
+try:
+    from blessed.colorspace import X11_COLORNAMES_TO_RGB, RGB_256TABLE
+except ImportError:  # blessed < 1.17 has no X11 color names
+    X11_COLORNAMES_TO_RGB, RGB_256TABLE = {}, []
+
+'''
+A Backend is where a Runner's frames go. The Runner renders each frame with an
+Encoder, which looks up the sequences it needs (styles, cursor moves, erases) on
+the backend's `sequences` object, and then hands the text of the frame to the
+backend's write() method.
+
+  * BlessedBackend writes to a blessed Terminal, using the sequences of its
+    terminfo entry. This is the default.
+  * AnsiBackend writes straight to a file descriptor, using a fixed table of
+    ANSI (ECMA-48 and xterm) sequences, without going through blessed at all.
+  * NullBackend throws the frames away, and RecordingBackend keeps them. Both
+    use the ANSI sequences, so they measure the cost of rendering without I/O.
+  * BroadcastBackend, in broadcast.py, serves the frames to viewers on a socket.
+'''
+
+class Backend(object, metaclass=abc.ABCMeta):
+    '''The interface between a Runner and the output it draws on.'''
+
+    # An object with the sequence attributes of a blessed Terminal used by the Encoder
+    sequences = None
+
+    @property
+    @abc.abstractmethod
+    def width(self): pass
+
+    @property
+    @abc.abstractmethod
+    def height(self): pass
+
+    @abc.abstractmethod
+    def write(self, frame):
+        '''Write the text of a frame, and return the number of bytes written.'''
+        raise NotImplementedError('Subclasses must define write() in order to use this base class.')
+
+    def wants_keyframe(self):
+        '''Whether the next frame should repaint the whole screen, rather than
+        just what's changed. Asked by the Runner before each frame.
+        '''
+        return False
+
+    def close(self):
+        '''Release whatever the backend holds. Called when the Runner stops.'''
+        pass
+
+    @contextmanager
+    def fullscreen(self):
+        yield
+
+    @contextmanager
+    def hidden_cursor(self):
+        yield
+
+    @contextmanager
+    def mouse(self):
+        '''Have the terminal report clicks and the mouse wheel as input.'''
+        yield
+
+
+class AnsiSequences(object):
+    '''The sequences the Encoder needs, as ANSI escape sequences for an xterm-like
+    terminal with 256 colors. Style names are resolved like blessed does (red,
+    on_bright_blue, bold, color208, X11 names like darkorange) and cached.
+    '''
+    CSI = '\x1b['
+    _COLORS = ('black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white')
+    _ATTRS = {'bold': 1, 'dim': 2, 'italic': 3, 'underline': 4, 'blink': 5,
+              'reverse': 7, 'standout': 7, 'strikethrough': 9, 'overline': 53}
+
+    normal = CSI + 'm'
+    clear = CSI + 'H' + CSI + '2J'
+    clear_eol = CSI + 'K'
+    enter_fullscreen = CSI + '?1049h'
+    exit_fullscreen = CSI + '?1049l'
+    hide_cursor = CSI + '?25l'
+    normal_cursor = CSI + '?25h'
+
+    def __init__(self):
+        self._styles = {}
+
+    def move(self, y, x):
+        if x == 0:  # the column defaults to the first
+            return '{0}{1}H'.format(self.CSI, y + 1 if y else '')
+        return '{0}{1};{2}H'.format(self.CSI, y + 1, x + 1)
+
+    def move_x(self, x):
+        return '{0}{1}G'.format(self.CSI, x + 1)
+
+    def ech(self, n):
+        return '{0}{1}X'.format(self.CSI, n)
+
+    def cuf(self, n):
+        return '{0}{1}C'.format(self.CSI, n)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        seq = self._styles.get(name)
+        if seq is None:
+            codes = []
+            for part in self._parts(name):
+                codes.extend(self._codes(part))
+            seq = self._styles[name] = (self.CSI + ';'.join(codes) + 'm') if codes else ''
+        return seq
+
+    def _parts(self, name):
+        # Split compound names like bold_red_on_white into bold, red and on_white
+        parts, words = [], name.split('_')
+        while words:
+            word = words.pop(0)
+            if word in ('on', 'bright') and words:
+                word += '_' + words.pop(0)
+                if word == 'on_bright' and words:
+                    word += '_' + words.pop(0)
+            parts.append(word)
+        return parts
+
+    def _codes(self, part):
+        bg = part.startswith('on_')
+        color = part[3:] if bg else part
+        if part in self._ATTRS:
+            return [str(self._ATTRS[part])]
+        if color in self._COLORS:
+            return [str((40 if bg else 30) + self._COLORS.index(color))]
+        if color.startswith('bright_') and color[7:] in self._COLORS:
+            return [str((100 if bg else 90) + self._COLORS.index(color[7:]))]
+        if color.startswith('color') and color[5:].isdigit():
+            return ['48' if bg else '38', '5', color[5:]]
+        if color in X11_COLORNAMES_TO_RGB and RGB_256TABLE:
+            return ['48' if bg else '38', '5', str(_nearest_256(X11_COLORNAMES_TO_RGB[color]))]
+        return []
+
+
+def _nearest_256(rgb):
+    # The closest of the 6x6x6 cube and grays (16-255), leaving out the 16 colors
+    # whose actual values depend on the user's theme
+    def distance(i):
+        return sum((a - b) ** 2 for a, b in zip(RGB_256TABLE[i], rgb))
+    return min(range(16, len(RGB_256TABLE)), key=distance)
+
+
+class BlessedBackend(Backend):
+    '''Writes frames to a blessed Terminal's stream, using its terminfo sequences.'''
+    def __init__(self, term=None):
+        self.term = term if term else Terminal()
+        self.sequences = self.term
+
+    @property
+    def width(self): return self.term.width
+
+    @property
+    def height(self): return self.term.height
+
+    def write(self, frame):
+        stream = self.term.stream
+        data = frame.encode('utf-8')
+        buffer = getattr(stream, 'buffer', None)
+        if buffer:
+            stream.flush()
+            buffer.write(data)
+            buffer.flush()
+        else:
+            stream.write(frame)
+            stream.flush()
+        return len(data)
+
+    def fullscreen(self):
+        return self.term.fullscreen()
+
+    def hidden_cursor(self):
+        return self.term.hidden_cursor()
+
+    @contextmanager
+    def mouse(self):
+        self.write(mouse.ENABLE)
+        try:
+            yield
+        finally:
+            self.write(mouse.DISABLE)
+
+
+class AnsiBackend(Backend):
+    '''Writes frames as ANSI escape sequences straight to a file descriptor.
+
+    Args:
+        fd (int): the file descriptor to write to, stdout by default
+        size (tuple): a fixed (width, height), instead of the size of the fd's terminal
+    '''
+    def __init__(self, fd=1, size=None):
+        self.fd = fd
+        self.size = size
+        self.sequences = AnsiSequences()
+
+    @property
+    def width(self): return self._size()[0]
+
+    @property
+    def height(self): return self._size()[1]
+
+    def _size(self):
+        if self.size:
+            return self.size
+        try:
+            return tuple(os.get_terminal_size(self.fd))
+        except OSError:
+            return 80, 24
+
+    def write(self, frame):
+        data = frame.encode('utf-8')
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+        return len(data)
+
+    @contextmanager
+    def fullscreen(self):
+        self.write(self.sequences.enter_fullscreen)
+        try:
+            yield
+        finally:
+            self.write(self.sequences.exit_fullscreen)
+
+    @contextmanager
+    def hidden_cursor(self):
+        self.write(self.sequences.hide_cursor)
+        try:
+            yield
+        finally:
+            self.write(self.sequences.normal_cursor)
+
+    @contextmanager
+    def mouse(self):
+        self.write(mouse.ENABLE)
+        try:
+            yield
+        finally:
+            self.write(mouse.DISABLE)
+
+
+class NullBackend(Backend):
+    '''Throws frames away, keeping only counts of frames and bytes.
+
+    Args:
+        width (int), height (int): the size of the pretend screen
+    '''
+    def __init__(self, width=80, height=24):
+        self._width, self._height = width, height
+        self.sequences = AnsiSequences()
+        self.frames = 0
+        self.bytes = 0
+
+    @property
+    def width(self): return self._width
+
+    @property
+    def height(self): return self._height
+
+    def resize(self, width, height):
+        self._width, self._height = width, height
+
+    def write(self, frame):
+        num_bytes = len(frame.encode('utf-8'))
+        self.frames += 1
+        self.bytes += num_bytes
+        return num_bytes
+
+
+class RecordingBackend(NullBackend):
+    '''Keeps every frame written, as (time, text) tuples in `recorded`, for tests
+    and benchmarks.
+    '''
+    def __init__(self, width=80, height=24):
+        super().__init__(width, height)
+        self.recorded = []
+
+    def write(self, frame):
+        self.recorded.append((monotonic(), frame))
+        return super().write(frame)
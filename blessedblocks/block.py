@@ -1,5 +1,6 @@
 from .line import Line
-from threading import RLock
+from .width import width as text_width
+from threading import RLock, Condition
 from collections import namedtuple
 import re
 import abc
@@ -96,10 +97,21 @@ class Grid(object):
     def __repr__(self):
         return str(self._layout)
 
+def _notify(block):
+    # Mark the block, and every block containing it up to the root, as changed,
+    # and wake up the Runner to draw the next frame.
+    b, q = block, None
+    while b is not None:
+        b._dirty = True
+        q = q or getattr(b, 'dirty_event_q', None)
+        b = getattr(b, 'parent', None)
+    if q and q.empty():
+        q.put('')
+
 '''
 These two wrappers add convenience for keeping the Block thread-safe.
-The safe_set function notifies the Grid that the block is contain in
-that the block has changed.
+The safe_set function notifies the Runner displaying the block, however deeply
+nested it is, that the block has changed.
 '''
 from functools import wraps
 def safe_set(method):
@@ -107,12 +119,7 @@ def safe_set(method):
     def _impl(self, *args, **kwargs):
         with self.write_lock:
             method(self, *args, **kwargs)
-        try:
-            if self.dirty_event_q:
-                if self.dirty_event_q.empty():
-                    self.dirty_event_q.put('')
-        except AttributeError:
-            pass
+        _notify(self)
     return _impl
 
 def safe_get(method):
@@ -126,6 +133,25 @@ def safe_get(method):
 class Block(object, metaclass=abc.ABCMeta):
     MIDDLE_DOT = u'\u00b7'
 
+    # The Runner displays a block again only when it has changed, through one of
+    # its properties or mark_dirty(), or when its size has changed. A volatile
+    # block, whose display can change without that, is displayed every frame.
+    volatile = False
+
+    # The most times a second the Runner displays the block again when it
+    # changes, None for as often as it's changed; the latest change is shown once
+    # it's due. And how much showing the block's changes right away matters: when
+    # a frame runs over the Runner's frame_budget, changed blocks with a priority
+    # of 0 or less wait for the next frame, while those with more are displayed.
+    max_refresh_rate = None
+    priority = 0
+
+    # Where the Runner displays the block when it has changed: None in the frame
+    # itself, 'thread' on a pool of threads, or 'process' on a pool of processes,
+    # through render_job(). Until the new rows are ready, the rows displayed before
+    # are shown, so a slow block never holds up a frame.
+    render_async = None
+
     def __init__(self,
                  name=None, # must be unique among blocks in a grid
                  text=None,
@@ -138,6 +164,14 @@ class Block(object, metaclass=abc.ABCMeta):
                  h_sizepref = None,
                  grid=None):
         self.write_lock = RLock()
+        # Set by the Runner: the block containing this one, and the slots leading
+        # to this block from the root of the Runner's grid
+        self.parent = None
+        self.path = ()
+        # Also set by the Runner: the size the block was given in the last frame
+        self._allocated = (0, 0)
+        self._allocated_cond = Condition()
+        self._allocate_callbacks = []
         self.name = name
         self.hjust = hjust
         self.vjust = vjust
@@ -162,6 +196,69 @@ class Block(object, metaclass=abc.ABCMeta):
     def display(self, width, height, x, y, term=None):
         raise NotImplementedError('Subclasses must define display() in order to use this base class.')
 
+    def render_job(self, width, height):
+        '''For render_async = 'process': returns (fn, args), a function and its
+        arguments, all picklable, such that fn(*args) returns the rows display()
+        would for the given size. It's called in the Runner's process, and fn in
+        a worker process, so args should hold a copy of what's displayed.
+        '''
+        raise NotImplementedError('Subclasses must define render_job() to be rendered in a process.')
+
+    def mark_dirty(self):
+        '''Have the Runner display the block again in the next frame.'''
+        _notify(self)
+
+    @property
+    def allocated(self):
+        '''The (width, height) the Runner gave the block in the last frame,
+        (0, 0) if it isn't shown.
+        '''
+        return self._allocated
+
+    @property
+    def visible(self):
+        '''Whether the block was given any room at all in the last frame.'''
+        width, height = self._allocated
+        return width > 0 and height > 0
+
+    def on_allocate(self, callback):
+        '''Have callback(block) called whenever the size allocated to the block
+        changes, including when it's hidden or shown. Callbacks are called on the
+        Runner's thread, after the frame is written, so they should be quick.
+        '''
+        self._allocate_callbacks.append(callback)
+
+    def wait_visible(self, timeout=None):
+        '''Wait until the block is visible, or timeout seconds have passed.
+        Returns whether it's visible.
+        '''
+        with self._allocated_cond:
+            return self._allocated_cond.wait_for(lambda: self.visible, timeout)
+
+    def _allocate(self, width, height):
+        # Called by the Runner with the block's size in a frame. Returns whether it changed.
+        with self._allocated_cond:
+            if (width, height) == self._allocated:
+                return False
+            self._allocated = (width, height)
+            self._allocated_cond.notify_all()
+            return True
+
+    def on_mouse(self, event):
+        '''Called by the Runner, when it reports the mouse, with a MouseEvent
+        on the block. Return True if the event was handled; if not, it's passed
+        on to the block containing this one.
+        '''
+        return False
+
+    def segments(self, width, height):
+        '''Returns the display text of the block as a list of (x, y, text) segments,
+        relative to its top left corner, for the Runner's Encoder. By default that's
+        one segment for each row returned by display() when it's not given a terminal.
+        '''
+        rows = self.display(width, height, 0, 0)
+        return [(0, j, row) for j, row in enumerate(rows)] if rows else []
+
     @property
     @safe_get
     def text(self): return self._text
@@ -174,23 +271,18 @@ class Block(object, metaclass=abc.ABCMeta):
             clean_rows = []
             for row in rows:
                 clean_rows.append(re.sub(r'{t\..*?}', '', row))
-            self.num_text_cols = max(map(len, clean_rows))
+            self.num_text_cols = max(map(text_width, clean_rows))
             self.num_text_rows = len(clean_rows)
 
             if self.block_just:
                 built_rows = []
                 for i, crow in enumerate(clean_rows):
-                    built_rows.append(rows[i] + (' ' * (self.num_text_cols - len(crow))))
+                    built_rows.append(rows[i] + (' ' * (self.num_text_cols - text_width(crow))))
                 self._text = '\n'.join(built_rows)
             else:
                 self._text = val
 
-            try:
-                if self.dirty_event_q:
-                    if self.dirty_event_q.empty():
-                        self.dirty_event_q.put('')
-            except AttributeError:
-                pass
+            _notify(self)
         else:
             self._text = ''
 
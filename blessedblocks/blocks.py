@@ -1,9 +1,11 @@
 from .line import Line
+from .width import width as text_width
 from .block import Block, SizePref, Grid, safe_get,safe_set
 from threading import Thread
 import re
 
 class InputBlock(Block):
+    priority = 10  # typing is never held up by busy blocks
     def __init__(self, name='input', grid=None, default_status=''):
         super().__init__(name,
                          text='> ',
@@ -16,30 +18,36 @@ class InputBlock(Block):
         self.default_status = default_status
         self.status = self.default_status
 
+    @property
+    @safe_get
+    def status(self): return self._status
+
+    @status.setter
+    @safe_set
+    def status(self, val): self._status = val
+
     def display(self, width, height, x, y, term=None):
         prompt = '> '
         with self.write_lock:
+            if self.status:
+                line = Line(prompt + '{t.red}' + self.status, width, '<').display
+            elif self.text:
+                line = Line(prompt + self.text, width, '<').display
+            else:
+                line = Line(prompt + '{t.red}' + self.default_status, width, '<').display
             if term:
                 with term.location(x=x, y=y):
-                    if self.status:
-                        line = Line(prompt + '{t.red}' + self.status, width, '<')
-                        print(line.display.format(t=term), end='')
-                    elif self.text:
-                        line = prompt + self.text
-                        print(line[:width] + (' ' * (width-len(line))), end='')
-                    else:
-                        line = Line(prompt + '{t.red}' + self.default_status, width, '<')
-                        print(line.display.format(t=term), end='')
+                    print(line.format(t=term), end='')
             else:
-                return [line]  # for testing purposes only
+                return [line]  # the rows the Runner encodes
 
 class VFillBlock(Block):
     def __init__(self, text, name=None):
         border_text, seqs, last_seq = Line.parse(text)
         super().__init__(name=name,
                          text=text,
-                         w_sizepref=SizePref(hard_min=len(border_text),
-                                             hard_max=len(border_text)),
+                         w_sizepref=SizePref(hard_min=text_width(border_text),
+                                             hard_max=text_width(border_text)),
                          h_sizepref=SizePref(hard_min=0,
                                              hard_max=float('-inf')))
 
@@ -65,7 +73,7 @@ class VFillBlock(Block):
     def text(self, val):
         border_text, seqs, last_seq = Line.parse(val)
         Block.text.fset(self, val)
-        Block.w_sizepref.fset(self, SizePref(hard_min=len(border_text), hard_max=len(border_text)))
+        Block.w_sizepref.fset(self, SizePref(hard_min=text_width(border_text), hard_max=text_width(border_text)))
 
 
 class HFillBlock(Block):
@@ -91,7 +99,7 @@ class HFillBlock(Block):
                 with term.location(x=x, y=y):
                     print(text.format(t=term), end='')
             else:
-                return [text]  # for testing purposes only
+                return [text]  # the rows the Runner encodes
 
     @property
     @safe_get
@@ -122,6 +130,17 @@ class BareBlock(Block):
                          w_sizepref=w_sizepref, h_sizepref=h_sizepref, grid=grid)
         self._prev_seq = '{t.normal}'
 
+    def text_rows(self, height):
+        '''Returns the rows of text to display in a block the given number of rows
+        high. All of them by default, with those that don't fit cut off the bottom.
+        '''
+        return self.text.split('\n')
+
+    def render_job(self, width, height):
+        with self.write_lock:
+            text = '\n'.join(self.text_rows(max(0, height))) if self.text else None
+            return _display_text, (text, self.hjust, self.vjust, self.block_just, width, height)
+
     def display(self, width, height, x, y, term=None):
         with self.write_lock:
             out = []
@@ -129,9 +148,7 @@ class BareBlock(Block):
                 available_for_text_rows = max(0, height)
                 available_for_text_cols = max(0, width)
 
-                all_btext_rows = []
-                for row in self.text.split('\n'):
-                    all_btext_rows.append(row)  # TODO all we really need is a count here, right?
+                all_btext_rows = self.text_rows(available_for_text_rows)
                 useable_btext_rows = all_btext_rows[:available_for_text_rows]
 
                 # Calculate the values for adjusting the text vertically within the block
@@ -190,11 +207,32 @@ class BareBlock(Block):
                             raise ValueError(line.rstrip())
                 term.move(term.height, term.width)  # TODO This doesn't work
             else:
-                return [line.display for line in out]  # for testing purposes only
+                # An empty block still covers its space, so nothing stale shows through
+                return ([line.display for line in out] or
+                        [' ' * max(0, width)] * max(0, height))  # the rows the Runner encodes
+
+def _display_text(text, hjust, vjust, block_just, width, height):
+    # The rows of a BareBlock with the given text, in a worker process
+    block = BareBlock(text=text, hjust=hjust, vjust=vjust, block_just=block_just)
+    return block.display(width, height, 0, 0)
 
 class FramedBlock(Block):
-    LEFT_BORDER, TOP_BORDER, TITLE, TITLE_SEP, TEXT, BOTTOM_BORDER, RIGHT_BORDER = 1,2,3,4,5,6,7
-    layout = [1,(2,3,4,5,6),7]
+    '''A Block wrapped in a frame: left and right borders running the full height,
+    and a top border, a title row, an optional title separator, the framed block
+    itself, and a bottom border stacked between them.
+
+    The frame is drawn natively, in the same pass as the framed block's text, and
+    the border and title lines are cached per width until one of them changes.
+    A framed block that has its own Grid is laid out and displayed by the Runner
+    inside the rectangle returned by inner_rect().
+
+    A framed block displayed by this block is never seen by the Runner, so the
+    settings the Runner reads for each block are combined with its own: the
+    frame is volatile if either of them is, has the higher of their priorities,
+    and the higher of their max_refresh_rates, of those that are set. The frame
+    is rendered in a pool if the framed block is, with the frame drawn around
+    its rows there.
+    '''
     def __init__(self,
                  block,
                  name=None,
@@ -207,39 +245,76 @@ class FramedBlock(Block):
                  title = '',
                  title_sep = ''):
 
-        top_border = None if no_borders and top_border == Block.MIDDLE_DOT else top_border
-        bottom_border = None if no_borders and bottom_border == Block.MIDDLE_DOT else bottom_border
-        left_border = None if no_borders and left_border == Block.MIDDLE_DOT else left_border
-        right_border = None if no_borders and right_border == Block.MIDDLE_DOT else right_border
-
-        self._blocks = {}
-
-        self._blocks[1] = VFillBlock(left_border)
-        self._blocks[2] = HFillBlock(top_border)
-        self._blocks[3] = BareBlock(text=title, hjust='^', vjust='^',
-                                   h_sizepref = SizePref(hard_min=1, hard_max=1))
-        self._blocks[4] = HFillBlock(title_sep)
-        self._blocks[5] = block
-        self._blocks[6] = HFillBlock(bottom_border)
-        self._blocks[7] = VFillBlock(right_border)
+        # These must exist before Block.__init__ sets self.text
+        self._block = block
+        self._volatile = Block.volatile
+        self._priority = Block.priority
+        self._max_refresh_rate = Block.max_refresh_rate
+        self._render_async = Block.render_async
+        self._cache = {}  # (part, width) -> display text of the part
+        self._no_borders = no_borders
+        self._top_border = top_border
+        self._bottom_border = bottom_border
+        self._left_border = left_border
+        self._right_border = right_border
+        self._title = title
+        self._title_sep = title_sep
 
         super().__init__(name=name,
                          text=text,
                          hjust='^',
                          vjust='^',
-                         block_just=True,
-                         grid = Grid(FramedBlock.layout, self._blocks))
+                         block_just=True)
+
+    @property
+    @safe_get
+    def block(self): return self._block
+
+    @property
+    def volatile(self):
+        leaf = self._leaf()
+        return bool(self._volatile or (leaf and leaf.volatile))
 
-        self.no_borders = no_borders
+    @volatile.setter
+    def volatile(self, val):
+        self._volatile = val
+
+    @property
+    def priority(self):
+        leaf = self._leaf()
+        return max(self._priority, leaf.priority) if leaf else self._priority
+
+    @priority.setter
+    def priority(self, val):
+        self._priority = val
+
+    @property
+    def max_refresh_rate(self):
+        leaf = self._leaf()
+        rates = [r for r in (self._max_refresh_rate, leaf and leaf.max_refresh_rate) if r]
+        return max(rates) if rates else None
+
+    @max_refresh_rate.setter
+    def max_refresh_rate(self, val):
+        self._max_refresh_rate = val
+
+    @property
+    def render_async(self):
+        leaf = self._leaf()
+        return self._render_async or (leaf.render_async if leaf else None)
+
+    @render_async.setter
+    def render_async(self, val):
+        self._render_async = val
 
     @property
     @safe_get
-    def text(self): return self._blocks[5].text
+    def text(self): return self._block.text
 
     @text.setter
     @safe_set
     def text(self, val):
-        self._blocks[5].text = val
+        self._block.text = val
 
     @property
     @safe_get
@@ -249,6 +324,7 @@ class FramedBlock(Block):
     @safe_set
     def no_borders(self, val):
         self._no_borders = val
+        self._cache.clear()
 
     @property
     @safe_get
@@ -258,8 +334,7 @@ class FramedBlock(Block):
     @safe_set
     def top_border(self, val):
         self._top_border = val
-        top_border = None if self.no_borders and self.top_border == Block.MIDDLE_DOT else val
-        self._blocks[FramedBlock.TOP_BORDER].text = top_border
+        self._cache.clear()
 
     @property
     @safe_get
@@ -269,8 +344,7 @@ class FramedBlock(Block):
     @safe_set
     def bottom_border(self, val):
         self._bottom_border = val
-        bottom_border = None if self.no_borders and self.bottom_border == Block.MIDDLE_DOT else val
-        self._blocks[FramedBlock.BOTTOM_BORDER].text = val
+        self._cache.clear()
 
     @property
     @safe_get
@@ -280,7 +354,7 @@ class FramedBlock(Block):
     @safe_set
     def left_border(self, val):
         self._left_border = val
-        self._blocks[FramedBlock.LEFT_BORDER].text = val
+        self._cache.clear()
 
     @property
     @safe_get
@@ -290,7 +364,7 @@ class FramedBlock(Block):
     @safe_set
     def right_border(self, val):
         self._right_border = val
-        self._blocks[FramedBlock.RIGHT_BORDER].text = val
+        self._cache.clear()
 
     @property
     @safe_get
@@ -300,7 +374,7 @@ class FramedBlock(Block):
     @safe_set
     def title(self, val):
         self._title = val
-        self._blocks[FramedBlock.TITLE].text = val
+        self._cache.clear()
 
     @property
     @safe_get
@@ -310,7 +384,177 @@ class FramedBlock(Block):
     @safe_set
     def title_sep(self, val):
         self._title_sep = val
-        self._blocks[FramedBlock.TITLE_SEP].text = val
+        self._cache.clear()
+
+    def _border(self, val):
+        # With no_borders the default borders disappear, but explicit ones remain.
+        return None if self._no_borders and val == Block.MIDDLE_DOT else val
+
+    def _columns(self, width):
+        # Widths of the left border, middle column and right border. The left
+        # border is served first when there isn't enough room for both.
+        left = min(width, text_width(Line.parse(self._border(self._left_border))[0]))
+        right = min(width - left, text_width(Line.parse(self._border(self._right_border))[0]))
+        return left, width - left - right, right
+
+    def _rows(self):
+        # Rows above the framed block (top border, title and title separator)
+        # and below it (bottom border). The title row is always there.
+        above = ((1 if self._border(self._top_border) else 0) + 1 +
+                 (1 if self._title_sep else 0))
+        below = 1 if self._border(self._bottom_border) else 0
+        return above, below
+
+    def _inner_row_range(self):
+        # The framed block's own h_sizepref, resolved the way the Runner does it.
+        pref = self._block.h_sizepref
+        if not pref:
+            return 0, float('inf')
+        lo, hi = pref.hard_min, pref.hard_max
+        lo = self._block.num_text_rows if lo == 'text' else lo
+        hi = self._block.num_text_rows if hi == 'text' else hi
+        return lo, float('inf') if hi in (None, float('-inf')) else hi
+
+    def inner_is_leaf(self):
+        '''True if the framed block is displayed by this block rather than by the Runner.'''
+        return not self._block.grid and not isinstance(self._block, FramedBlock)
+
+    def _leaf(self):
+        # The framed block if this block displays it, else None. Not locked, since
+        # the Runner reads the settings while the block may be displaying in a pool.
+        return self._block if self.inner_is_leaf() else None
+
+    def wrap_sizeprefs(self, w_sizepref, h_sizepref):
+        '''Returns the (w_sizepref, h_sizepref) of the whole frame, given those of the
+        Plot of the framed block (with lists for hard_min and hard_max, as built by
+        the Runner). These are what a Grid of the borders, the title and the framed
+        block would merge to.
+        '''
+        with self.write_lock:
+            left, _, right = self._columns(float('inf'))
+            above, below = self._rows()
+            # Border and separator rows need at least one column
+            min_cols = 1 if above > 1 or below else 0
+            w_min = left + right + max(min_cols, sum(w_sizepref.hard_min))
+            h_min = above + below + sum(h_sizepref.hard_min)
+            h_max = above + below + sum(m for m in h_sizepref.hard_max
+                                        if m not in (None, float('-inf')))
+            # The title takes whatever width it is given
+            return (SizePref(hard_min=[w_min], hard_max=[float('inf')]),
+                    SizePref(hard_min=[h_min], hard_max=[h_max]))
+
+    def inner_rect(self, x, y, width, height):
+        '''Returns the (x, y, width, height) of the framed block when the frame is
+        displayed at x, y with the given width and height. Rows are handed out top
+        down, so the bottom is cut off first when there isn't enough room.
+        '''
+        with self.write_lock:
+            inner_min, inner_max = self._inner_row_range()
+            left, middle, _ = self._columns(width)
+            above, below = self._rows()
+            above = min(height, above)
+            rows = min(height - above, inner_min)
+            rem = height - above - rows
+            rem -= min(rem, below)
+            rows += min(rem, max(0, inner_max - inner_min))
+            return x + left, y + above, middle, rows
+
+    def _cached(self, part, width, build):
+        key = (part, width)
+        if key not in self._cache:
+            self._cache[key] = _closed(build())
+        return self._cache[key]
+
+    def _parts(self, width, height, inner_rows):
+        # Returns the left border, the right border and the rows of the middle
+        # column, with None standing in for each row of the framed block.
+        left_width, mid_width, right_width = self._columns(width)
+        top, bottom = self._border(self._top_border), self._border(self._bottom_border)
+        left = self._cached('left', left_width,
+                            lambda: Line(self._border(self._left_border), left_width, '<').display)
+        right = self._cached('right', right_width,
+                             lambda: Line(self._border(self._right_border), right_width, '<').display)
+        middle = []
+        if top:
+            middle.append(self._cached('top', mid_width,
+                                       lambda: Line.repeat_to_width(top, mid_width).display))
+        middle.append(self._cached('title', mid_width,
+                                   lambda: Line('{t.normal}' + self._title, mid_width, '^').display))
+        if self._title_sep:
+            middle.append(self._cached('sep', mid_width,
+                                       lambda: Line.repeat_to_width(self._title_sep, mid_width).display))
+        middle.extend([None] * inner_rows)
+        if bottom:
+            middle.append(self._cached('bottom', mid_width,
+                                       lambda: Line.repeat_to_width(bottom, mid_width).display))
+        middle = middle[:height]
+        middle.extend([' ' * mid_width] * (height - len(middle)))
+        return left, right, middle
+
+    def render_job(self, width, height):
+        if not self.inner_is_leaf():
+            return super().render_job(width, height)
+        with self.write_lock:
+            _, _, inner_w, inner_h = self.inner_rect(0, 0, width, height)
+            left, right, middle = self._parts(width, height, inner_h)
+            job = self._block.render_job(inner_w, inner_h) if inner_w > 0 and inner_h > 0 else None
+            return _frame_rows, (left, right, middle, inner_w, inner_h, job)
 
     def display(self, width, height, x, y, term=None):
-        raise NotImplementedError("Blocks with grids don't implement display method")
+        with self.write_lock:
+            inner_x, inner_y, inner_w, inner_h = self.inner_rect(x, y, width, height)
+            left, right, middle = self._parts(width, height, inner_h)
+            leaf = self.inner_is_leaf()
+            job = None
+            if leaf and inner_w > 0 and inner_h > 0:
+                job = (self._block.display, (inner_w, inner_h, inner_x, inner_y))
+        # The framed block is displayed without the frame's lock, which the Runner
+        # needs to lay out the frame while the framed block is displayed in a pool
+        out = _frame_rows(left, right, middle, inner_w, inner_h, job)
+
+        if term:
+            for j, mid in enumerate(middle):
+                if leaf or mid is not None:
+                    with term.location(x=x, y=y+j):
+                        print(out[j].format(t=term), end='')
+                else:  # the Runner displays the framed block's grid here
+                    with term.location(x=x, y=y+j):
+                        print(left.format(t=term), end='')
+                    with term.location(x=inner_x+inner_w, y=y+j):
+                        print(right.format(t=term), end='')
+        else:
+            return out  # the rows the Runner encodes
+
+
+    def segments(self, width, height):
+        if self.inner_is_leaf():
+            return super().segments(width, height)
+        # Leave out the framed block, which the Runner displays on its own
+        with self.write_lock:
+            inner_x, _, inner_w, inner_h = self.inner_rect(0, 0, width, height)
+            left, right, middle = self._parts(width, height, inner_h)
+            out = []
+            for j, mid in enumerate(middle):
+                if mid is None:
+                    out.append((0, j, left))
+                    out.append((inner_x + inner_w, j, right))
+                else:
+                    out.append((0, j, left + mid + right))
+            return out
+
+
+def _frame_rows(left, right, middle, inner_w, inner_h, job):
+    # The rows of a FramedBlock, with the rows fn(*args) returns for job, if
+    # given, in place of the framed block. In a worker process for render_job().
+    inner = [_closed(row) for row in job[0](*job[1])] if job else []
+    inner.extend([' ' * inner_w] * (inner_h - len(inner)))
+    inner_rows = iter(inner)
+    return [left + (next(inner_rows) if mid is None else mid) + right for mid in middle]
+
+def _closed(display):
+    # Make sure display text leaves the terminal in the normal state, so that
+    # its sequences don't bleed into whatever is displayed to the right of it.
+    last = display.rfind('{t.')
+    if last != -1 and not display.startswith('{t.normal}', last):
+        return display + '{t.normal}'
+    return display
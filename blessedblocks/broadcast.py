@@ -0,0 +1,270 @@
+from .backends import Backend, AnsiSequences
+from collections import deque
+from threading import Thread, Lock, Condition, Event
+import os
+import socket
+import struct
+import sys
+import zlib
+
+'''
+Serves the frames of one Runner to any number of viewers, over a UNIX socket
+or TCP, so the producers and the layout run once however many people watch.
+
+A BroadcastBackend wraps the Runner's local backend, if it has one, and sends
+every frame written to it on to the viewers, compressed with zlib. Each frame
+is compressed once, whatever the number of viewers. A viewer starts with a
+keyframe, a frame that repaints the whole screen, and gets only the changes
+after that.
+
+Each viewer has its own writer thread and a short queue of frames. A viewer
+that can't keep up, whose queue fills, has its queue dropped, skips frames
+until the next keyframe, and asks for one. The viewers that keep up aren't held
+up by it.
+
+A message is a header, packed as _HEADER, followed by the compressed frame:
+
+    kind (b'K' for a keyframe, b'D' for the changes since the previous frame)
+    the width and height of the screen
+    the length of the compressed frame
+
+Run `python -m blessedblocks.broadcast ADDRESS` to watch, where ADDRESS is the
+path of a UNIX socket or HOST:PORT.
+'''
+
+_HEADER = struct.Struct('!cHHI')
+KEYFRAME, DIFF = b'K', b'D'
+
+def _family(address):
+    return socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+
+def parse_address(text):
+    '''Returns the address, a path or (host, port), given as a path or HOST:PORT.'''
+    host, sep, port = text.rpartition(':')
+    if sep and port.isdigit() and '/' not in text:
+        return host or 'localhost', int(port)
+    return text
+
+
+class BroadcastBackend(Backend):
+    '''Writes frames to the local backend, if any, and sends them to viewers.
+
+    Args:
+        address: the path of a UNIX socket, or a (host, port) to listen on
+        backend (Backend): where the frames are shown locally, None for nowhere
+        size (tuple): the (width, height) of the screen, when there's no local backend
+        max_pending (int): the most frames queued for a viewer before it's dropped to keyframes
+        level (int): the zlib compression level
+    '''
+    def __init__(self, address, backend=None, size=(80, 24), max_pending=8, level=6):
+        self.address = address
+        self._backend = backend
+        self._size = size
+        self.sequences = backend.sequences if backend else AnsiSequences()
+        self.term = getattr(backend, 'term', None)  # for keyboard input
+        self._max_pending = max_pending
+        self._level = level
+        self._viewers = []
+        self._lock = Lock()
+        self._keyframe_wanted = False  # by a viewer
+        self._keyframe_next = False  # the next frame written is a keyframe
+        self._closed = Event()
+        self._listener = self._listen(address)
+        self._thread = Thread(name='broadcast', target=self._accept, daemon=True)
+        self._thread.start()
+
+    def __repr__(self):
+        return '<BroadcastBackend address={0} viewers={1}>'.format(self.address, len(self._viewers))
+
+    @property
+    def width(self): return self._backend.width if self._backend else self._size[0]
+
+    @property
+    def height(self): return self._backend.height if self._backend else self._size[1]
+
+    @property
+    def viewers(self):
+        with self._lock:
+            return list(self._viewers)
+
+    def fullscreen(self):
+        return self._backend.fullscreen() if self._backend else super().fullscreen()
+
+    def hidden_cursor(self):
+        return self._backend.hidden_cursor() if self._backend else super().hidden_cursor()
+
+    def mouse(self):
+        return self._backend.mouse() if self._backend else super().mouse()
+
+    def wants_keyframe(self):
+        with self._lock:
+            wanted, self._keyframe_wanted = self._keyframe_wanted, False
+            self._keyframe_next = wanted
+        return wanted
+
+    def write(self, frame):
+        num_bytes = self._backend.write(frame) if self._backend else len(frame.encode('utf-8'))
+        with self._lock:
+            keyframe, self._keyframe_next = self._keyframe_next, False
+            viewers = list(self._viewers)
+        if frame and viewers:
+            data = zlib.compress(frame.encode('utf-8'), self._level)
+            message = _HEADER.pack(KEYFRAME if keyframe else DIFF,
+                                   self.width, self.height, len(data)) + data
+            behind = [viewer for viewer in viewers if not viewer.send(message, keyframe)]
+            if behind:
+                with self._lock:
+                    self._keyframe_wanted = True
+        return num_bytes
+
+    def close(self):
+        '''Stop listening and disconnect the viewers.'''
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+        self._listener.close()
+        if _family(self.address) == socket.AF_UNIX:
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+        with self._lock:
+            viewers, self._viewers = self._viewers, []
+        for viewer in viewers:
+            viewer.close()
+        if self._backend:
+            self._backend.close()
+
+    def _listen(self, address):
+        listener = socket.socket(_family(address), socket.SOCK_STREAM)
+        if _family(address) == socket.AF_UNIX:
+            try:
+                os.unlink(address)  # left behind by an earlier run
+            except OSError:
+                pass
+        else:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(address)
+        listener.listen(8)
+        listener.settimeout(.5)  # to notice close()
+        return listener
+
+    def _accept(self):
+        while not self._closed.is_set():
+            try:
+                sock, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            sock.settimeout(None)
+            viewer = _Viewer(sock, self._max_pending, self._remove)
+            with self._lock:
+                self._viewers.append(viewer)
+                self._keyframe_wanted = True
+            viewer.start()
+
+    def _remove(self, viewer):
+        with self._lock:
+            if viewer in self._viewers:
+                self._viewers.remove(viewer)
+
+
+class _Viewer(object):
+    # A connected viewer, with the messages waiting to be sent to it
+    def __init__(self, sock, max_pending, on_close):
+        self._sock = sock
+        self._max_pending = max_pending
+        self._on_close = on_close
+        self._pending = deque()
+        self._cond = Condition()
+        self._synced = False  # whether it's had a keyframe since it last fell behind
+        self._closed = False
+        self.sent = 0
+        self.dropped = 0  # the number of times it fell behind
+
+    def start(self):
+        Thread(name='viewer', target=self._send_pending, daemon=True).start()
+
+    def send(self, message, keyframe):
+        '''Queue a message. Returns False if the viewer has fallen behind and
+        needs a keyframe.
+        '''
+        with self._cond:
+            if keyframe:
+                self._pending.clear()  # the keyframe repaints everything anyway
+                self._synced = True
+            elif not self._synced:
+                return True  # still waiting for the keyframe it asked for
+            elif len(self._pending) >= self._max_pending:
+                self._pending.clear()
+                self._synced = False
+                self.dropped += 1
+                return False
+            self._pending.append(message)
+            self._cond.notify()
+        return True
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)  # in case it's stuck in sendall()
+        except OSError:
+            pass
+
+    def _send_pending(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._pending and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                    message = self._pending.popleft()
+                self._sock.sendall(message)
+                self.sent += 1
+        except OSError:
+            pass  # the viewer went away
+        finally:
+            self._on_close(self)
+            self._sock.close()
+
+
+def messages(sock):
+    '''Yields the (kind, width, height, frame) messages read from a connected socket.'''
+    stream = sock.makefile('rb')
+    while True:
+        header = stream.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        kind, width, height, length = _HEADER.unpack(header)
+        data = stream.read(length)
+        if len(data) < length:
+            return
+        yield kind, width, height, zlib.decompress(data).decode('utf-8')
+
+def view(address, fd=1):
+    '''Show the frames served at address on the terminal at fd, until the server goes away.'''
+    sequences = AnsiSequences()
+    sock = socket.socket(_family(address), socket.SOCK_STREAM)
+    sock.connect(address)
+    out = os.fdopen(os.dup(fd), 'w', encoding='utf-8')
+    out.write(sequences.enter_fullscreen + sequences.hide_cursor)
+    try:
+        for _, _, _, frame in messages(sock):
+            out.write(frame)
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        out.write(sequences.normal + sequences.normal_cursor + sequences.exit_fullscreen)
+        out.close()
+        sock.close()
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit('usage: python -m blessedblocks.broadcast SOCKET_PATH|HOST:PORT')
+    view(parse_address(sys.argv[1]))
@@ -0,0 +1,218 @@
+from .block import Block, SizePref, safe_get, safe_set
+
+try:
+    import numpy as np
+except ImportError:  # CanvasBlock is optional, and so is numpy
+    np = None
+
+'''
+A CanvasBlock draws numpy arrays into whatever rectangle it's given, as plots
+or heatmaps. Everything from scaling the data to building the rows of display
+text is done with array operations, so there's no Python work per character,
+only per run of characters of the same color.
+
+  * Line and scatter plots are drawn with braille characters, each of which
+    holds a grid of 2x4 dots, for 8 times the resolution of the characters.
+  * Heatmaps are drawn with upper half blocks, with one value in the color of
+    the top half and one in the background color of the bottom half, for twice
+    the resolution of the rows.
+'''
+
+# The bit for each dot of a braille character, by row and column
+_BRAILLE_BITS = [[0x01, 0x08],
+                 [0x02, 0x10],
+                 [0x04, 0x20],
+                 [0x40, 0x80]]
+_BRAILLE = 0x2800
+_UPPER_HALF = 0x2580
+
+# Cold to hot, in colors blessed knows by name
+HEAT = ('navy', 'blue', 'dodgerblue', 'deepskyblue', 'cyan', 'springgreen', 'lime',
+        'chartreuse', 'yellow', 'gold', 'orange', 'darkorange', 'orangered', 'red')
+
+class CanvasBlock(Block):
+    '''A block that draws numpy arrays as plots or a heatmap. Requires numpy.
+
+    Call plot() for each series to draw, with replace=True to start over with
+    new data, or heatmap() to replace everything with a 2-D array. The display
+    rows are cached until the data or the size of the block changes.
+
+    Args:
+        xlim (tuple), ylim (tuple): the (low, high) of the axes of plots, None to fit the data
+    '''
+    def __init__(self,
+                 name=None,
+                 xlim=None,
+                 ylim=None,
+                 w_sizepref=SizePref(hard_min=0, hard_max=float('inf')),
+                 h_sizepref=SizePref(hard_min=0, hard_max=float('inf'))):
+        if np is None:
+            raise ImportError('CanvasBlock requires numpy; pip install blessedblocks[canvas]')
+        super().__init__(name=name, w_sizepref=w_sizepref, h_sizepref=h_sizepref)
+        self._series = []  # (x, y, color, scatter)
+        self._heatmap = None  # (data, low, high, palette)
+        self._cache = None  # (width, height, display)
+        self.xlim = xlim
+        self.ylim = ylim
+
+    def __repr__(self):
+        return '<CanvasBlock name={0}>'.format(self.name)
+
+    @property
+    @safe_get
+    def xlim(self): return self._xlim
+
+    @xlim.setter
+    @safe_set
+    def xlim(self, val):
+        self._xlim = val
+        self._cache = None
+
+    @property
+    @safe_get
+    def ylim(self): return self._ylim
+
+    @ylim.setter
+    @safe_set
+    def ylim(self, val):
+        self._ylim = val
+        self._cache = None
+
+    @safe_set
+    def plot(self, y, x=None, color='green', scatter=False, replace=False):
+        '''Draw y against x, or against its indices, as a line, or as points if
+        scatter is True, in the given color (a blessed color name).
+        '''
+        y = np.asarray(y, dtype=float)
+        x = np.arange(len(y), dtype=float) if x is None else np.asarray(x, dtype=float)
+        if x.shape != y.shape or y.ndim != 1:
+            raise ValueError('x and y must be 1-D arrays of the same length')
+        if replace:
+            self._series = []
+        self._heatmap = None
+        self._series.append((x, y, color, scatter))
+        self._cache = None
+
+    @safe_set
+    def heatmap(self, data, low=None, high=None, palette=HEAT):
+        '''Draw a 2-D array, scaled to fit the block, with values from low to high
+        (the data's own if None) spread over the palette of blessed color names.
+        '''
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 2:
+            raise ValueError('heatmap data must be a 2-D array')
+        self._series = []
+        self._heatmap = (data, low, high, tuple(palette))
+        self._cache = None
+
+    @safe_set
+    def clear(self):
+        self._series = []
+        self._heatmap = None
+        self._cache = None
+
+    def display(self, width, height, x, y, term=None):
+        with self.write_lock:
+            if self._cache and self._cache[:2] == (width, height):
+                out = self._cache[2]
+            else:
+                out = self._render(max(0, width), max(0, height))
+                self._cache = (width, height, out)
+        if term:
+            for j, row in enumerate(out):
+                with term.location(x=x, y=y+j):
+                    print(row.format(t=term), end='')
+        else:
+            return list(out)  # the rows the Runner encodes
+
+    def _render(self, width, height):
+        if not width or not height:
+            return [' ' * width] * height
+        if self._heatmap:
+            chars, styles, names = self._render_heatmap(width, height)
+        else:
+            chars, styles, names = self._render_plots(width, height)
+        return [_row(chars[j], styles[j], names) for j in range(height)]
+
+    def _render_plots(self, width, height):
+        # Returns the characters of the cells, the index in names of their styles, and names
+        w, h = width * 2, height * 4  # in dots
+        names = ['']
+        codes = np.zeros((height, width), dtype=np.uint32)
+        styles = np.zeros((height, width), dtype=np.intp)
+        if self._series:
+            xlo, xhi = self._xlim or _limits([s[0] for s in self._series])
+            ylo, yhi = self._ylim or _limits([s[1] for s in self._series])
+            rows = np.arange(h)[:, None]
+            weights = np.array(_BRAILLE_BITS, dtype=np.uint32)
+            for x, y, color, scatter in self._series:
+                ok = np.isfinite(x) & np.isfinite(y)
+                px = _scale(x[ok], xlo, xhi, w)
+                py = (h - 1) - _scale(y[ok], ylo, yhi, h)  # row 0 is the top
+                dots = np.zeros((h, w), dtype=bool)
+                inside = (px >= 0) & (px < w) & (py >= 0) & (py < h)
+                if scatter or len(px) < 2:
+                    dots[py[inside], px[inside]] = True
+                else:
+                    # Join the points: find the y of the line at each dot column, and
+                    # fill each column between the ys of its neighbours
+                    cols = np.arange(max(0, px.min()), min(w - 1, px.max()) + 1)
+                    if not cols.size:
+                        continue
+                    order = np.argsort(px, kind='stable')
+                    line = np.rint(np.interp(cols, px[order], py[order])).astype(np.intp)
+                    prev = np.concatenate(([line[0]], line[:-1]))
+                    lo = np.minimum(line, prev)
+                    hi = np.maximum(line, prev)
+                    dots[:, cols] = (rows >= lo) & (rows <= hi)
+                cells = (dots.reshape(height, 4, width, 2) * weights[None, :, None, :]).sum(axis=(1, 3))
+                codes |= cells.astype(np.uint32)
+                names.append('{t.' + color + '}')
+                styles[cells > 0] = len(names) - 1  # the last series drawn in a cell colors it
+        chars = np.where(codes > 0, codes + _BRAILLE, ord(' ')).astype(np.uint32)
+        return chars, styles, names
+
+    def _render_heatmap(self, width, height):
+        data, low, high, palette = self._heatmap
+        names = ['{t.' + fg + '_on_' + bg + '}' for fg in palette for bg in palette]
+        h = height * 2
+        rows = np.arange(h) * data.shape[0] // h
+        cols = np.arange(width) * data.shape[1] // width
+        cells = data[rows][:, cols]
+        finite = cells[np.isfinite(cells)]
+        low = low if low is not None else (finite.min() if finite.size else 0.0)
+        high = high if high is not None else (finite.max() if finite.size else 1.0)
+        span = high - low if high > low else 1.0
+        levels = np.clip(((cells - low) / span * len(palette)).astype(np.intp), 0, len(palette) - 1)
+        styles = levels[0::2] * len(palette) + levels[1::2]
+        chars = np.full((height, width), _UPPER_HALF, dtype=np.uint32)
+        return chars, styles, names
+
+
+def _limits(arrays):
+    values = np.concatenate(arrays)
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return 0.0, 1.0
+    return values.min(), values.max()
+
+def _scale(values, low, high, size):
+    # The dot each value falls on, out of size
+    if high <= low:
+        return np.full(values.shape, size // 2, dtype=np.intp)
+    return np.rint((values - low) / (high - low) * (size - 1)).astype(np.intp)
+
+def _row(chars, styles, names):
+    # The display text of a row, with a tag at the start of each run of a style
+    text = chars.astype('<u4').tobytes().decode('utf-32-le')
+    starts = np.flatnonzero(np.diff(styles)) + 1
+    parts = []
+    prev = 0
+    for start in np.concatenate((starts, [len(text)])).tolist():
+        name = names[styles[prev]]
+        parts.append((name or '{t.normal}') if parts or name else '')
+        parts.append(text[prev:start])
+        prev = start
+    if names[styles[-1]]:
+        parts.append('{t.normal}')
+    return ''.join(parts)
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from queue import Queue
+from threading import Thread, Lock
+
+class CommandExecutor(object):
+    '''Runs the commands entered in an InputBlock off the Runner's render thread.
+
+    Commands are queued and started one at a time, in the order they were entered,
+    on a pool of worker threads. Each one gets `timeout` seconds (no limit if None).
+    If it hasn't finished by then it's reported as timed out and the next command
+    starts on another worker, while the slow one runs on in the background.
+
+    The status of each command goes to report(cmd, status): first 'Running: cmd',
+    then whatever string the handler returned (None if it returned anything else),
+    or the exception it raised, or the timeout.
+
+    Args:
+        handler (callable): called with each command, on a worker thread
+        report (callable): called with each command and its status
+        workers (int): the most commands that can be running at once
+        timeout (float): seconds to wait for a command before moving on
+    '''
+    def __init__(self, handler, report, workers=4, timeout=None):
+        self._handler = handler
+        self._report = report
+        self._timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._q = Queue()
+        self._lock = Lock()
+        self._thread = None
+
+    def submit(self, cmd):
+        '''Queue a command to be run after those entered before it.'''
+        with self._lock:
+            if not self._thread:
+                self._thread = Thread(name='commands', target=self._dispatch, daemon=True)
+                self._thread.start()
+        self._q.put(cmd)
+
+    def _dispatch(self):
+        while True:
+            cmd = self._q.get()
+            if cmd is None:
+                self._pool.shutdown(wait=False)
+                return
+            self._report(cmd, 'Running: {}'.format(cmd))
+            future = self._pool.submit(self._handler, cmd)
+            try:
+                result = future.result(timeout=self._timeout)
+            except TimeoutError:
+                status = 'Timed out: {}'.format(cmd)
+            except Exception as e:
+                status = '{}: {}'.format(cmd, e)
+            else:
+                status = result if isinstance(result, str) else None
+            self._report(cmd, status)
+
+    def shutdown(self):
+        '''Stop once the commands already entered have been run, or timed out.'''
+        self._q.put(None)
@@ -0,0 +1,295 @@
+from blessed.formatters import COLORS, COMPOUNDABLES
+from collections import namedtuple
+from functools import lru_cache
+from .width import width as text_width, char_width
+from bisect import bisect_right
+import re
+
+'''
+The Encoder turns the display text of blocks -- text containing blessed tags like
+{t.red}, with literal curly braces doubled -- into the characters actually written
+to the terminal for a frame.
+
+Blocks hand their display text to the Encoder as segments: a piece of one row at
+an x, y position on the screen. Rather than formatting each segment on its own,
+and moving the cursor to an absolute position for each of them, the Encoder
+tracks the cursor position and the SGR state (colors and attributes) of the
+terminal across the whole frame. Doing so it:
+
+  * skips segments that are unchanged since the previous frame,
+  * drops style sequences that don't change the style of any text, including
+    those repeating the style the terminal is already in,
+  * moves the cursor with the shortest of an absolute move, a column move, a
+    carriage return, or a line feed, and not at all if it's already in place,
+  * erases to the end of the line instead of writing trailing blanks in segments
+    that reach the right edge of the screen, and erases and skips over long runs
+    of blanks elsewhere.
+
+Every segment starts out in the normal style, so the sequences in one segment
+never bleed into the next.
+
+Columns of a segment can be hidden, where something is drawn over it, like an
+overlay. The rest of the segment is written as pieces around them, each
+compared to the previous frame on its own, so nothing is written over what's
+on top.
+'''
+
+# The style of a run of text: foreground color, background color (as an on_xxx
+# name), compoundable attributes like bold or underline, and, in order, any other
+# tags that we can't reason about.
+Style = namedtuple('Style', 'fg bg attrs other')
+NORMAL = Style(fg=None, bg=None, attrs=frozenset(), other=())
+
+# Attributes that show up on blank cells, so they can't be erased over
+_VISIBLE_ON_BLANK = {'reverse', 'standout', 'underline', 'strikethrough', 'overline'}
+
+_TOKENS = re.compile(r'{t\.(.+?)}|{{|}}')
+
+# Blank runs shorter than this are never worth erasing and skipping over
+_BLANKS = re.compile(' {9,}')
+
+@lru_cache(maxsize=None)
+def _tag(name):
+    # Returns a Style holding just what the tag sets, or NORMAL for a reset.
+    if name == 'normal':
+        return NORMAL
+    parts = name.split('_')
+    attrs = []
+    while parts and parts[0] in COMPOUNDABLES:
+        attrs.append(parts.pop(0))
+    rest = '_'.join(parts)
+    fg = bg = None
+    if rest in COLORS:
+        if rest.startswith('on_'):
+            bg = rest
+        else:
+            fg = rest
+    elif '_on_' in rest and rest.split('_on_', 1)[0] in COLORS:
+        fg, bg = rest.split('_on_', 1)
+        bg = 'on_' + bg
+        if bg not in COLORS:
+            return Style(None, None, frozenset(), (name,))
+    elif rest:
+        return Style(None, None, frozenset(), (name,))
+    return Style(fg, bg, frozenset(attrs), ())
+
+def _apply(style, name):
+    tag = _tag(name)
+    if tag is NORMAL:
+        return NORMAL
+    if tag.other:
+        if style.other[-1:] == tag.other:
+            return style
+        return style._replace(other=style.other + tag.other)
+    return Style(tag.fg or style.fg,
+                 tag.bg or style.bg,
+                 style.attrs | tag.attrs,
+                 style.other)
+
+@lru_cache(maxsize=4096)
+def runs(display):
+    '''Split display text into a tuple of (Style, text) runs, with braces unescaped.'''
+    out = []
+    style = NORMAL
+    text = []
+    prev_end = 0
+    for match in _TOKENS.finditer(display):
+        text.append(display[prev_end:match.start()])
+        prev_end = match.end()
+        name = match.group(1)
+        if name is None:  # an escaped brace
+            text.append(match.group(0)[0])
+            continue
+        new_style = _apply(style, name)
+        if new_style != style:
+            if ''.join(text):
+                out.append((style, ''.join(text)))
+            text = []
+            style = new_style
+    text.append(display[prev_end:])
+    if ''.join(text):
+        out.append((style, ''.join(text)))
+    return tuple(out)
+
+def _clip(segment_runs, x, hidden):
+    # Returns the (x, end, runs) pieces of the runs of a segment at x that are
+    # outside the hidden column ranges. Half of a wide character that's hidden
+    # shows as a blank.
+    starts = [start for start, _ in hidden]
+    def is_hidden(col):
+        i = bisect_right(starts, col) - 1
+        return i >= 0 and col < hidden[i][1]
+    pieces = []
+    piece = None  # [x, end, runs]
+    col = x
+    for style, text in segment_runs:
+        for char in text:
+            w = char_width(char)
+            cols = [c for c in range(col, col + w) if not is_hidden(c)]
+            if cols:
+                shown = char if len(cols) == w else ' ' * len(cols)
+                if piece is None or piece[1] != cols[0]:
+                    piece = [cols[0], cols[0], []]
+                    pieces.append(piece)
+                if piece[2] and piece[2][-1][0] == style:
+                    piece[2][-1] = (style, piece[2][-1][1] + shown)
+                else:
+                    piece[2].append((style, shown))
+                piece[1] = cols[-1] + 1
+            elif w == 0 and piece is not None and piece[1] == col:
+                piece[2][-1] = (piece[2][-1][0], piece[2][-1][1] + char)  # combining mark
+            col += w
+    return [(px, end, tuple(piece_runs)) for px, end, piece_runs in pieces]
+
+class Encoder(object):
+    '''Encodes the segments of a frame for a terminal. Not thread-safe; it is only
+    used by the Runner while it holds its lock.
+
+    Args:
+        term: a blessed Terminal, or the sequences of a Backend, used to look up
+              the sequences written to the terminal.
+    '''
+    def __init__(self, term):
+        self._term = term
+        self._seqs = {}  # (from Style, to Style) -> sequence
+        self._skips = {}  # number of blanks -> sequence to erase and skip them
+        self._out = []
+        self._prev = {}  # (x, y) -> display text of the segments of the previous frame
+        self._curr = {}
+        self._width = self._height = None
+        self._clear = True
+        self._x = self._y = None  # cursor position, None when unknown
+        self._style = NORMAL
+
+    def invalidate(self):
+        '''Forget what's on the screen, so the next frame clears it and is written in full.'''
+        self._clear = True
+
+    def begin_frame(self, width, height):
+        if (width, height) != (self._width, self._height):
+            self._width, self._height = width, height
+            self._clear = True
+        self._out = []
+        self._curr = {}
+        if self._clear:
+            self._clear = False
+            self._prev = {}
+            self._out.append(self._term.normal + self._term.clear)
+            self._style = NORMAL
+            self._x = self._y = 0
+
+    def end_frame(self):
+        '''Returns the text to write to the terminal for the frame.'''
+        if self._style != NORMAL:
+            self._out.append(self._term.normal)
+            self._style = NORMAL
+        self._prev = self._curr
+        out = ''.join(self._out)
+        self._out = []
+        return out
+
+    def segment(self, x, y, display, hidden=None):
+        '''Add display text at position x, y to the frame, leaving out the columns
+        in hidden, a sorted list of non-overlapping (start, end) column ranges.
+        '''
+        if hidden:
+            segment_runs = runs(display)
+            end = x + sum(text_width(text) for _, text in segment_runs)
+            if any(start < end and x < stop for start, stop in hidden):
+                for piece_x, piece_end, piece_runs in _clip(segment_runs, x, hidden):
+                    self._add(piece_x, y, (display, piece_x, piece_end), piece_runs)
+                return
+        self._add(x, y, display)
+
+    def _add(self, x, y, key, segment_runs=None):
+        # Write runs at x, y unless the key they're known by is the same as last frame
+        self._curr[(x, y)] = key
+        if self._prev.get((x, y)) == key:
+            return
+        if segment_runs is None:
+            segment_runs = runs(key)
+        if not segment_runs:
+            return
+        self._move(x, y)
+        last = len(segment_runs) - 1
+        for i, (style, text) in enumerate(segment_runs):
+            if i == last and x + text_width(text) >= self._width:
+                stripped = text.rstrip(' ')
+                blanks = len(text) - len(stripped)
+                clear_eol = self._term.clear_eol
+                if clear_eol and blanks > len(clear_eol) and self._erasable(style):
+                    if stripped:
+                        self._write(style, stripped)
+                    self._out.append(clear_eol)
+                    break
+            self._write(style, text)
+            x += text_width(text)
+
+    def _erasable(self, style):
+        # Blanks in the given style can be erased if they look the same as erased
+        # cells, which take the background color the terminal is in.
+        for s in (style, self._style):
+            if s.bg or s.other or s.attrs & _VISIBLE_ON_BLANK:
+                return False
+        return True
+
+    def _write(self, style, text):
+        if style != self._style:
+            self._out.append(self._sgr(self._style, style))
+            self._style = style
+        if '         ' in text and self._erasable(style):
+            pos = 0
+            for match in _BLANKS.finditer(text):
+                if self._x + text_width(text[:match.end()]) >= self._width:
+                    break  # the cursor can't be moved past the right edge
+                skip = self._skip(match.end() - match.start())
+                if skip:
+                    self._out.append(text[pos:match.start()])
+                    self._out.append(skip)
+                    pos = match.end()
+            self._out.append(text[pos:])
+        else:
+            self._out.append(text)
+        self._x += text_width(text)
+        if self._x >= self._width:
+            self._x = self._y = None  # the cursor may be waiting to wrap
+
+    def _skip(self, blanks):
+        # Erase the blanks and move the cursor over them, if that's shorter
+        skip = self._skips.get(blanks)
+        if skip is None:
+            skip = self._term.ech(blanks) + self._term.cuf(blanks)
+            if not self._term.ech(blanks) or len(skip) >= blanks:
+                skip = ''
+            self._skips[blanks] = skip
+        return skip
+
+    def _sgr(self, old, new):
+        key = (old, new)
+        seq = self._seqs.get(key)
+        if seq is None:
+            term = self._term
+            if (old.attrs <= new.attrs and new.other[:len(old.other)] == old.other and
+                    (new.fg or not old.fg) and (new.bg or not old.bg)):
+                names = list(new.attrs - old.attrs)
+                names += [c for c, o in ((new.fg, old.fg), (new.bg, old.bg)) if c and c != o]
+                names += list(new.other[len(old.other):])
+                seq = ''.join(getattr(term, name) for name in names)
+            else:  # something has to be turned off
+                seq = term.normal + self._sgr(NORMAL, new)
+            self._seqs[key] = seq
+        return seq
+
+    def _move(self, x, y):
+        if (x, y) == (self._x, self._y):
+            return
+        term = self._term
+        moves = [term.move(y, x)]
+        if y == self._y:
+            moves.append(term.move_x(x))
+            if x == 0:
+                moves.append('\r')
+        elif self._y is not None and y == self._y + 1:
+            moves.append('\r\n' + (term.move_x(x) if x else ''))
+        self._out.append(min(moves, key=len))
+        self._x, self._y = x, y
@@ -0,0 +1,220 @@
+from .block import Block, SizePref, safe_get, safe_set
+from .ansi import clean_row
+from .width import pad
+from array import array
+from itertools import islice
+from threading import Thread, Event
+import mmap
+import os
+import re
+
+_NEWLINES = re.compile(b'\n')
+
+class FileViewBlock(Block):
+    '''A block for viewing a file of any size, a screenful at a time, like `less`.
+
+    The file is memory-mapped rather than read into the text of the block, so
+    opening it takes the same time and memory whatever its size. A background
+    thread counts its rows, in chunks of chunk_size bytes, but only as far as
+    the block has been scrolled, plus a screenful. It keeps the offset of every
+    checkpoint_rows'th row, not of every row, so the index of a file of a
+    billion rows fits in a few megabytes; a row is found by scanning forward
+    from the checkpoint before it. Only the rows in view are ever decoded.
+
+    Scroll it with the methods below, or by passing the InputBlock commands in
+    `commands` to handler(), for example with:
+
+        Grid(layout, blocks, cmds=set(view.commands), handler=view.handler)
+
+    The file is assumed not to change while it's viewed; see TailBlock for files
+    that grow.
+
+    Args:
+        path (str): the file to view
+        chunk_size (int): the number of bytes indexed at a time
+        checkpoint_rows (int): the rows between the offsets kept in the index
+    '''
+    commands = {'j': 'down', 'k': 'up', 'f': 'page down', 'b': 'page up',
+                'g': 'top', 'G': 'bottom'}
+
+    def __init__(self,
+                 path,
+                 name=None,
+                 chunk_size=1 << 22,
+                 checkpoint_rows=1024,
+                 w_sizepref=SizePref(hard_min=0, hard_max=float('inf')),
+                 h_sizepref=SizePref(hard_min=0, hard_max=float('inf'))):
+        super().__init__(name=name, w_sizepref=w_sizepref, h_sizepref=h_sizepref)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.checkpoint_rows = checkpoint_rows
+        self._top = 0
+        self._bottom = False  # whether to keep the last rows in view
+        self._height = 1  # the height the block was last displayed at, for paging
+        # The offset of the start of every checkpoint_rows'th row, and the number
+        # of newlines up to the offset indexed so far, always updated together
+        self._checkpoints = array('Q', [0])
+        self._newlines = 0
+        self._indexed = 0
+        self._wanted = checkpoint_rows  # the rows to index before waiting for a scroll
+        self._more = Event()  # set when more rows are wanted, or the block is closed
+        self._done = Event()
+        self._closed = Event()
+        self._fd = os.open(path, os.O_RDONLY)
+        self.size = os.fstat(self._fd).st_size
+        self._mm = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ) if self.size else None
+        self._ends_in_newline = not self._mm or self._mm[-1:] == b'\n'
+        self._indexer = Thread(name='index', target=self._index, daemon=True)
+        self._indexer.start()
+
+    def __repr__(self):
+        return '<FileViewBlock name={0} path={1}>'.format(self.name, self.path)
+
+    @property
+    @safe_get
+    def top(self): return self._top
+
+    @top.setter
+    @safe_set
+    def top(self, val):
+        # Rows past those indexed so far may be there; display() finds out
+        self._top = max(0, min(val, self.num_rows - 1) if self.indexed else val)
+        self._bottom = False
+        self._want(self._top + 2 * self._height)
+
+    @property
+    def num_rows(self):
+        '''The number of rows indexed so far. It's the number in the file once
+        indexed is True.'''
+        rows = self._newlines + 1
+        if self._done.is_set() and self._ends_in_newline:
+            rows -= 1  # the file ends with a newline, not an empty row
+        return rows
+
+    @property
+    def indexed(self):
+        return self._done.is_set()
+
+    def wait_indexed(self, timeout=None):
+        '''Index the whole file, waiting up to timeout seconds for it.'''
+        self._want(float('inf'))
+        return self._done.wait(timeout)
+
+    def _want(self, rows):
+        # Have the indexer go on until it's counted this many rows
+        if rows > self._wanted:
+            self._wanted = rows
+            self._more.set()
+
+    def scroll(self, rows):
+        self.top = self._top + rows
+
+    def page(self, pages):
+        self.scroll(pages * max(1, self._height - 1))
+
+    @safe_set
+    def bottom(self):
+        '''Keep the last rows of the file in view, as far as it's been indexed.'''
+        self._bottom = True
+        self._want(float('inf'))
+
+    def on_mouse(self, event):
+        if event.button in ('scroll_up', 'scroll_down'):
+            self.scroll(-3 if event.button == 'scroll_up' else 3)
+            return True
+        return False
+
+    def handler(self, cmd):
+        '''Scroll as the command in `commands` says.'''
+        action = self.commands.get(cmd)
+        if action == 'down':
+            self.scroll(1)
+        elif action == 'up':
+            self.scroll(-1)
+        elif action == 'page down':
+            self.page(1)
+        elif action == 'page up':
+            self.page(-1)
+        elif action == 'top':
+            self.top = 0
+        elif action == 'bottom':
+            self.bottom()
+        return '{0}: {1}/{2}{3}'.format(os.path.basename(self.path), self._top + 1,
+                                        self.num_rows, '' if self.indexed else '+')
+
+    def _index(self):
+        pos, newlines, step = 0, 0, self.checkpoint_rows
+        while pos < self.size and not self._closed.is_set():
+            if newlines >= self._wanted:
+                self._more.wait()
+                self._more.clear()
+                continue
+            end = min(pos + self.chunk_size, self.size)
+            chunk = self._mm[pos:end]
+            # The newlines ending rows step - 1, 2 * step - 1, ... start the checkpoints
+            first = step - 1 - newlines % step
+            checkpoints = [m.end() + pos for m in
+                           islice(_NEWLINES.finditer(chunk), first, None, step)]
+            newlines += chunk.count(b'\n')
+            pos = end
+            self._rows_indexed(checkpoints, newlines, end)
+        self._done.set()
+        self._rows_indexed([], self._newlines, self._indexed)  # num_rows is final
+
+    @safe_set
+    def _rows_indexed(self, checkpoints, newlines, indexed):
+        # A redraw may show more rows
+        self._checkpoints.extend(checkpoints)
+        self._newlines = newlines
+        self._indexed = indexed
+
+    def _start(self, i):
+        # The offset of the start of row i, found from the checkpoint before it
+        pos = self._checkpoints[i // self.checkpoint_rows]
+        for _ in range(i % self.checkpoint_rows):
+            pos = self._mm.find(b'\n', pos, self._indexed) + 1
+        return pos
+
+    def _rows(self, top, count, width):
+        # The text of count rows from row top, all of them indexed
+        rows = []
+        start = self._start(top) if count > 0 else 0
+        for _ in range(count):
+            end = self._mm.find(b'\n', start, self._indexed)
+            end = self._indexed if end < 0 else end
+            # Decode only as much as could be shown; a tab is the widest a character gets
+            text = self._mm[start:min(end, start + width * 4)].decode('utf-8', errors='replace')
+            rows.append(clean_row(text))
+            start = end + 1
+        return rows
+
+    def display(self, width, height, x, y, term=None):
+        with self.write_lock:
+            self._height = height
+            num_rows = self.num_rows
+            if self._bottom:
+                self._top = max(0, num_rows - height)
+            elif self.indexed:
+                self._top = max(0, min(self._top, num_rows - 1))
+            self._want(self._top + 2 * height)
+            count = max(0, min(height, num_rows - self._top)) if self._mm else 0
+            rows = self._rows(self._top, count, width)
+            rows += [''] * (height - len(rows))
+            out = [pad(row, width).replace('{', '{{').replace('}', '}}') for row in rows]
+            if term:
+                for j, row in enumerate(out):
+                    with term.location(x=x, y=y+j):
+                        print(row.format(t=term), end='')
+            else:
+                return out  # the rows the Runner encodes
+
+    def close(self):
+        '''Stop indexing and unmap the file.'''
+        self._closed.set()
+        self._more.set()
+        self._indexer.join()
+        with self.write_lock:
+            if self._mm:
+                self._mm.close()
+                self._mm = None
+            os.close(self._fd)
@@ -0,0 +1,48 @@
+import os
+import select
+
+class KeyReader(object):
+    '''Reads keystrokes from a blessed Terminal without polling.
+
+    read() blocks in select() on both the terminal's keyboard and a wakeup pipe,
+    so it returns as soon as a key is pressed, and as soon as wake() is called
+    from any other thread, for example when the Runner stops. Everything already
+    typed, like a paste or a run of repeated keys, comes back from a single read()
+    so the caller can apply it as one update.
+
+    The terminal must be in cbreak (or raw) mode for keys to arrive as they're typed.
+    '''
+    def __init__(self, term):
+        self._term = term
+        self._fd = getattr(term, '_keyboard_fd', None)  # None if stdin isn't a terminal
+        self._wake_r, self._wake_w = os.pipe()
+
+    def wake(self):
+        '''Make a read() in progress, or the next one, return at once.'''
+        try:
+            os.write(self._wake_w, b'.')
+        except OSError:  # closed
+            pass
+
+    def read(self, timeout=None):
+        '''Wait for keystrokes and return all of those available, as a list of
+        blessed Keystrokes. Returns an empty list on timeout, or when woken up.
+        '''
+        fds = [self._wake_r] if self._fd is None else [self._wake_r, self._fd]
+        ready, _, _ = select.select(fds, [], [], timeout)
+        if self._wake_r in ready:
+            os.read(self._wake_r, 512)
+            return []
+        keys = []
+        if ready:
+            # inkey() reads whatever is waiting and buffers the rest, so keep
+            # going until both its buffer and the fd are empty.
+            key = self._term.inkey(timeout=0)
+            while key:
+                keys.append(key)
+                key = self._term.inkey(timeout=0)
+        return keys
+
+    def close(self):
+        os.close(self._wake_r)
+        os.close(self._wake_w)
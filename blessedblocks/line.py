@@ -1,4 +1,5 @@
 from blessed import Terminal
+from .width import fit_index, char_width, width as text_width
 from math import floor, ceil
 from collections import defaultdict
 import re
@@ -58,8 +59,11 @@ class Line():
                     seqs[loc] = curr_seq  # always keep the first seq
                     prev_loc = loc
                 else:
-                    if prev_end == match.start(): # drop the first of two
-                        seqs[prev_loc] = curr_seq
+                    if prev_end == match.start() and prev_loc == loc: # drop the first of two
+                        if loc and seqs[loc].startswith('{t.normal}') and curr_seq != '{t.normal}':
+                            seqs[loc] = '{t.normal}' + curr_seq  # unless it turns styles off
+                        else:
+                            seqs[loc] = curr_seq
                     elif curr_seq != prev_seq:
                         seqs[loc] = curr_seq
                         prev_loc = loc
@@ -90,7 +94,7 @@ class Line():
         display = ''
         last_seq = ''
         start = min(0,begin)
-        stop = min(width,len(self._text))
+        stop, used = fit_index(self._text, width)  # in characters, and in columns
         for i in range(start, stop):
             if i in self._seqs:
                 display += self._seqs[i]
@@ -100,8 +104,8 @@ class Line():
             display += self._escape_brackets(c)
 
         left_pad = right_pad = ''
-        if width > stop:
-            left_pad, right_pad = self._calc_just(just, width - stop)
+        if width > used:
+            left_pad, right_pad = self._calc_just(just, width - used)
         self.plain = left_pad + plain + right_pad
         self.display = left_pad + display + right_pad
 
@@ -111,8 +115,15 @@ class Line():
     def repeat_to_width(blessed_text, width):
         text, seqs, last_seq = Line.parse(blessed_text)
         line = []
-        for i in range(width):
+        used = 0
+        i = 0
+        while used < width and text_width(text):
             j = i % len(text)
+            w = char_width(text[j])
+            if used + w > width:  # a wide character that doesn't fit
+                break
+            used += w
+            i += 1
             if j == 0:
                 if j in seqs:
                     line.append(seqs[j])
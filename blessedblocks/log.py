@@ -0,0 +1,135 @@
+from .block import Block, SizePref
+from .width import pad
+from collections import Counter, deque
+import logging
+
+'''
+A block showing what a program logs, in place of printing debug output.
+
+A LoggingBlock is a logging handler's view: install() it on a logger, and the
+records logged there are kept in a ring buffer and shown, the newest last.
+'''
+# The color of the records of each level, by the lowest level it's for
+LEVEL_TAGS = ((logging.CRITICAL, '{t.bold_red}'),
+              (logging.ERROR, '{t.red}'),
+              (logging.WARNING, '{t.yellow}'),
+              (logging.INFO, ''),
+              (logging.NOTSET, '{t.bright_black}'))
+
+class LoggingBlock(Block):
+    '''A block showing the newest records logged with the logging module.
+
+    install() adds the block's handler to a logger, the root logger by default,
+    and uninstall() removes it. Records are kept, unformatted, in a ring buffer
+    of the last `capacity` of them, so the block uses the same memory however
+    much is logged; `dropped` counts those pushed out of it, and `counts` the
+    records of each level name. A record is formatted only when it's first
+    shown, with the handler's formatter, and the formatted text is kept with it.
+
+    The newest records are at the bottom, colored by level. Logging a record
+    only marks the block as changed if it isn't already, and the block is shown
+    at most max_refresh_rate times a second, so a burst of records is shown in
+    one frame.
+
+    Args:
+        capacity (int): the most records kept
+        level (int): the lowest level of the records shown
+        fmt (str): the format of the records, for a logging.Formatter
+    '''
+    max_refresh_rate = 10
+
+    def __init__(self,
+                 name=None,
+                 capacity=1000,
+                 level=logging.NOTSET,
+                 fmt='%(asctime)s %(levelname)s %(name)s: %(message)s',
+                 w_sizepref=SizePref(hard_min=0, hard_max=float('inf')),
+                 h_sizepref=SizePref(hard_min=0, hard_max=float('inf'))):
+        super().__init__(name=name, w_sizepref=w_sizepref, h_sizepref=h_sizepref)
+        self._records = deque(maxlen=capacity)  # [record, its formatted rows, or None]
+        self.dropped = 0
+        self.counts = Counter()
+        self._changed = False  # whether records have come in since the block was last shown
+        self.handler = _Handler(self, level)
+        self.handler.setFormatter(logging.Formatter(fmt))
+        self._loggers = []
+
+    def __repr__(self):
+        return '<LoggingBlock name={0} records={1}>'.format(self.name, len(self._records))
+
+    def __len__(self):
+        return len(self._records)
+
+    def install(self, logger=None):
+        '''Show the records logged to a logger, or its name, the root logger by default.'''
+        logger = logger if isinstance(logger, logging.Logger) else logging.getLogger(logger)
+        logger.addHandler(self.handler)
+        self._loggers.append(logger)
+        return self
+
+    def uninstall(self):
+        for logger in self._loggers:
+            logger.removeHandler(self.handler)
+        self._loggers = []
+
+    def clear(self):
+        '''Forget the records kept, and start dropped and counts over.'''
+        with self.write_lock:
+            self._records.clear()
+            self.dropped = 0
+            self.counts.clear()
+        self.mark_dirty()
+
+    def add(self, record):
+        '''Keep a record to be shown. Called by the handler.'''
+        with self.write_lock:
+            if len(self._records) == self._records.maxlen:
+                self.dropped += 1
+            self._records.append([record, None])
+            self.counts[record.levelname] += 1
+            changed, self._changed = self._changed, True
+        if not changed:
+            self.mark_dirty()
+
+    def _rows(self, entry):
+        # The rows of a record, formatted the first time they're needed
+        if entry[1] is None:
+            record = entry[0]
+            tag = next(tag for level, tag in LEVEL_TAGS if record.levelno >= level)
+            text = self.handler.format(record)
+            entry[1] = [(tag, row.replace('\t', '    ')) for row in text.split('\n')]
+        return entry[1]
+
+    def display(self, width, height, x, y, term=None):
+        with self.write_lock:
+            self._changed = False
+            rows = []
+            for entry in reversed(self._records):  # newest first, until the block is full
+                if len(rows) >= height:
+                    break
+                rows[:0] = self._rows(entry)
+            rows = rows[max(0, len(rows) - height):] if height > 0 else []
+            out = [''] * (max(0, height) - len(rows))
+            for tag, row in rows:
+                line = pad(row, width).replace('{', '{{').replace('}', '}}')
+                out.append(tag + line + '{t.normal}' if tag else line)
+            out = [row or ' ' * max(0, width) for row in out]
+        if term:
+            for j, row in enumerate(out):
+                with term.location(x=x, y=y+j):
+                    print(row.format(t=term), end='')
+        else:
+            return out  # the rows the Runner encodes
+
+
+class _Handler(logging.Handler):
+    # Passes the records logged on to a LoggingBlock
+    def __init__(self, block, level):
+        super().__init__(level)
+        self.block = block
+
+    def emit(self, record):
+        try:
+            self.block.add(record)
+        except Exception:
+            self.handleError(record)
@@ -0,0 +1,106 @@
+from bisect import bisect_right
+from collections import namedtuple
+import re
+
+'''
+Mouse events, and finding the block under the mouse.
+
+With mouse reporting on, the terminal sends each click and turn of the wheel
+as an SGR mouse report (CSI < button ; column ; row M, or m for a release) in
+with the keys typed. mouse_events() picks them out of the keystrokes read,
+whether blessed read a report as a single keystroke or as one per character.
+
+A SpatialIndex maps each cell of the screen to the block displayed in it. It's
+built from the rectangles of the blocks when the layout changes, as bands of
+rows with the same blocks in them, each holding the columns where blocks start,
+so finding the block at a cell is two binary searches, whatever the number of
+blocks.
+'''
+
+# button is 'left', 'middle', 'right', 'scroll_up' or 'scroll_down', action
+# 'press' or 'release', x and y the cell on the screen, and col and row the cell
+# relative to the top left of the block the event is passed to.
+MouseEvent = namedtuple('MouseEvent', 'button action x y col row shift meta ctrl')
+
+_REPORT = re.compile(r'\x1b\[<(\d+);(\d+);(\d+)([Mm])')
+_BUTTONS = {0: 'left', 1: 'middle', 2: 'right', 64: 'scroll_up', 65: 'scroll_down'}
+
+# Turn on reporting of clicks and the wheel, in SGR format, and back off
+ENABLE = '\x1b[?1000h\x1b[?1006h'
+DISABLE = '\x1b[?1006l\x1b[?1000l'
+
+def parse(report):
+    '''Returns the MouseEvent for an SGR mouse report, or None if it isn't one
+    of the buttons we know.
+    '''
+    match = _REPORT.match(report)
+    if not match:
+        return None
+    code, x, y = (int(n) for n in match.groups()[:3])
+    button = _BUTTONS.get(code & ~(4 | 8 | 16 | 32))
+    if not button or code & 32:  # motion
+        return None
+    action = 'release' if match.group(4) == 'm' else 'press'
+    return MouseEvent(button, action, x - 1, y - 1, x - 1, y - 1,
+                      bool(code & 4), bool(code & 8), bool(code & 16))
+
+def _partial(text):
+    # Whether text could be the start of a mouse report
+    prefix = '\x1b[<'
+    if len(text) <= len(prefix):
+        return prefix.startswith(text)
+    return text.startswith(prefix) and re.match(r'^[\d;]*$', text[len(prefix):]) is not None
+
+def mouse_events(keys):
+    '''Splits keystrokes into the mouse events among them and the other keys.
+    Returns (events, keys).
+    '''
+    events, others, pending = [], [], []
+    for key in keys:
+        text = ''.join(pending) + key
+        if _REPORT.fullmatch(text):
+            event = parse(text)
+            if event:
+                events.append(event)
+            pending = []
+        elif _partial(text):
+            pending.append(key)
+        else:
+            others.extend(pending)
+            others.append(key)
+            pending = []
+    others.extend(pending)
+    return events, others
+
+
+class SpatialIndex(object):
+    '''Finds the block displayed at a cell of the screen.
+
+    Args:
+        rects (list): (block, x, y, w, h) tuples, with blocks nested in others,
+                      like those in a FramedBlock, after the blocks containing them
+    '''
+    def __init__(self, rects):
+        rects = [r for r in rects if r[3] > 0 and r[4] > 0]
+        self._ys = sorted({y for _, _, y, _, _ in rects} | {y + h for _, _, y, _, h in rects})
+        self._bands = []  # for each band of rows, (xs where blocks start, the blocks)
+        for top in self._ys:
+            inside = [r for r in rects if r[2] <= top < r[2] + r[4]]
+            xs = sorted({x for _, x, _, _, _ in inside} | {x + w for _, x, _, w, _ in inside})
+            blocks = []
+            for left in xs:
+                covering = [r[0] for r in inside if r[1] <= left < r[1] + r[3]]
+                blocks.append(covering[-1] if covering else None)  # the innermost
+            self._bands.append((xs, blocks))
+
+    def __len__(self):
+        return len(self._bands)
+
+    def block_at(self, x, y):
+        '''Returns the block displayed at cell x, y, or None.'''
+        band = bisect_right(self._ys, y) - 1
+        if band < 0:
+            return None
+        xs, blocks = self._bands[band]
+        i = bisect_right(xs, x) - 1
+        return blocks[i] if i >= 0 else None
@@ -0,0 +1,48 @@
+'''
+Overlays are blocks shown above the tiled layout of the Runner's grid, like
+popups, help screens and alerts, without changing the layout.
+
+Each overlay has its own rectangle on the screen, centered by default, and a z
+order; those with higher z are on top, and of those with the same z, the one
+shown last. The Runner composites them as it renders a frame: the columns of
+each row covered by an overlay are hidden in the segments of everything below
+it, so the Encoder never writes over it. Only the segments crossing an overlay
+are written again when it's shown, moved or dismissed; the rest of the screen,
+and the layout, are left alone.
+'''
+
+class Overlay(object):
+    '''A block shown above the Runner's grid. Show it with Runner.show_overlay().
+
+    Args:
+        block (Block): what's shown
+        w (int), h (int): the size of the overlay, cut down to fit the screen
+        x (int), y (int): the top left corner, None to center the overlay
+        z (int): the overlay's place in the stack, higher on top
+    '''
+    def __init__(self, block, w, h, x=None, y=None, z=0):
+        self.block = block
+        self.w = w
+        self.h = h
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __repr__(self):
+        return '<Overlay block={0} z={1}>'.format(self.block, self.z)
+
+    def move(self, x, y):
+        self.x, self.y = x, y
+        self.block.mark_dirty()  # wakes up the Runner
+
+    def resize(self, w, h):
+        self.w, self.h = w, h
+        self.block.mark_dirty()
+
+    def rect(self, width, height):
+        '''Returns the (x, y, w, h) of the overlay on a screen of the given size.'''
+        w, h = max(0, min(self.w, width)), max(0, min(self.h, height))
+        x = (width - w) // 2 if self.x is None else self.x
+        y = (height - h) // 2 if self.y is None else self.y
+        x, y = max(0, min(x, width - w)), max(0, min(y, height - h))
+        return x, y, w, h
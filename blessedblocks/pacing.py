@@ -0,0 +1,66 @@
+from time import monotonic
+
+class FramePacer(object):
+    '''Paces the frames of a Runner to what its output channel can drain.
+
+    After each frame is written, the Runner reports how many bytes it wrote and how
+    long the write took. A write to a terminal that keeps up returns almost at once,
+    but over a slow link it blocks until the pty or socket buffer drains. The pacer
+    keeps a moving average of the write time and spaces frames out so that writing
+    takes up at most `duty` of the time. That lowers the frame rate when the output
+    falls behind, so the next frame shows the latest state of every block instead
+    of queueing up behind stale ones, and raises it again once the output catches up.
+
+    Frames are paced by write time alone. `throughput`, the rate at which blocking
+    writes drained, is only a statistic, for showing or logging how fast the link
+    is: a write that doesn't block has found room in the buffer, so the link has
+    caught up, and charging its bytes against the throughput would hold back
+    frames the output has room for.
+
+    Not thread-safe; it's used only by the Runner's own thread, though its statistics
+    can be read from anywhere.
+
+    Args:
+        max_frame_rate (float): frames per second never to exceed, or None for no limit
+        duty (float): the fraction of the time the Runner may spend writing
+        smoothing (float): the weight of the latest frame in the moving averages
+        max_interval (float): the longest the pacer will hold off a frame, in seconds
+    '''
+    def __init__(self, max_frame_rate=None, duty=.5, smoothing=.25, max_interval=2.0):
+        self.min_interval = 1.0 / max_frame_rate if max_frame_rate else 0.0
+        self.max_interval = max_interval
+        self.duty = duty
+        self.smoothing = smoothing
+        self.frames = 0
+        self.bytes = 0
+        self.write_time = 0.0  # moving average, in seconds per frame
+        self.throughput = None  # moving average, in bytes per second, of blocking writes; not used for pacing
+        self._last_start = None
+
+    def __repr__(self):
+        return ('<FramePacer frames={0} bytes={1} interval={2:.3f}>'
+                .format(self.frames, self.bytes, self.interval))
+
+    @property
+    def interval(self):
+        '''The time between the starts of frames, in seconds.'''
+        return min(self.max_interval, max(self.min_interval, self.write_time / self.duty))
+
+    def wrote(self, num_bytes, seconds):
+        '''Record a frame of num_bytes that took the given number of seconds to write.'''
+        self._last_start = monotonic() - seconds
+        self.frames += 1
+        self.bytes += num_bytes
+        self.write_time += self.smoothing * (seconds - self.write_time)
+        if num_bytes and seconds > .001:  # only blocking writes say anything about the link
+            rate = num_bytes / seconds
+            if self.throughput is None:
+                self.throughput = rate
+            else:
+                self.throughput += self.smoothing * (rate - self.throughput)
+
+    def delay(self):
+        '''Returns the number of seconds to wait before starting the next frame.'''
+        if self._last_start is None:
+            return 0.0
+        return max(0.0, self._last_start + self.interval - monotonic())
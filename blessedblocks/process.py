@@ -0,0 +1,207 @@
+from .block import SizePref
+from .blocks import BareBlock
+from .ansi import AnsiParser, clean_row
+from collections import deque
+from subprocess import Popen, PIPE, STDOUT, DEVNULL
+from threading import Lock
+from time import monotonic
+import codecs
+import os
+import re
+import shlex
+
+# What programs that redraw the screen, like top without -b, write between screens
+_NEW_SCREEN = re.compile(r'\x0c|\x1b\[2J|\x1b\[H')
+
+class CommandBlock(BareBlock):
+    '''A block showing the output of a command, which is read as it's written.
+
+    The command is started once, when the block is started, and its output is read
+    from a non-blocking pipe by a task polled by the Runner's scheduler, so no
+    thread waits on it. Output is split into rows as it arrives, and the text of
+    the block is updated at most once per poll.
+
+    What's shown depends on the kind of command:
+
+      * A command that streams rows, like `tail -f` or `vmstat 1`, shows its
+        latest rows, up to max_rows of them. If there are more than fit in the
+        block, those at the top are cut off.
+      * A command that writes frames, like `top -b`, shows its latest complete
+        frame. A frame starts with a row matching the frame_start regex (for
+        example, '^top - '), or with a form feed or clear-screen sequence.
+      * A command that exits, like `df -h`, shows the output of its latest run,
+        and if refresh is given, it's run again refresh seconds after it last
+        started, once the previous run has finished, unless the block is hidden.
+
+    The command is given the size of the block, once a Runner has displayed it, in
+    the COLUMNS and LINES environment variables, and in place of {width} and
+    {height} in its arguments, as in `top -b -w {width}`. A command with either
+    of those in its arguments isn't started until the block is visible, and is
+    started again whenever the size changes.
+
+    Args:
+        cmd (str or list): the command, split by shlex if a string
+        refresh (float): seconds between runs of a command that exits, or None to run it once
+        frame_start (str): a regex matching the first row of each frame
+        max_rows (int): the most rows kept
+        poll_interval (float): seconds between reads of the command's output
+        ansi (bool): whether to keep the colors of the output, or drop them
+    '''
+    def __init__(self,
+                 cmd,
+                 name=None,
+                 refresh=None,
+                 frame_start=None,
+                 max_rows=1000,
+                 poll_interval=.1,
+                 ansi=True,
+                 hjust='<',
+                 vjust='^',
+                 w_sizepref=SizePref(hard_min=0, hard_max=float('inf')),
+                 h_sizepref=SizePref(hard_min=0, hard_max=float('inf'))):
+        super().__init__(name=name, hjust=hjust, vjust=vjust, block_just=False,
+                         w_sizepref=w_sizepref, h_sizepref=h_sizepref)
+        self.cmd = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+        self.refresh = refresh
+        self._parser = AnsiParser() if ansi else None
+        self.frame_start = re.compile(frame_start) if frame_start else None
+        self.poll_interval = poll_interval
+        self.returncode = None
+        self._rows = deque(maxlen=max_rows)  # the rows being read
+        self._frame = None  # the latest complete frame, once there is one
+        self._partial = ''  # the start of a row still being written
+        self._proc = None
+        self._fd = None
+        self._decoder = None
+        self._started = None
+        self._size = None  # the size the command was started for
+        self._sized = any('{width}' in arg or '{height}' in arg for arg in self.cmd)
+        self._task = None
+        self._stopped = False
+        self._poll_lock = Lock()  # polls may run on any scheduler worker
+
+    def __repr__(self):
+        return '<CommandBlock name={0} cmd={1}>'.format(self.name, ' '.join(self.cmd))
+
+    def start(self, runner):
+        '''Start the command, and poll its output on the runner's scheduler.
+        The command is killed when the runner stops, or the block is stopped.
+        '''
+        self._task = runner.schedule(self.poll, self.poll_interval)
+        self._task.on_cancel = self._kill
+        self.poll()
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+        else:
+            self._kill()
+
+    def text_rows(self, height):
+        rows = super().text_rows(height)
+        if self._frame is None and len(rows) > height:  # streaming, keep the latest
+            return rows[len(rows) - height:]
+        return rows
+
+    def poll(self):
+        '''Read what the command has written, starting it again if it's due.'''
+        with self._poll_lock:
+            if self._stopped:
+                return
+            # Blocks in a Runner have been given a size by the time they're visible
+            shown = self.visible or self.dirty_event_q is None
+            if self._sized and self._proc is not None and self.visible and self.allocated != self._size:
+                self._end()  # the output no longer fits
+                self._started = None
+            if self._proc is None:
+                if self._started is not None and (
+                        self.refresh is None or monotonic() < self._started + self.refresh):
+                    return
+                if not shown or (self._sized and not self.visible):
+                    return
+                self._launch()
+            if self._read():
+                self._update()
+
+    def _launch(self):
+        self._started = monotonic()
+        cmd, env = self.cmd, None
+        if self.visible:
+            self._size = width, height = self.allocated
+            cmd = [arg.replace('{width}', str(width)).replace('{height}', str(height))
+                   for arg in cmd]
+            env = dict(os.environ, COLUMNS=str(width), LINES=str(height))
+        self._proc = Popen(cmd, stdin=DEVNULL, stdout=PIPE, stderr=STDOUT, env=env)
+        self._fd = self._proc.stdout.fileno()
+        os.set_blocking(self._fd, False)
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._partial = ''
+        if self._parser:
+            self._parser.reset()
+        if self.refresh is not None:  # each run is a frame
+            self._rows.clear()
+
+    def _read(self):
+        # Returns whether there were any new rows
+        chunks = []
+        eof = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                eof = True
+                break
+            chunks.append(data)
+        text = self._decoder.decode(b''.join(chunks), final=eof)
+        changed = False
+        if text:
+            rows = (self._partial + text).split('\n')
+            self._partial = rows.pop()
+            for row in rows:
+                self._add_row(row)
+            changed = bool(rows)
+        if eof:
+            if self._partial:
+                self._add_row(self._partial)
+                self._partial = ''
+            self._proc.stdout.close()
+            self.returncode = self._proc.wait()
+            self._proc = None
+            if self.refresh is not None or self.frame_start or self._frame is not None:
+                self._frame = list(self._rows)
+            changed = True
+        return changed
+
+    def _add_row(self, row):
+        parts = _NEW_SCREEN.split(row)
+        for i, part in enumerate(parts):
+            if i or (self.frame_start and self.frame_start.search(part)):
+                self._end_frame()
+            part = clean_row(part, self._parser)
+            if part or not i:
+                self._rows.append(part)
+
+    def _end_frame(self):
+        if self._rows and self.refresh is None:
+            self._frame = list(self._rows)
+        self._rows.clear()
+
+    def _update(self):
+        rows = self._frame if self._frame is not None else self._rows
+        text = '\n'.join(rows)
+        if text != self.text:
+            self.text = text
+
+    def _kill(self):
+        with self._poll_lock:
+            self._stopped = True
+            self._end()
+
+    def _end(self):
+        if self._proc:
+            self._proc.kill()
+            self._proc.stdout.close()
+            self._proc.wait()
+            self._proc = None
@@ -0,0 +1,180 @@
+from .backends import Backend, AnsiBackend, AnsiSequences
+from time import monotonic, sleep, time
+import argparse
+import gzip
+import json
+
+'''
+Records the frames of a Runner to a file, and plays them back.
+
+A CastBackend wraps the Runner's local backend, if it has one, and writes
+every frame to an asciicast v2 file (the format of asciinema), so a recording
+can be played with asciinema too. The frames are what the Runner's Encoder
+wrote, so each one holds only what changed since the one before it. The file
+is gzipped if its name ends in .gz, which typically shrinks it tenfold.
+
+The first line of the file is a JSON header, with the size of the screen and
+the time recording started. Every line after it is an event:
+
+    [seconds since the start, "o", the text of a frame]
+    [seconds since the start, "r", "WIDTHxHEIGHT"], when the screen is resized
+
+replay() writes the frames of a recording to a backend, at the speed they were
+recorded, or faster or slower, or as fast as the backend takes them: to a
+terminal, to look at what was on the screen, or to a NullBackend, as a
+repeatable load for benchmarks. The backend is resized to the size recorded,
+if it can be. Frames before `start` are written without any waiting, since
+each one builds on those before it.
+
+Play one on the terminal with `python -m blessedblocks.recording FILE`.
+'''
+
+def _open(path, mode):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class CastBackend(Backend):
+    '''Writes frames to the local backend, if any, and records them to a file.
+
+    Args:
+        path (str): the file to record to, gzipped if it ends in .gz
+        backend (Backend): where the frames are shown locally, None for nowhere
+        size (tuple): the (width, height) of the screen, when there's no local backend
+        flush_interval (float): the most seconds of frames that are lost if the program dies
+    '''
+    def __init__(self, path, backend=None, size=(80, 24), flush_interval=1.0):
+        self.path = path
+        self._backend = backend
+        self._size = size
+        self.sequences = backend.sequences if backend else AnsiSequences()
+        self.term = getattr(backend, 'term', None)  # for keyboard input
+        self.flush_interval = flush_interval
+        self._file = _open(path, 'w')
+        self._file.write(json.dumps({'version': 2, 'width': self.width, 'height': self.height,
+                                     'timestamp': int(time())}) + '\n')
+        self._start = self._flushed = monotonic()
+        self._recorded_size = (self.width, self.height)
+        self.frames = 0
+
+    def __repr__(self):
+        return '<CastBackend path={0} frames={1}>'.format(self.path, self.frames)
+
+    @property
+    def width(self): return self._backend.width if self._backend else self._size[0]
+
+    @property
+    def height(self): return self._backend.height if self._backend else self._size[1]
+
+    def resize(self, width, height):
+        self._size = (width, height)
+
+    def fullscreen(self):
+        return self._backend.fullscreen() if self._backend else super().fullscreen()
+
+    def hidden_cursor(self):
+        return self._backend.hidden_cursor() if self._backend else super().hidden_cursor()
+
+    def mouse(self):
+        return self._backend.mouse() if self._backend else super().mouse()
+
+    def wants_keyframe(self):
+        return self._backend.wants_keyframe() if self._backend else False
+
+    def write(self, frame):
+        num_bytes = self._backend.write(frame) if self._backend else len(frame.encode('utf-8'))
+        if frame and not self._file.closed:
+            now = monotonic()
+            elapsed = round(now - self._start, 6)
+            size = (self.width, self.height)
+            if size != self._recorded_size:
+                self._recorded_size = size
+                self._file.write(json.dumps([elapsed, 'r', '{0}x{1}'.format(*size)]) + '\n')
+            self._file.write(json.dumps([elapsed, 'o', frame]) + '\n')
+            self.frames += 1
+            if now - self._flushed >= self.flush_interval:
+                self._file.flush()
+                self._flushed = now
+        return num_bytes
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if self._backend:
+            self._backend.close()
+
+
+def read_cast(path):
+    '''Returns the header of a recording, and an iterator over its events, as
+    (seconds, kind, data) tuples.
+    '''
+    f = _open(path, 'r')
+    header = json.loads(f.readline())
+    if header.get('version') != 2:
+        f.close()
+        raise ValueError('{} is not an asciicast v2 file'.format(path))
+    def events():
+        with f:
+            for line in f:
+                if line.strip():
+                    yield tuple(json.loads(line))
+    return header, events()
+
+def replay(path, backend=None, speed=1.0, start=0.0, max_idle=None):
+    '''Write the frames of a recording to a backend, the terminal by default.
+
+    Args:
+        speed (float): how many times faster than recorded to play, 0 for as fast as possible
+        start (float): the seconds into the recording to start playing at
+        max_idle (float): the longest wait between frames, however long it was recorded
+    Returns:
+        (frames, bytes), the number of frames and bytes written
+    '''
+    backend = backend if backend else AnsiBackend()
+    header, events = read_cast(path)
+    resize = getattr(backend, 'resize', None)
+    if resize and 'width' in header and 'height' in header:
+        resize(header['width'], header['height'])  # the size the first frames were written for
+    frames = num_bytes = 0
+    clock = None  # (recorded seconds, monotonic time) to play in step with
+    prev = start
+    for seconds, kind, data in events:
+        if kind == 'r':
+            if resize:
+                resize(*(int(n) for n in data.split('x')))
+            continue
+        if kind != 'o':
+            continue
+        if speed and seconds >= start:
+            if clock is None:
+                clock = [seconds, monotonic()]
+            elif max_idle is not None and seconds - prev > max_idle:
+                clock[0] += seconds - prev - max_idle  # cut the pause short
+            prev = seconds
+            delay = clock[1] + (seconds - clock[0]) / speed - monotonic()
+            if delay > 0:
+                sleep(delay)
+        num_bytes += backend.write(data)
+        frames += 1
+    return frames, num_bytes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m blessedblocks.recording',
+                                     description='Play a recording of a Runner on the terminal.')
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=1.0, help='0 for as fast as possible')
+    parser.add_argument('--start', type=float, default=0.0, help='seconds into the recording')
+    parser.add_argument('--max-idle', type=float, default=None, help='longest pause, in seconds')
+    args = parser.parse_args(argv)
+    backend = AnsiBackend()
+    with backend.fullscreen():
+        with backend.hidden_cursor():
+            try:
+                replay(args.path, backend, args.speed, args.start, args.max_idle)
+                input()  # keep the last frame up until Enter
+            except (KeyboardInterrupt, EOFError):
+                pass
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,20 @@
 from __future__ import print_function
 from blessed import Terminal
 from .block import Block, Grid, SizePref, DEFAULT_SIZE_PREF
-from .debug import debug_q
+from .blocks import FramedBlock
+from .encoder import Encoder
+from .pacing import FramePacer
+from .backends import BlessedBackend
+from .keyboard import KeyReader
+from .commands import CommandExecutor
+from .scheduler import Scheduler
+from .mouse import SpatialIndex, mouse_events
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError
 from math import floor, ceil
-from threading import Event, Thread, RLock, current_thread
+from threading import Event, Thread, RLock, Timer, current_thread
 from queue import Queue, Empty
-from time import sleep
+from time import sleep, monotonic
 import signal
 import logging
 
@@ -75,26 +84,63 @@ class Plot(object):
 
 class Runner(object):
 
-    def __init__(self, grid, stop_event=None):
+    def __init__(self, grid, stop_event=None, max_frame_rate=None, backend=None,
+                 cmd_workers=4, cmd_timeout=30, task_workers=4, mouse=False,
+                 frame_budget=None, render_workers=4, render_processes=None):
 
         self._grid = grid
         self._plot = Plot()
         self._done = Event()
-        self._term = Terminal()
+        self._backend = backend if backend else BlessedBackend()
+        # The terminal is still where keyboard input comes from
+        self._term = getattr(self._backend, 'term', None) or Terminal()
         self._lock = RLock()
         self._stop_event = stop_event
         self._root_plot = None
+        self._encoder = Encoder(self._backend.sequences)
+        self._placements = None
+        self._segments = {}  # block -> ((w, h), segments) of the last frame
+        self._mouse = mouse
+        self._index = None  # the SpatialIndex of the placements, built when first needed
+        self._rects = {}  # block -> (x, y, w, h), for the blocks in _index and those containing them
+        self._overlays = []  # in the order they were shown
+        self._overlay_rects = []  # (block, x, y, w, h) of the overlays, bottom to top
+        self._overlay_timers = {}  # overlay -> the Timer that hides it
+        self._allocations = {}  # block -> (w, h) in the last frame
+        self._reallocated = []  # blocks whose size changed in the last frame rendered
+        # Seconds a frame may spend displaying blocks before changes to those
+        # without priority are held back for the next one, None for no limit
+        self.frame_budget = frame_budget
+        self._due = None  # when the earliest change held back is due to be shown
+        self._held = {}  # block -> frames in a row its change was held back for the budget
+        # Pools for blocks with render_async, started when first needed
+        self._render_workers = render_workers
+        self._render_processes = render_processes
+        self._pools = {}  # 'thread' or 'process' -> executor
+        self._rendering = {}  # block -> its (w, h), for blocks being displayed in a pool
+        self.pacer = FramePacer(max_frame_rate)
         self.rebuild_plot_q = Queue()
+        self._keys = None  # the KeyReader of the io thread, opened by start()
+        # Commands from the input block run on their own threads, so a slow
+        # handler never holds up a frame. They're started one at a time, so
+        # one that hangs would hold up every command after it if it weren't
+        # given up on after cmd_timeout seconds (None for never).
+        self._commands = CommandExecutor(self._handle_cmd, self._report_cmd,
+                                         cmd_workers, cmd_timeout)
+        # Periodic tasks, like refreshing the text of blocks, share one timer
+        # thread and a bounded pool of workers.
+        self._scheduler = Scheduler(task_workers)
+        self._thread = self._io_thread = None
         self.load(self._grid)
 
     def __repr__(self):
         return 'runner'
 
     def term_width(self):
-        return self._term.width
+        return self._backend.width
 
     def term_height(self):
-        return self._term.height
+        return self._backend.height
 
     def _on_kill(self, *args):
         if self._grid._cmds:
@@ -120,98 +166,230 @@ class Runner(object):
             args=()
         )
 
-        if self._grid._cmds:
+        if self._grid._cmds or self._mouse:
+            self._keys = KeyReader(self._term)
             self._io_thread = Thread(name='io', target=self._read_cmd, args=())
 
         signal.signal(signal.SIGWINCH, self._on_resize)
         signal.signal(signal.SIGINT, self._on_kill)
 
-        if self._grid._cmds:
+        if self._io_thread:
             self._io_thread.start()
         self._thread.start()
 
     def stop(self, *args):
-        self._term.clear()
         if not self._done.is_set():
             self._done.set()
+            # Wake up both threads rather than waiting for them to time out
             self.rebuild_plot_q.put('')  # '' is empty cmd
-
-            if (self._thread and self._thread.isAlive() and
+            if self._keys:
+                self._keys.wake()
+            self._commands.shutdown()
+            self._scheduler.shutdown()
+            for pool in self._pools.values():
+                pool.shutdown(wait=False)
+            with self._lock:
+                for timer in self._overlay_timers.values():
+                    timer.cancel()
+                self._overlay_timers = {}
+
+            if (self._thread and self._thread.is_alive() and
                 self._thread.name != current_thread().name):
                 self._thread.join()
-            if (self._io_thread and self._io_thread.isAlive() and
+            if (self._io_thread and self._io_thread.is_alive() and
                 self._io_thread.name != current_thread().name):
                 self._io_thread.join()
+            if self._keys:
+                self._keys.close()  # the io thread is done reading, or is about to be
+            self._backend.close()
 
     def done(self):
-        return not self._thread.isAlive() or self._done.is_set()
+        return not self._thread or not self._thread.is_alive() or self._done.is_set()
 
     def _read_cmd(self):
         PROMPT = ''
         with self._term.cbreak():
-            if 'input' not in self._grid._names:
+            input_block = self._grid._names.get('input') if self._grid._cmds else None
+            if not input_block and not self._mouse:
                 return
-            input_block = self._grid._names['input']
-            input_block.text = PROMPT
-            while True:
-                val = self._term.inkey(timeout=.5)
-                if not val:  # timeout
-                    if self._done.is_set():
-                        break
-                    continue
+            if input_block:
+                input_block.text = PROMPT
+            while not self._done.is_set():
+                keys = self._keys.read()  # returns at once when stop() is called
+                if self._mouse:
+                    events, keys = mouse_events(keys)
+                    for event in events:
+                        self._handle_mouse(event)
+                if keys and input_block:
+                    self._handle_keys(input_block, keys, PROMPT)
+
+    # Apply a burst of keystrokes to the input block, updating its text and
+    # status once at the end rather than once per key. Once a command is
+    # submitted, its status is left to _report_cmd.
+    def _handle_keys(self, input_block, keys, prompt=''):
+        with input_block.write_lock:
+            text, status = input_block.text, input_block.status
+        for val in keys:
+            if status is not None:
+                status = input_block.default_status
+            if val.is_sequence:
+                if val.name == 'KEY_ENTER':
+                    # if not cmd: ??? maybe refresh something? or redo previous?
+                    if text in self._grid._cmds:
+                        self._commands.submit(text)
+                        status = None
+                    elif text:
+                        status = 'Unknown command: {}'.format(text)
+                    text = prompt
+                elif val.name == 'KEY_DELETE':
+                    text = text[:-1]
+                elif val.name == 'KEY_ESCAPE':
+                    pass  # hmmmm
                 else:
-                    input_block.status = input_block.default_status
-                if val.is_sequence:
-                    if val.name == 'KEY_ENTER':
-                        # if not cmd: ??? maybe refresh something? or redo previous?
-                        if input_block.text in self._grid._cmds:
-                            self.rebuild_plot_q.put(input_block.text)
-                        elif input_block.text:
-                            input_block.status = 'Unknown command: {}'.format(input_block.text)
-                        input_block.text = PROMPT
-                    elif val.name == 'KEY_DELETE':
-                        input_block.text = input_block.text[:-1]
-                    elif val.name == 'KEY_ESCAPE':
-                        pass  # hmmmm
-                    else:
-                        # TODO ignore?
-                        input_block.text = PROMPT
+                    # TODO ignore?
+                    text = prompt
+            else:
+                if not val.isalnum():
+                    if ord(val) == 4:  # ctl-d
+                        input_block.status = 'Exiting'
+                        if self._stop_event:
+                            self._stop_event.set()
+                        self.stop()
+                        return
+                    if ord(val) == 32: # space
+                        text += Block.MIDDLE_DOT
+                elif not text and val in self._grid._cmds:
+                    # Handles one-char-no-return commands
+                    self._commands.submit(val)
+                    status = None
                 else:
-                    if not val.isalnum():
-                        if ord(val) == 4:  # ctl-d
-                            input_block.status = 'Exiting'
-                            if self._stop_event:
-                                self._stop_event.set()
-                            self.stop()
-                        if ord(val) == 32: # space
-                            input_block.text += Block.MIDDLE_DOT
-                    elif not input_block.text and val in self._grid._cmds:
-                        # Handles one-char-no-return commands
-                        self.rebuild_plot_q.put(val)
+                    text += val
+        with input_block.write_lock:
+            if status is not None:
+                input_block.status = status
+            input_block.text = text
+
+    # Pass a mouse event to the block under it, and on up to the blocks
+    # containing it until one of them handles it. Returns that block.
+    def _handle_mouse(self, event):
+        with self._lock:
+            block = self._spatial_index().block_at(event.x, event.y)
+            rects = self._rects
+        while block is not None and block in rects:
+            x, y, _, _ = rects[block]
+            if block.on_mouse(event._replace(col=event.x - x, row=event.y - y)):
+                return block
+            block = block.parent
+        return None
+
+    # Returns (block, path) for the block displayed at x, y, where path is the
+    # slots leading to it from the Runner's grid, or None.
+    def block_at(self, x, y):
+        with self._lock:
+            block = self._spatial_index().block_at(x, y)
+        return (block, block.path) if block else None
+
+    # The index of the blocks' places on the screen, rebuilt only after the layout changes
+    def _spatial_index(self):
+        if self._index is None:
+            placements = (Runner._with_framed(self._placements or []) +
+                          Runner._with_framed(self._overlay_rects))
+            rects = {}
+            for block, x, y, w, h in placements:
+                b = block
+                while b is not None:  # blocks with grids cover all their blocks
+                    if b in rects:
+                        x0, y0, w0, h0 = rects[b]
+                        x1, y1 = min(x, x0), min(y, y0)
+                        rects[b] = (x1, y1, max(x + w, x0 + w0) - x1, max(y + h, y0 + h0) - y1)
                     else:
-                        input_block.text += val
+                        rects[b] = (x, y, w, h)
+                    b = b.parent
+            self._rects = rects
+            self._index = SpatialIndex(placements)
+        return self._index
+
+    # The rects with, after each FramedBlock, the block displayed by the
+    # FramedBlock itself, which is clickable on its own.
+    def _with_framed(rects):
+        out = []
+        placed = {r[0] for r in rects}
+        for block, x, y, w, h in rects:
+            out.append((block, x, y, w, h))
+            if isinstance(block, FramedBlock) and block.block not in placed:
+                out.append((block.block,) + tuple(block.inner_rect(x, y, w, h)))
+        return out
+
+    # Show a block above the grid, on top of the overlays already shown with
+    # the same z, for duration seconds if that's given. Showing an overlay
+    # again starts its duration over. Returns the Overlay.
+    def show_overlay(self, overlay, duration=None):
+        with self._lock:
+            if overlay in self._overlays:
+                self._overlays.remove(overlay)
+            self._overlays.append(overlay)
+            self._attach(overlay.block, None, ('overlay',))
+            self._cancel_timer(overlay)
+            if duration is not None and not self._done.is_set():
+                timer = Timer(duration, lambda: self._expire(overlay, timer))
+                timer.daemon = True
+                self._overlay_timers[overlay] = timer
+                timer.start()
+        self.update()
+        return overlay
+
+    def hide_overlay(self, overlay):
+        with self._lock:
+            self._cancel_timer(overlay)
+            if overlay in self._overlays:
+                self._overlays.remove(overlay)
+        self.update()
+
+    def _cancel_timer(self, overlay):
+        timer = self._overlay_timers.pop(overlay, None)
+        if timer:
+            timer.cancel()
+
+    # Hide an overlay when its duration is up, unless it's been shown again since
+    def _expire(self, overlay, timer):
+        with self._lock:
+            if self._overlay_timers.get(overlay) is timer:
+                self.hide_overlay(overlay)
+
+    # Pass the cmd to the grid. This runs on a command worker thread.
+    def _handle_cmd(self, cmd):
+        handler = self._grid.handler
+        if handler:
+            return handler(cmd)
+
+    # Show the status of a command in the input block
+    def _report_cmd(self, cmd, status):
+        input_block = self._grid._names.get('input')
+        if input_block:
+            input_block.status = status if status is not None else input_block.default_status
 
     def _run(self):
         self.rebuild_plot_q.put('')  # show at start once
-        with self._term.fullscreen():
-            with self._term.hidden_cursor():
+        with self._backend.fullscreen():
+            with self._backend.hidden_cursor(), self._mouse_reporting():
                 try:
                     while True:
                         if self._done.is_set():
                             break
                         try:
-                            cmd = self.rebuild_plot_q.get(timeout=.5)
-                            if cmd:  # requeue it, we don't process it here
-                                self.rebuild_plot_q.put(cmd)
+                            self.rebuild_plot_q.get(timeout=self._timeout())
                         except Empty:
                             pass
 
-                        with self._lock:
-                            self.load(self._grid)
-                            self.display_plot(self._root_plot,
-                                              0, 0,                                 # x, y
-                                              self._term.width, self._term.height,  # w, h
-                                              self._term)
+                        # Don't start frames faster than the output drains them.
+                        # Changes made in the meantime all show up in the next one.
+                        delay = self.pacer.delay()
+                        if delay and self._done.wait(delay):
+                            break
+                        while not self.rebuild_plot_q.empty():
+                            self.rebuild_plot_q.get()
+
+                        self.draw()
                 except Exception as e:
                     debug = True
                     if debug:
@@ -220,6 +398,19 @@ class Runner(object):
                     self.stop()
                     # TODO. This doesn't successfully stop the application
 
+    @contextmanager
+    def _mouse_reporting(self):
+        if self._mouse:
+            with self._backend.mouse():
+                yield
+        else:
+            yield
+
+    # Call fn(*args, **kwargs) every interval seconds, until stop(). Returns a Task.
+    # A tick is skipped if the previous call hasn't returned yet.
+    def schedule(self, fn, interval, *args, **kwargs):
+        return self._scheduler.schedule(fn, interval, *args, **kwargs)
+
     def update(self):
         if self.rebuild_plot_q.empty():
             self.rebuild_plot_q.put('')  # '' is empty cmd
@@ -227,19 +418,35 @@ class Runner(object):
     def update_block(self, index, block):
         with self._lock:
             self._grid._slots[index] = block
-            block.dirty_event_q = self.rebuild_plot_q
+            self._attach(block, None, (index,))
         self.update()
 
     def load(self, grid):
         with self._lock:
             self._grid = grid
-            for _, block in self._grid._slots.items():
-                block.dirty_event_q = self.rebuild_plot_q
+            self._attach_grid(grid, None, ())
             layout = self._grid._layout
             blocks = self._grid._slots
             self._root_plot = self.build_plot(layout, blocks)
 
 
+    # Hook up every block in the grid, however deeply nested, in other blocks'
+    # grids or in FramedBlocks, to the Runner, so that a change to any of them
+    # wakes it up, and marks the blocks containing it as changed too.
+    def _attach_grid(self, grid, parent, path):
+        for element, block in grid._slots.items():
+            if block:
+                self._attach(block, parent, path + (element,))
+
+    def _attach(self, block, parent, path):
+        block.dirty_event_q = self.rebuild_plot_q
+        block.parent = parent
+        block.path = path
+        if isinstance(block, FramedBlock):
+            self._attach(block.block, block, path + ('block',))
+        elif block.grid:
+            self._attach_grid(block.grid, block, path)
+
     # Gets called at Runner creation, when the terminal is resized, or any
     # part of any block is changed. When any of those happen, we need to rebuild
     # the plot tree. Starting from the root Block, we recurse down all its
@@ -280,12 +487,6 @@ class Runner(object):
 
             return (m_sizepref, s_sizepref) if horizontal else (s_sizepref, m_sizepref)
 
-        while not self.rebuild_plot_q.empty():
-            cmd = self.rebuild_plot_q.get()
-            if cmd:
-                # Pass the cmd to the grid
-                self._grid.handler(cmd)
-
         subplots = []
         if not layout:
             for _, block in blocks.items():
@@ -326,21 +527,7 @@ class Runner(object):
                 return Plot(w_sizepref, h_sizepref, block=block)
         for element in layout:
             if type(element) == int:
-                block = blocks[element]
-                if block.grid:
-                    if block.w_sizepref or block.h_sizepref:
-
-                        temp = self.build_plot(None, {element: block})
-                    subplot = self.build_plot(block.grid._layout,
-                                              block.grid._slots)
-                    if block.w_sizepref:
-                        subplot.w_sizepref = temp.w_sizepref
-                    if block.h_sizepref:
-                        subplot.h_sizepref = temp.h_sizepref
-
-                else:  # it's a leaf block
-                    subplot = self.build_plot(None, {element: block})
-
+                subplot = self.build_block_plot(element, blocks[element])
             else:  # it's list or tuple
                orientation = type(element) == list
                subplot = self.build_plot(element, blocks, orientation)
@@ -348,15 +535,213 @@ class Runner(object):
         w_sizepref, h_sizepref = merge_sizeprefs(subplots, horizontal)
         return Plot(w_sizepref, h_sizepref, horizontal=horizontal, subplots=subplots)
 
-    # Display the plot by recursing down the plot tree built by
+    # Build the plot for a single block in a layout. A block with a Grid gets
+    # the plot of its grid, and a FramedBlock gets a plot sized for the frame
+    # around its framed block. The frame is displayed by the FramedBlock itself,
+    # which also displays the framed block unless that block needs a plot tree
+    # of its own, in which case the plot keeps it as its only subplot.
+    def build_block_plot(self, element, block):
+        if block.w_sizepref or block.h_sizepref:
+            temp = self.build_plot(None, {element: block})
+        if isinstance(block, FramedBlock):
+            inner = self.build_block_plot(element, block.block)
+            w_sizepref, h_sizepref = block.wrap_sizeprefs(inner.w_sizepref,
+                                                          inner.h_sizepref)
+            subplots = None if block.inner_is_leaf() else [inner]
+            plot = Plot(w_sizepref, h_sizepref, subplots=subplots, block=block)
+        elif block.grid:
+            plot = self.build_plot(block.grid._layout, block.grid._slots)
+        else:  # it's a leaf block
+            return self.build_plot(None, {element: block})
+        if block.w_sizepref:
+            plot.w_sizepref = temp.w_sizepref
+        if block.h_sizepref:
+            plot.h_sizepref = temp.h_sizepref
+        return plot
+
+    # Place the plot by recursing down the plot tree built by
     # build_plot() and determine the coordinates for the plots embedded in
-    # each plot by using the SizePrefs of the plots
-    def display_plot(self, plot, x, y, w, h, term=None):
+    # each plot by using the SizePrefs of the plots. Returns a list of
+    # (block, x, y, w, h) for every block that displays itself.
+    def place_plot(self, plot, x, y, w, h, out=None):
+        if out is None:
+            out = []
         if plot.block:
-            plot.block.display(w, h, x, y, term)
+            out.append((plot.block, x, y, w, h))
+            if plot.subplots:  # a FramedBlock around a block with a plot tree
+                new_x, new_y, new_w, new_h = plot.block.inner_rect(x, y, w, h)
+                self.place_plot(plot.subplots[0], new_x, new_y, new_w, new_h, out)
         else:
             for subplot, new_x, new_y, new_w, new_h in Runner.divvy(plot.subplots, x, y, w, h, plot.horizontal):
-                self.display_plot(subplot, new_x, new_y, new_w, new_h, term)
+                self.place_plot(subplot, new_x, new_y, new_w, new_h, out)
+        return out
+
+    # Render the plot as one frame. The segments of every block go through
+    # the Encoder, which keeps only what changed since the previous frame.
+    # When the layout changes, the screen is cleared and written in full.
+    # Frames must be written in the order they're rendered.
+    def render_plot(self, plot, x, y, w, h):
+        placements = self.place_plot(plot, x, y, w, h)
+        if placements != self._placements:
+            self._encoder.invalidate()
+            self._placements = placements
+            self._index = None
+        # Overlays are stacked by z, and by the order they were shown
+        overlays = [(o.block,) + o.rect(w, h) for o in sorted(self._overlays, key=lambda o: o.z)]
+        if overlays != self._overlay_rects:
+            self._overlay_rects = overlays
+            self._index = None
+        shown = [p for p in placements + overlays if p[3] > 0 and p[4] > 0]
+        # Display the blocks that have changed, most important first, so that if
+        # the frame runs over budget it's the least important that wait. A block
+        # gains a level of priority for every frame its change has been held
+        # back, so a slow block earlier in the order can't hold it back forever.
+        start = monotonic()
+        self._due = None
+        held, self._held = self._held, {}
+        segments = {}
+        for block, _, _, block_w, block_h in sorted(
+                shown, key=lambda p: -(p[0].priority + held.get(p[0], 0))):
+            over_budget = (self.frame_budget is not None and
+                           monotonic() - start > self.frame_budget)
+            segments[block] = self._block_segments(block, block_w, block_h, start, over_budget)
+            if block in self._held:
+                self._held[block] = held.get(block, 0) + 1
+        self._segments = {block: self._segments[block] for block in segments
+                          if block in self._segments}  # forget blocks no longer shown
+
+        self._encoder.begin_frame(self._backend.width, self._backend.height)
+        hidden = _hidden(overlays)
+        for block, block_x, block_y, _, _ in placements:
+            self._encode(block_x, block_y, segments.get(block, ()), hidden)
+        for i, (block, block_x, block_y, _, _) in enumerate(overlays):
+            self._encode(block_x, block_y, segments.get(block, ()), _hidden(overlays[i + 1:]))
+        self._allocate(Runner._with_framed(placements) + overlays)
+        return self._encoder.end_frame()
+
+    # Tell the blocks what size they were given, (0, 0) for those no longer shown
+    def _allocate(self, rects):
+        allocations = {block: (w, h) for block, _, _, w, h in rects}
+        for block in self._allocations:
+            allocations.setdefault(block, (0, 0))
+        self._reallocated.extend(block for block, (w, h) in allocations.items()
+                                 if block._allocate(max(0, w), max(0, h)))
+        self._allocations = {b: size for b, size in allocations.items() if size != (0, 0)}
+
+    # Hand the segments of a block to the Encoder, with the columns of each row
+    # that are under an overlay hidden
+    def _encode(self, x, y, segments, hidden):
+        for dx, dy, text in segments:
+            self._encoder.segment(x + dx, y + dy, text, hidden.get(y + dy))
+
+    # The segments of a block, displayed again only if it's changed. A change is
+    # held back, and what was displayed before shown again, until the block's
+    # max_refresh_rate allows it, or, if the frame is over budget, until the next
+    # frame, unless the block has priority.
+    def _block_segments(self, block, w, h, now, over_budget=False):
+        cached = self._segments.get(block)  # ((w, h), segments, when displayed)
+        if cached and cached[0] == (w, h):
+            if not getattr(block, '_dirty', True) and not block.volatile:
+                return cached[1]
+            rate = block.max_refresh_rate
+            if rate and now < cached[2] + 1 / rate:
+                self._defer(cached[2] + 1 / rate)
+                return cached[1]
+            if over_budget and block.priority <= 0:
+                # Give the output, and the CPU, a rest before the next frame
+                self._defer(monotonic() + max(self.pacer.interval, self.frame_budget))
+                self._held[block] = 0
+                return cached[1]
+        if block.render_async:
+            return self._render_async(block, w, h, cached)
+        block._dirty = False  # before displaying it, so changes made meanwhile aren't lost
+        segments = block.segments(w, h)
+        self._segments[block] = ((w, h), segments, now)
+        return segments
+
+    # Start displaying a block in a pool, if it isn't already being displayed,
+    # and return what was displayed before in the meantime: nothing if that was
+    # at another size. A change made while it's being displayed is picked up in
+    # the frame after the new rows arrive.
+    def _render_async(self, block, w, h, cached):
+        stale = cached[1] if cached and cached[0] == (w, h) else []
+        if block in self._rendering:
+            return stale
+        block._dirty = False
+        pool = self._pool(block.render_async)
+        if block.render_async == 'process':
+            fn, args = block.render_job(w, h)
+            future = pool.submit(fn, *args)
+        else:
+            future = pool.submit(block.segments, w, h)
+        self._rendering[block] = (w, h)
+        future.add_done_callback(lambda f: self._rendered(block, (w, h), f))
+        return stale
+
+    def _pool(self, kind):
+        pool = self._pools.get(kind)
+        if pool is None:
+            if kind == 'process':
+                pool = ProcessPoolExecutor(self._render_processes)
+            else:
+                pool = ThreadPoolExecutor(self._render_workers)
+            self._pools[kind] = pool
+        return pool
+
+    # Keep the rows of a block displayed in a pool for the next frame
+    def _rendered(self, block, size, future):
+        with self._lock:
+            self._rendering.pop(block, None)
+            try:
+                result = future.result()
+            except CancelledError:  # the Runner stopped
+                return
+            except Exception:
+                # What was displayed before stays up until the block changes again
+                logging.exception('Displaying {} failed'.format(block))
+                return
+            if block.render_async == 'process':  # rows, not segments
+                result = [(0, j, row) for j, row in enumerate(result or [])]
+            self._segments[block] = (size, result, monotonic())
+        self.update()
+
+    # Have the next frame start by the time a held back change is due
+    def _defer(self, due):
+        if self._due is None or due < self._due:
+            self._due = due
+
+    # How long to wait for a change before starting the next frame anyway
+    def _timeout(self):
+        if self._due is None:
+            return .5
+        return max(0, min(.5, self._due - monotonic()))
+
+    def display_plot(self, plot, x, y, w, h):
+        self._write(self.render_plot(plot, x, y, w, h))
+
+    # Lay out the grid and write it to the backend as one frame. The frame
+    # is written without holding the lock, so blocks can go on changing
+    # while a write to a slow output blocks.
+    def draw(self):
+        with self._lock:
+            self.load(self._grid)
+            if self._backend.wants_keyframe():
+                self._encoder.invalidate()
+            frame = self.render_plot(self._root_plot,
+                                     0, 0,                                       # x, y
+                                     self._backend.width, self._backend.height)  # w, h
+            reallocated, self._reallocated = self._reallocated, []
+        self._write(frame)
+        for block in reallocated:
+            for callback in block._allocate_callbacks:
+                callback(block)
+
+    # Write a frame and tell the pacer how many bytes it took and how long
+    # the write blocked.
+    def _write(self, frame):
+        start = monotonic()
+        num_bytes = self._backend.write(frame)
+        self.pacer.wrote(num_bytes, monotonic() - start)
 
     # Divvy up the space available to a series of plots among them
     # by referring to SizePrefs for each.
@@ -464,6 +849,24 @@ class Runner(object):
             out.append((plot, m['x'], m['y'], m['w'], m['h']))
         return out
 
+# Returns {row: sorted (start, end) ranges of columns} covered by the rects
+def _hidden(rects):
+    rows = {}
+    for _, x, y, w, h in rects:
+        if w > 0:
+            for row in range(y, y + h):
+                rows.setdefault(row, []).append((x, x + w))
+    for row, ranges in rows.items():
+        ranges.sort()
+        merged = [ranges[0]]
+        for start, end in ranges[1:]:
+            if start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+        rows[row] = merged
+    return rows
+
 
 if __name__ == '__main__':
     blocks = {}
@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Condition
+from time import monotonic
+import heapq
+import random
+
+class Task(object):
+    '''A callback run every `interval` seconds by a Scheduler. Returned by
+    Scheduler.schedule() and Runner.schedule().
+    '''
+    def __init__(self, fn, interval, args, kwargs):
+        self.fn = fn
+        self.interval = interval
+        self.args = args
+        self.kwargs = kwargs
+        self.due = None
+        self.running = False
+        self.cancelled = False
+        self.runs = 0
+        self.skipped = 0  # ticks missed because the previous run hadn't finished
+        self.error = None  # the last exception raised by fn, if any
+        self.on_cancel = None  # called once when the task is cancelled, eg, to clean up
+
+    def __repr__(self):
+        return '<Task {0} every {1}s>'.format(getattr(self.fn, '__name__', self.fn), self.interval)
+
+    def __lt__(self, other):  # for the heap, on equal due times
+        return id(self) < id(other)
+
+    def cancel(self):
+        '''Stop running the task. A run already in progress finishes.'''
+        if not self.cancelled:
+            self.cancelled = True
+            if self.on_cancel:
+                self.on_cancel()
+
+
+class Scheduler(object):
+    '''Runs periodic callbacks, like those refreshing the text of blocks, on a
+    bounded pool of worker threads.
+
+    One timer thread keeps the tasks in a heap ordered by when they're next due
+    and sleeps until the first of them, so the number of threads and wakeups
+    doesn't grow with the number of tasks. If a task is still running when its
+    next tick comes around, that tick is skipped rather than queued, so a slow
+    producer can't pile up work. Each task starts at a random point within the
+    first `jitter` fraction of its interval, so tasks scheduled together with the
+    same interval don't all fire, and redraw, in the same frame.
+
+    Args:
+        workers (int): the most tasks that can be running at once
+        jitter (float): the fraction of its interval over which a task's first run is spread
+    '''
+    def __init__(self, workers=4, jitter=.1):
+        self._workers = workers
+        self._jitter = jitter
+        self._heap = []
+        self._cond = Condition()
+        self._pool = None
+        self._thread = None
+        self._stopped = False
+
+    def schedule(self, fn, interval, *args, **kwargs):
+        '''Call fn(*args, **kwargs) every interval seconds. Returns a Task.'''
+        if interval <= 0:
+            raise ValueError('interval must be positive: {}'.format(interval))
+        task = Task(fn, interval, args, kwargs)
+        task.due = monotonic() + random.uniform(0, interval * self._jitter)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('cannot schedule tasks after shutdown')
+            if not self._thread:
+                self._pool = ThreadPoolExecutor(max_workers=self._workers)
+                self._thread = Thread(name='scheduler', target=self._tick, daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (task.due, task))
+            self._cond.notify()
+        return task
+
+    def _tick(self):
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, task = self._heap[0]
+                now = monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._heap)
+                if task.cancelled:
+                    continue
+                if task.running:
+                    task.skipped += 1
+                else:
+                    task.running = True
+                    self._pool.submit(self._run, task)
+                # Keep to the task's phase, but don't try to catch up on missed ticks
+                task.due = max(due + task.interval, now)
+                heapq.heappush(self._heap, (task.due, task))
+
+    def _run(self, task):
+        try:
+            task.fn(*task.args, **task.kwargs)
+            task.error = None
+        except Exception as e:
+            task.error = e
+        finally:
+            task.runs += 1
+            task.running = False
+
+    def shutdown(self):
+        '''Cancel all the tasks. Runs already in progress finish in the background.'''
+        with self._cond:
+            self._stopped = True
+            for _, task in self._heap:
+                task.cancel()
+            self._heap = []
+            self._cond.notify()
+        if self._pool:
+            self._pool.shutdown(wait=False)
@@ -0,0 +1,206 @@
+from .block import Block
+from array import array
+from threading import Lock
+import struct
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+'''
+Lets worker processes update blocks through shared memory, instead of pickling
+each update over a pipe to a thread in the Runner's process.
+
+A SharedText holds a string, and a SharedSeries a series of floats, in a
+multiprocessing.shared_memory segment. The Runner's process creates them and
+hands them to the workers, which attach to the same memory (they pickle as just
+the name of the segment). A worker write()s to the segment; the Runner's
+process read()s it.
+
+Each segment starts with a sequence counter, which the writer makes odd while
+it's writing and even again when it's done. A reader that finds the counter
+unchanged since it last looked does nothing more, so checking a segment costs
+the unpacking of one integer. Otherwise it copies the contents out of the
+segment, with one slice, and keeps them only if the counter was the same even
+number before and after, so it never sees a half-written value. Each segment
+has one writer.
+
+A SharedBridge checks its segments on the Runner's scheduler, about once a
+frame, and passes the contents of those that changed to their blocks.
+'''
+
+# The sequence counter, and the number of bytes (SharedText) or floats (SharedSeries) in use
+_HEADER = struct.Struct('<QQ')
+
+class _Segment(object):
+    _ITEM = 1  # bytes per item of the contents
+
+    def __init__(self, capacity, name=None):
+        if shared_memory is None:
+            raise ImportError('{} requires Python 3.8 or later'.format(type(self).__name__))
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True,
+                                                   size=_HEADER.size + capacity * self._ITEM)
+            _HEADER.pack_into(self._shm.buf, 0, 0, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.capacity = (self._shm.size - _HEADER.size) // self._ITEM
+        self._seq = _HEADER.unpack_from(self._shm.buf)[0]
+
+    def __reduce__(self):
+        # Workers get the name, and attach to the segment
+        return type(self), (self.capacity, self.name)
+
+    def __repr__(self):
+        return '<{0} name={1} seq={2}>'.format(type(self).__name__, self.name, self.seq)
+
+    @property
+    def name(self): return self._shm.name
+
+    @property
+    def seq(self):
+        '''The number of writes so far, times two, plus one during a write.'''
+        return _HEADER.unpack_from(self._shm.buf)[0]
+
+    def _write(self, data, length):
+        # The only writer, so our own count of the sequence is the current one
+        buf = self._shm.buf
+        self._seq += 1
+        struct.pack_into('<Q', buf, 0, self._seq)  # odd: writing
+        buf[_HEADER.size:_HEADER.size + len(data)] = data
+        struct.pack_into('<Q', buf, 8, length)
+        self._seq += 1
+        struct.pack_into('<Q', buf, 0, self._seq)
+
+    def _read(self, since):
+        # Returns (seq, bytes), or None if unchanged since seq since or mid-write
+        buf = self._shm.buf
+        seq, length = _HEADER.unpack_from(buf)
+        if seq == since or seq & 1:
+            return None
+        data = bytes(buf[_HEADER.size:_HEADER.size + min(length, self.capacity) * self._ITEM])
+        if _HEADER.unpack_from(buf)[0] != seq:
+            return None  # written while we were copying; next time
+        return seq, data
+
+    def close(self):
+        '''Detach from the segment.'''
+        self._shm.close()
+
+    def unlink(self):
+        '''Free the segment, once every process has closed it. Done by the creator.'''
+        self._shm.unlink()
+
+
+class SharedText(_Segment):
+    '''A string in shared memory, of up to capacity bytes of UTF-8. Longer
+    strings are cut off.
+
+    Args:
+        capacity (int): the size of the segment, in bytes, not counting the header
+        name (str): the name of an existing segment to attach to
+    '''
+    def __init__(self, capacity=4096, name=None):
+        super().__init__(capacity, name)
+
+    def write(self, text):
+        data = text.encode('utf-8')[:self.capacity]
+        self._write(data, len(data))
+
+    def read(self, since=None):
+        '''Returns (seq, text), or None if it's unchanged since seq since.'''
+        result = self._read(since)
+        if result:
+            # A string cut off mid-character loses that character
+            return result[0], result[1].decode('utf-8', errors='ignore')
+
+
+class SharedSeries(_Segment):
+    '''A series of up to capacity floats in shared memory.
+
+    Args:
+        capacity (int): the most values the segment holds
+        name (str): the name of an existing segment to attach to
+    '''
+    _ITEM = 8
+
+    def __init__(self, capacity=1024, name=None):
+        super().__init__(capacity, name)
+
+    def write(self, values):
+        '''Replace the series with values, an array('d') or a float64 numpy
+        array, which are copied straight from their buffers, or any other
+        sequence of numbers. Only the last capacity values are kept.
+        '''
+        try:
+            view = memoryview(values)
+        except TypeError:
+            view = None
+        if view is None or view.format != 'd' or not view.c_contiguous:
+            view = memoryview(array('d', values))  # converted, one value at a time
+        data = view.cast('B')
+        data = data[max(0, len(data) - self.capacity * 8):]
+        self._write(data, len(data) // 8)
+
+    def read(self, since=None):
+        '''Returns (seq, values), with the values in an array('d'), or None if
+        the series is unchanged since seq since.
+        '''
+        result = self._read(since)
+        if result:
+            values = array('d')
+            values.frombytes(result[1])
+            return result[0], values
+
+
+class SharedBridge(object):
+    '''Passes the contents of shared segments to blocks when they change.
+
+    bind() each segment to a block, whose text is set to that of a SharedText,
+    or to a callable taking the contents, like `lambda values: canvas.plot(values,
+    replace=True)` for a SharedSeries. Then start() it.
+
+    Args:
+        poll_interval (float): seconds between checks of the segments
+    '''
+    def __init__(self, poll_interval=1/30):
+        self.poll_interval = poll_interval
+        self._bindings = []  # [segment, target, last seq seen]
+        self._task = None
+        self._poll_lock = Lock()  # polls may run on any scheduler worker
+
+    def __repr__(self):
+        return '<SharedBridge segments={0}>'.format(len(self._bindings))
+
+    def bind(self, segment, target):
+        with self._poll_lock:
+            self._bindings.append([segment, target, None])
+
+    def start(self, runner):
+        '''Check the segments on the runner's scheduler.'''
+        self._task = runner.schedule(self.poll, self.poll_interval)
+        self.poll()
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    def poll(self):
+        '''Pass on the contents of the segments changed since the last poll.
+        Returns the number of them.
+        '''
+        changed = 0
+        with self._poll_lock:
+            for binding in self._bindings:
+                segment, target, since = binding
+                result = segment.read(since)
+                if result is None:
+                    continue
+                binding[2], contents = result
+                if isinstance(target, Block):
+                    target.text = contents
+                else:
+                    target(contents)
+                changed += 1
+        return changed
@@ -0,0 +1,169 @@
+from .block import Block, SizePref, safe_get, safe_set
+from array import array
+from bisect import bisect_right
+from math import ceil, isfinite, nan
+
+# Eighths of a cell, from empty to full
+GLYPHS = ' ▁▂▃▄▅▆▇█'
+
+_AGGREGATES = {
+    'max': max,
+    'min': min,
+    'mean': lambda values: sum(values) / len(values),
+}
+
+class SparklineBlock(Block):
+    '''A block showing the latest samples of a time series as a sparkline.
+
+    Samples are kept in a ring buffer of floats, so push() takes constant time
+    and memory whatever the capacity. When there are more samples than columns,
+    they're bucketed, and each column shows the max (or min, or mean) of its
+    bucket, taken over slices of the buffer. The newest sample is on the right.
+
+    Each column is a bar made of the eighth-block glyphs, as many rows high as
+    the block. Values are scaled between low and high, or between the smallest
+    and largest of the samples shown if they're None. A bar is colored by the
+    highest of the thresholds its value reaches, if any, given as a list of
+    (value, tag) pairs like [(80, '{t.yellow}'), (95, '{t.red}')]. Samples that
+    are NaN or infinite are left out, and a column with none but those is blank.
+
+    Args:
+        capacity (int): the number of samples kept
+        low (float), high (float): the values at the bottom and top of the block
+        agg (str): 'max', 'min' or 'mean', how samples in a column are combined
+        thresholds (list): (value, tag) pairs for coloring bars
+    '''
+    def __init__(self,
+                 capacity=1024,
+                 name=None,
+                 low=None,
+                 high=None,
+                 agg='max',
+                 thresholds=None,
+                 w_sizepref=SizePref(hard_min=0, hard_max=float('inf')),
+                 h_sizepref=SizePref(hard_min=1, hard_max=1)):
+        if agg not in _AGGREGATES:
+            raise ValueError("Invalid agg value, must be 'max', 'min', or 'mean'")
+        super().__init__(name=name, w_sizepref=w_sizepref, h_sizepref=h_sizepref)
+        self._samples = array('d', bytes(8 * capacity))
+        self._next = 0  # where the next sample goes
+        self._count = 0
+        self._agg = _AGGREGATES[agg]
+        self.low = low
+        self.high = high
+        thresholds = sorted(thresholds or [])
+        self._limits = [value for value, _ in thresholds]
+        self._tags = ['{t.normal}'] + [tag for _, tag in thresholds]
+        self._version = 0  # bumped by every change, to invalidate _cache
+        self._cache = None  # (version, width, height, display)
+
+    def __repr__(self):
+        return '<SparklineBlock name={0} samples={1}>'.format(self.name, self._count)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    @safe_get
+    def low(self): return self._low
+
+    @low.setter
+    @safe_set
+    def low(self, val):
+        self._low = val
+        self._version = getattr(self, '_version', 0) + 1
+
+    @property
+    @safe_get
+    def high(self): return self._high
+
+    @high.setter
+    @safe_set
+    def high(self, val):
+        self._high = val
+        self._version = getattr(self, '_version', 0) + 1
+
+    @safe_set
+    def push(self, value):
+        '''Add a sample, dropping the oldest if the buffer is full.'''
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self._count = min(self._count + 1, len(self._samples))
+        self._version += 1
+
+    def extend(self, values):
+        for value in values:
+            self.push(value)
+
+    @safe_get
+    def values(self):
+        '''Returns the samples in the buffer, oldest first, as an array.'''
+        if self._count < len(self._samples):
+            return self._samples[:self._count]
+        return self._samples[self._next:] + self._samples[:self._next]
+
+    def columns(self, width):
+        '''Returns a value for each column of the given width, from the newest
+        samples, with fewer than width of them if there aren't enough samples.
+        A column with no finite samples is NaN.
+        '''
+        values = self.values()
+        n = len(values)
+        if n <= width:
+            return [value if isfinite(value) else nan for value in values]
+        # Buckets take the newest samples, so the right-most column is always the latest
+        size = ceil(n / width)
+        return [self._aggregate(values[max(0, end - size):end])
+                for end in range(n - (width - 1) * size, n + 1, size) if end > 0]
+
+    def _aggregate(self, bucket):
+        finite = [value for value in bucket if isfinite(value)]
+        return self._agg(finite) if finite else nan
+
+    def display(self, width, height, x, y, term=None):
+        with self.write_lock:
+            cached = self._cache
+            if cached and cached[:3] == (self._version, width, height):
+                out = cached[3]
+            else:
+                out = self._render(width, height)
+                self._cache = (self._version, width, height, out)
+        if term:
+            for j, row in enumerate(out):
+                with term.location(x=x, y=y+j):
+                    print(row.format(t=term), end='')
+        else:
+            return list(out)  # the rows the Runner encodes
+
+    def _render(self, width, height):
+        if width <= 0 or height <= 0:
+            return [''] * max(0, height)
+        columns = self.columns(width)
+        pad = ' ' * (width - len(columns))
+        if not columns:
+            return [pad] * height
+        finite = [value for value in columns if isfinite(value)]
+        if not finite:
+            return [' ' * width] * height
+        low = min(finite) if self._low is None else self._low
+        high = max(finite) if self._high is None else self._high
+        span = high - low
+        steps = 8 * height
+        levels = [0 if not isfinite(value) else steps if span <= 0 else
+                  max(0, min(steps, round((value - low) / span * steps))) for value in columns]
+        tags = [self._tags[bisect_right(self._limits, value)] if isfinite(value) else '{t.normal}'
+                for value in columns]
+        out = []
+        for row in range(height - 1, -1, -1):  # top row first
+            base = row * 8
+            parts = [pad]
+            tag = '{t.normal}'
+            for level, column_tag in zip(levels, tags):
+                if column_tag != tag:
+                    parts.append(column_tag)
+                    tag = column_tag
+                parts.append(GLYPHS[max(0, min(8, level - base))])
+            if tag != '{t.normal}':
+                parts.append('{t.normal}')
+            out.append(''.join(parts))
+        return out
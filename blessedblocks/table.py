@@ -0,0 +1,186 @@
+from .block import Block, SizePref, safe_get, safe_set
+from .width import width as text_width, pad
+from collections import Counter
+
+class TableBlock(Block):
+    '''A block showing a table that's kept as rows of cells rather than as text.
+
+    Cells are updated one at a time with set_cell(), or a row at a time with
+    upsert_row(), and only the rows changed are rendered again. Each column keeps
+    a count of the widths of its cells, so its width is kept up to date as cells
+    change without looking at the other rows. Only the rows in view are rendered,
+    and a change to a row out of view doesn't cause a redraw unless it changes
+    the width of a column.
+
+    Rows are identified by the value in their key column, the first by default.
+    Numbers are right-justified, like tabulate does, everything else is
+    left-justified, unless `justs` says otherwise.
+
+    Args:
+        headers (list): the column headings
+        rows (list): the initial rows, each a list of values, one per column
+        key (int): the index of the column identifying rows
+        justs (list): '<', '^' or '>' for each column, None to tell from the values
+        sep (str): the text between columns
+    '''
+    def __init__(self,
+                 headers,
+                 rows=None,
+                 key=0,
+                 justs=None,
+                 sep='  ',
+                 name=None,
+                 w_sizepref=SizePref(hard_min=0, hard_max=float('inf')),
+                 h_sizepref=SizePref(hard_min=0, hard_max=float('inf'))):
+        super().__init__(name=name, w_sizepref=w_sizepref, h_sizepref=h_sizepref)
+        self._headers = [str(h) for h in headers]
+        self._key = key
+        self._justs = list(justs) if justs else [None] * len(headers)
+        self._sep = sep
+        self._rows = []  # lists of cell text
+        self._index = {}  # key -> position in _rows
+        self._cell_widths = [Counter() for _ in headers]  # width -> number of cells that wide
+        self._widths = [text_width(h) for h in self._headers]
+        self._cache = {}  # position in _rows -> (widths, width, display)
+        self._top = 0
+        self._view = 0  # the number of rows the block last had room for
+        for row in rows or []:
+            self.upsert_row(row)
+
+    def __repr__(self):
+        return '<TableBlock name={0} rows={1}>'.format(self.name, len(self._rows))
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    @safe_get
+    def widths(self): return list(self._widths)
+
+    @property
+    @safe_get
+    def top(self): return self._top
+
+    @top.setter
+    @safe_set
+    def top(self, val):
+        self._top = max(0, min(val, len(self._rows) - 1))
+
+    def get_row(self, key):
+        with self.write_lock:
+            return list(self._rows[self._index[key]])
+
+    def upsert_row(self, row):
+        '''Replace the row with the same key as the given one, or add it at the end.'''
+        if len(row) != len(self._headers):
+            raise ValueError('row has {} cells, the table has {} columns'
+                             .format(len(row), len(self._headers)))
+        with self.write_lock:
+            key = row[self._key]
+            i = self._index.get(key)
+            if i is None:
+                i = self._index[key] = len(self._rows)
+                self._rows.append([''] * len(row))
+                for column in range(len(row)):
+                    self._count(column, '')
+            self._changed(self._set(i, row) or self._in_view(i))
+
+    def set_cell(self, key, column, value):
+        '''Set the cell in the given column of the row with the given key.'''
+        with self.write_lock:
+            i = self._index[key]
+            if column == self._key:
+                raise ValueError("a row's key can't be changed; delete the row and add another")
+            row = list(self._rows[i])
+            row[column] = value
+            self._changed(self._set(i, row) or self._in_view(i))
+
+    def delete_row(self, key):
+        with self.write_lock:
+            i = self._index.pop(key)
+            for column, cell in enumerate(self._rows.pop(i)):
+                self._uncount(column, cell)
+            for k, j in self._index.items():
+                if j > i:
+                    self._index[k] = j - 1
+            self._cache = {j if j < i else j - 1: v for j, v in self._cache.items() if j != i}
+            self._changed(True)
+
+    def _set(self, i, row):
+        # Returns whether the width of any column changed
+        old = self._rows[i]
+        new = [self._cell(column, value) for column, value in enumerate(row)]
+        if new == old:
+            return False
+        widths = list(self._widths)
+        for column, (old_cell, new_cell) in enumerate(zip(old, new)):
+            if old_cell != new_cell:
+                self._uncount(column, old_cell)
+                self._count(column, new_cell)
+        self._rows[i] = new
+        self._cache.pop(i, None)
+        return widths != self._widths
+
+    def _cell(self, column, value):
+        if self._justs[column] is None and value is not None and value != '':
+            self._justs[column] = '>' if isinstance(value, (int, float)) else '<'
+        return '' if value is None else str(value)
+
+    def _count(self, column, cell):
+        n = text_width(cell)
+        self._cell_widths[column][n] += 1
+        if n > self._widths[column]:
+            self._widths[column] = n
+
+    def _uncount(self, column, cell):
+        n = text_width(cell)
+        cell_widths = self._cell_widths[column]
+        cell_widths[n] -= 1
+        if not cell_widths[n]:
+            del cell_widths[n]
+            if n == self._widths[column]:  # the widest cell may have gone
+                self._widths[column] = max(text_width(self._headers[column]),
+                                           max(cell_widths, default=0))
+
+    def _in_view(self, i):
+        return self._top <= i < self._top + self._view
+
+    def _changed(self, redraw):
+        if redraw:
+            self._redraw()
+
+    @safe_set
+    def _redraw(self):
+        pass  # safe_set notifies the Runner
+
+    def _render(self, cells, width):
+        parts = [pad(cell, self._widths[column], self._justs[column] or '<')
+                 for column, cell in enumerate(cells)]
+        line = pad(self._sep.join(parts), width)
+        return line.replace('{', '{{').replace('}', '}}')
+
+    def _row_display(self, i, width):
+        cached = self._cache.get(i)
+        if cached and cached[0] == self._widths and cached[1] == width:
+            return cached[2]
+        display = self._render(self._rows[i], width)
+        self._cache[i] = (list(self._widths), width, display)
+        return display
+
+    def display(self, width, height, x, y, term=None):
+        with self.write_lock:
+            out = []
+            if height > 0:
+                out.append('{t.bold}' + self._render(self._headers, width) + '{t.normal}')
+            if height > 1:
+                out.append(self._sep.join('-' * w for w in self._widths)[:width].ljust(width))
+            self._view = max(0, height - 2)
+            out.extend(self._row_display(i, width)
+                       for i in range(self._top, min(len(self._rows), self._top + self._view)))
+            out.extend([' ' * width] * (height - len(out)))
+            if term:
+                for j, row in enumerate(out):
+                    with term.location(x=x, y=y+j):
+                        print(row.format(t=term), end='')
+            else:
+                return out  # the rows the Runner encodes
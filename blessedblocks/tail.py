@@ -0,0 +1,176 @@
+from .block import SizePref
+from .blocks import BareBlock
+from .ansi import AnsiParser, clean_row
+from collections import deque
+from threading import Lock
+import codecs
+import os
+
+class TailBlock(BareBlock):
+    '''A block showing the last rows of a file, like `tail -F`.
+
+    The file is polled on the Runner's scheduler. Each poll reads only the bytes
+    appended since the last one, in chunks of chunk_size, from the offset where
+    the last read stopped, and splits them into rows as they arrive, keeping the
+    last max_rows. The text of the block changes only when a complete row arrives.
+
+    When it's first opened, only the end of the file is read, back to the start
+    of the last max_rows rows. If the file is replaced (its path now names another
+    inode, as when a log is rotated), the rest of the old file is read and then
+    the new one from its start. If the file shrinks, it was truncated, and it's
+    read again from its start. A file that doesn't exist yet is waited for.
+
+    Args:
+        path (str): the file to show
+        max_rows (int): the most rows kept
+        poll_interval (float): seconds between checks of the file
+        chunk_size (int): the most bytes read at once
+        ansi (bool): whether to keep the colors of ANSI escape sequences, or drop them
+    '''
+    def __init__(self,
+                 path,
+                 name=None,
+                 max_rows=1000,
+                 poll_interval=.25,
+                 chunk_size=1 << 16,
+                 encoding='utf-8',
+                 ansi=True,
+                 hjust='<',
+                 vjust='^',
+                 w_sizepref=SizePref(hard_min=0, hard_max=float('inf')),
+                 h_sizepref=SizePref(hard_min=0, hard_max=float('inf'))):
+        super().__init__(name=name, hjust=hjust, vjust=vjust, block_just=False,
+                         w_sizepref=w_sizepref, h_sizepref=h_sizepref)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self._parser = AnsiParser() if ansi else None
+        self.bytes_read = 0  # how much of the file(s) has been read, in total
+        self._rows = deque(maxlen=max_rows)
+        self._partial = ''  # the start of a row still being written
+        self._fd = None
+        self._offset = 0
+        self._decoder = None
+        self._task = None
+        self._stopped = False
+        self._poll_lock = Lock()  # polls may run on any scheduler worker
+
+    def __repr__(self):
+        return '<TailBlock name={0} path={1}>'.format(self.name, self.path)
+
+    def start(self, runner):
+        '''Show the file, and poll it for new rows on the runner's scheduler.'''
+        self._task = runner.schedule(self.poll, self.poll_interval)
+        self._task.on_cancel = self._close
+        self.poll()
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+        else:
+            self._close()
+
+    def text_rows(self, height):
+        rows = super().text_rows(height)
+        return rows[len(rows) - height:] if len(rows) > height else rows
+
+    def poll(self):
+        '''Read what's been appended to the file since the last poll.'''
+        with self._poll_lock:
+            if self._stopped:
+                return
+            changed = False
+            if self._fd is None:
+                if not self._open():
+                    return
+                changed = self._read_tail()
+            else:
+                try:
+                    st = os.stat(self.path)
+                except FileNotFoundError:
+                    st = None
+                fst = os.fstat(self._fd)
+                if st and (st.st_ino, st.st_dev) != (fst.st_ino, fst.st_dev):  # rotated
+                    changed = self._read()
+                    changed = self._flush_partial() or changed
+                    os.close(self._fd)
+                    self._open()
+                elif fst.st_size < self._offset:  # truncated
+                    self._offset = 0
+                    self._partial = ''
+                    self._decoder.reset()
+                    if self._parser:
+                        self._parser.reset()
+            if self._fd is not None:
+                changed = self._read() or changed
+            if changed:
+                self.text = '\n'.join(self._rows)
+
+    def _open(self):
+        try:
+            self._fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            self._fd = None
+            return False
+        self._offset = 0
+        self._partial = ''
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        if self._parser:
+            self._parser.reset()
+        return True
+
+    def _read_tail(self):
+        # Read back from the end of the file until there are enough rows
+        size = os.fstat(self._fd).st_size
+        pos = size
+        chunks = []
+        newlines = 0
+        while pos > 0 and newlines <= self._rows.maxlen:
+            step = min(self.chunk_size, pos)
+            pos -= step
+            chunk = os.pread(self._fd, step, pos)
+            chunks.insert(0, chunk)
+            newlines += chunk.count(b'\n')
+        data = b''.join(chunks)
+        if pos > 0:  # drop the part of the row before the first newline
+            data = data[data.find(b'\n') + 1:]
+        self._offset = size
+        self.bytes_read += len(data)
+        return self._add(data)
+
+    def _read(self):
+        # Returns whether any complete rows were read
+        changed = False
+        while True:
+            data = os.pread(self._fd, self.chunk_size, self._offset)
+            if not data:
+                return changed
+            self._offset += len(data)
+            self.bytes_read += len(data)
+            changed = self._add(data) or changed
+
+    def _add(self, data):
+        text = self._decoder.decode(data)
+        if not text:
+            return False
+        rows = (self._partial + text).split('\n')
+        self._partial = rows.pop()
+        for row in rows:
+            self._rows.append(clean_row(row, self._parser))
+        return bool(rows)
+
+    def _flush_partial(self):
+        # The last row of a file that's been replaced is as complete as it will get
+        text = self._partial + self._decoder.decode(b'', final=True)
+        self._partial = ''
+        if text:
+            self._rows.append(clean_row(text, self._parser))
+        return bool(text)
+
+    def _close(self):
+        with self._poll_lock:
+            self._stopped = True
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
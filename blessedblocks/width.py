@@ -0,0 +1,81 @@
+from functools import lru_cache
+from wcwidth import wcwidth
+
+'''
+The width of text as displayed in a terminal, in columns, which is not its len()
+when it has wide characters like CJK and emoji (two columns each) or combining
+marks and other zero-width characters.
+
+Plain ASCII, which is almost all text, takes a fast path that's just len().
+Other characters are looked up in a table that's filled in from wcwidth as they
+show up, and the widths of whole non-ASCII strings are cached.
+'''
+
+try:
+    _isascii = str.isascii  # Python 3.7+
+except AttributeError:
+    def _isascii(text):
+        try:
+            text.encode('ascii')
+        except UnicodeEncodeError:
+            return False
+        return True
+
+class _Widths(dict):
+    # char -> width; control characters, which wcwidth gives -1, take no columns
+    def __missing__(self, char):
+        width = self[char] = max(0, wcwidth(char))
+        return width
+
+_CHAR_WIDTHS = _Widths()
+
+def char_width(char):
+    '''The number of columns a single character takes.'''
+    return 1 if char < '\x7f' else _CHAR_WIDTHS[char]
+
+def width(text):
+    '''The number of columns text takes.'''
+    if _isascii(text):
+        return len(text)
+    return _width(text)
+
+@lru_cache(maxsize=16384)
+def _width(text):
+    widths = _CHAR_WIDTHS
+    return sum(widths[c] for c in text)
+
+def fit_index(text, columns):
+    '''Returns (n, w): the number of characters at the start of text that fit in
+    the given number of columns, and the number of columns they take. A wide
+    character that would straddle the edge doesn't fit.
+    '''
+    if _isascii(text):
+        n = max(0, min(columns, len(text)))
+        return n, n
+    widths = _CHAR_WIDTHS
+    used = 0
+    for i, char in enumerate(text):
+        w = widths[char]
+        if used + w > columns:
+            return i, used
+        used += w
+    return len(text), used
+
+def fit(text, columns):
+    '''Returns the start of text that fits in the given number of columns.'''
+    return text[:fit_index(text, columns)[0]]
+
+def pad(text, columns, just='<'):
+    '''Returns text cut off or padded with blanks to exactly the given number of
+    columns, justified left ('<'), center ('^') or right ('>').
+    '''
+    n, used = fit_index(text, columns)
+    text = text[:n]
+    extra = columns - used
+    if extra <= 0:
+        return text
+    if just == '>':
+        return ' ' * extra + text
+    if just == '^':
+        return ' ' * (extra // 2) + text + ' ' * (extra - extra // 2)
+    return text + ' ' * extra
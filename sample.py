@@ -6,12 +6,12 @@ from blessedblocks.block import Block, Grid, SizePref, DEFAULT_SIZE_PREF
 from blessedblocks.blocks import BareBlock, FramedBlock, InputBlock
 from blessedblocks.line import Line
 from blessedblocks.runner import Runner
-from blessedblocks.debug import DebugBlock
-from threading import Event, Thread, Lock
+from blessedblocks.log import LoggingBlock
+from blessedblocks.process import CommandBlock
+from blessedblocks.table import TableBlock
+from threading import Event
 from tabulate import tabulate
 import datetime
-import shlex
-from subprocess import check_output
 
 # Some constants
 POUND = '#'
@@ -26,20 +26,13 @@ FILLER = ('01234}6789012345678901234567890123456789\n'
           '8123456789012345678901234567890123456789\n'
           '9123{t.blue}456789012345678901234567890123456789')
 
-def run_cmd_in_block(cmd, block, refresh=3.0):
-    while True:
-        data = check_output(shlex.split(cmd))
-        block.text = data.decode()
-        if stop_event.wait(refresh):
-            return
-
 # Specify the positioning of the blocks.
 # A list is horizontal, a tuple is vertical
 layout = [(4, [(1,2,3), (8,9), (5,[6,7])], 10, 12)]
 
 # Build the contents of each of the blocks specified in the layout
 blocks = {}
-#blocks[11] = DebugBlock(name='debug')
+#blocks[11] = LoggingBlock(name='log').install()
 
 blocks[1] = BareBlock(h_sizepref=SizePref(hard_min=1, hard_max=1))
 
@@ -62,9 +55,8 @@ blocks[5] = FramedBlock(BareBlock(h_sizepref = SizePref(hard_min=0, hard_max='te
                         title='Block #5',
                         title_sep='-')
 
-blocks[6] = FramedBlock(BareBlock(hjust='^'),
-                        text=tabulate([['col1', 'col2'], [1.23, 2.456]]), # text at bottom of block
-                        title="tabulate block hjust=^",
+blocks[6] = FramedBlock(TableBlock(['col1', 'col2'], [[1.23, 2.456]]),
+                        title="TableBlock",
                         title_sep='-')
 
 blocks[7] = FramedBlock(BareBlock(), text=FILLER, title='Block #7',title_sep='-')
@@ -96,8 +88,9 @@ eg = Grid(layout=[(1,2)], blocks=eblocks)
 bb = BareBlock(text=None, grid=eg, h_sizepref=DEFAULT_SIZE_PREF)
 blocks[9] = bb  # stick it in slot 9
 
-blocks[10] = BareBlock(text='top output', hjust='^', vjust='^',
-                       h_sizepref = SizePref(hard_min=7, hard_max=10))
+# top keeps running, and the block shows the latest of the frames it writes every second
+blocks[10] = CommandBlock('top -b -d 1 -w {width}', frame_start='^top - ',
+                          h_sizepref = SizePref(hard_min=7, hard_max=10))
 
 
 input_block = InputBlock(name='input')
@@ -118,9 +111,7 @@ blocks[1].text = ("{t.normal}A bare block with just a rg&b horizontal line\n" +
                   Line.repeat_to_width('{t.red}-{t.green}-{t.blue}-', r.term_width()).display)
 
 # Start the top output in block 10
-top_thread = Thread(target=run_cmd_in_block,
-                    args=('top -b -n 1 -w 512', blocks[10], 1))
-top_thread.start()
+blocks[10].start(r)
 
 import random
 # Refresh some of the blocks in a tight loop
@@ -145,5 +136,4 @@ for i in range(100):
     blocks[4].text = 'bare_block ' + str(datetime.datetime.now())
 
 stop_event.set()
-top_thread.join()
 r.stop()
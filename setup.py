@@ -36,5 +36,8 @@ setup(
         "pluggy>=0.6.0, < 1.0.0",
         "py>=1.5.3, <2.0.0",
         "pytest>=3.6.0, <4.0.0"
-    ]
+    ],
+    extras_require={
+        'canvas': ["numpy>=1.14.0"],
+    }
 )
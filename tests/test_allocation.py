@@ -0,0 +1,47 @@
+import pytest
+from threading import Thread
+from time import sleep
+from blessedblocks.block import Grid, SizePref
+from blessedblocks.blocks import BareBlock
+from blessedblocks.backends import NullBackend
+from blessedblocks.process import CommandBlock
+from blessedblocks.runner import Runner
+
+def test_allocated_and_visible():
+    fixed = BareBlock(text='a', w_sizepref=SizePref(hard_min=6, hard_max=6))
+    squeezed = BareBlock(text='b', w_sizepref=SizePref(hard_min=0, hard_max=float('inf')))
+    backend = NullBackend(10, 3)
+    r = Runner(Grid([1, 2], {1: fixed, 2: squeezed}), backend=backend)
+    assert fixed.allocated == (0, 0) and not fixed.visible
+    changes = []
+    squeezed.on_allocate(lambda block: changes.append(block.allocated))
+    r.draw()
+    assert (fixed.allocated, squeezed.allocated) == ((6, 3), (4, 3))
+    r.draw()
+    backend.resize(6, 3)
+    r.draw()
+    assert squeezed.allocated == (0, 3) and not squeezed.visible
+    r.update_block(2, BareBlock(text='c'))
+    r.draw()
+    assert changes == [(4, 3), (0, 3), (0, 0)]  # no longer in the grid
+
+def test_wait_visible():
+    block = BareBlock(text='a')
+    r = Runner(Grid([1], {1: block}), backend=NullBackend(10, 3))
+    assert not block.wait_visible(0)
+    Thread(target=lambda: (sleep(.05), r.draw())).start()
+    assert block.wait_visible(5)
+
+def test_command_sized_to_block():
+    block = CommandBlock(['echo', '{width}x{height}'])
+    r = Runner(Grid([1], {1: block}), backend=NullBackend(12, 2))
+    block.poll()
+    assert block._proc is None and not block.text  # not until it has a size
+    r.draw()
+    for _ in range(100):
+        block.poll()
+        if block.returncode is not None:
+            break
+        sleep(.02)
+    assert block.text == '12x2'
+    block.stop()
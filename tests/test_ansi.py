@@ -0,0 +1,36 @@
+import pytest
+from blessedblocks.ansi import AnsiParser, ansi_to_tags, strip_ansi, clean_row, color256_name
+from blessedblocks.blocks import BareBlock
+from blessedblocks.line import Line
+
+def test_sgr_to_tags():
+    assert ansi_to_tags('\x1b[1;31mred\x1b[0m plain') == '{t.bold_red}red{t.normal} plain'
+    assert ansi_to_tags('\x1b[31ma\x1b[44mb\x1b[39mc') == '{t.red}a{t.red_on_blue}b{t.normal}{t.on_blue}c'
+    assert ansi_to_tags('\x1b[01;34mdir\x1b[m') == '{t.bold_blue}dir{t.normal}'
+    assert ansi_to_tags('\x1b[38;5;9mx\x1b[48;5;1my') == '{t.bright_red}x{t.bright_red_on_red}y'
+
+def test_256_and_rgb_colors():
+    assert color256_name(4) == 'blue'
+    assert ansi_to_tags('\x1b[38;2;255;0;0mx') == '{t.red}x'  # the X11 red
+    assert ansi_to_tags('\x1b[38;5;231mx').startswith('{t.')
+
+def test_other_sequences_are_dropped():
+    text = '\x1b[?25l\x1b[2;3Hab\x1b]0;title\x07c\x1b(Bd'
+    assert ansi_to_tags(text) == 'abcd'
+    assert strip_ansi('\x1b[1mab\x1b[0m') == 'ab'
+    assert clean_row('\x1b[1ma\tb\r') == 'a    b'
+
+def test_streaming():
+    parser = AnsiParser()
+    assert parser.feed('a\x1b[3') == 'a'
+    assert parser.feed('2mb\x1b') == '{t.green}b'
+    assert parser.tag == '{t.green}'
+    assert parser.feed('[0mc') == '{t.normal}c'
+    assert parser.tag == ''
+
+def test_styles_turned_off_in_a_line():
+    text = ansi_to_tags('\x1b[1;31mab\x1b[22mcd')
+    line = Line(text, 4, '<')
+    assert line.display == '{t.bold_red}ab{t.normal}{t.red}cd'
+    assert line.plain == 'abcd'
+    assert BareBlock(text=text).display(4, 1, 0, 0) == ['{t.bold_red}ab{t.normal}{t.red}cd{t.normal}']
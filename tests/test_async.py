@@ -0,0 +1,84 @@
+import pytest
+from threading import Event
+from time import monotonic, sleep
+from blessedblocks.block import Grid
+from blessedblocks.blocks import BareBlock, FramedBlock
+from blessedblocks.backends import RecordingBackend
+from blessedblocks.runner import Runner
+
+class SlowBlock(BareBlock):
+    render_async = 'thread'
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.go = Event()
+    def display(self, width, height, x, y, term=None):
+        self.go.wait(5)
+        return super().display(width, height, x, y, term)
+
+def wait_for(r, block):
+    for _ in range(250):
+        if block not in r._rendering:
+            return
+        sleep(.02)
+
+def test_stale_while_rendering():
+    slow, fast = SlowBlock(text='s1'), BareBlock(text='f1')
+    backend = RecordingBackend(4, 2)
+    r = Runner(Grid([(1, 2)], {1: slow, 2: fast}), backend=backend)
+    r.draw()  # the slow block isn't ready, the fast one is shown at once
+    assert 'f1' in backend.recorded[-1][1] and 's1' not in backend.recorded[-1][1]
+    slow.go.set()
+    wait_for(r, slow)
+    assert not r.rebuild_plot_q.empty()  # woken up to show it
+    r.draw()
+    assert 's1' in backend.recorded[-1][1]
+    slow.go.clear()
+    slow.text = 's2'
+    r.draw()
+    fast.text = 'f2'
+    slow.text = 's3'  # while s2 is being displayed
+    r.draw()
+    assert backend.recorded[-1][1] == '\x1b[2Hf2  '  # s1 is still shown above it
+    slow.go.set()
+    wait_for(r, slow)
+    r.draw()
+    assert 's3' in backend.recorded[-1][1]  # the text when it got to it
+    r.stop()
+
+def test_process_pool():
+    block = BareBlock(text='{t.red}hi\nthere', vjust='v')
+    block.render_async = 'process'
+    backend = RecordingBackend(6, 3)
+    r = Runner(Grid([1], {1: block}), backend=backend, render_processes=1)
+    expected = block.display(6, 3, 0, 0)
+    r.draw()
+    wait_for(r, block)
+    assert r._segments[block][1] == [(0, j, row) for j, row in enumerate(expected)]
+    r.stop()
+
+def test_framed():
+    slow = SlowBlock()
+    framed = FramedBlock(slow, left_border='|', right_border='|')
+    slow.text = 's1'
+    backend = RecordingBackend(6, 4)
+    r = Runner(Grid([1], {1: framed}), backend=backend)
+    start = monotonic()
+    r.draw()  # the frame isn't held up by the block in it
+    assert monotonic() - start < .5 and 's1' not in backend.recorded[-1][1]
+    slow.go.set()
+    wait_for(r, framed)
+    r.draw()
+    assert '|s1  |' in backend.recorded[-1][1]
+    r.stop()
+
+def test_framed_process_pool():
+    block = BareBlock()
+    block.render_async = 'process'
+    framed = FramedBlock(block, left_border='|', right_border='|')
+    block.text = 'hi'
+    r = Runner(Grid([1], {1: framed}), backend=RecordingBackend(6, 4), render_processes=1)
+    expected = framed.display(6, 4, 0, 0)
+    r.draw()
+    wait_for(r, framed)
+    assert r._segments[framed][1] == [(0, j, row) for j, row in enumerate(expected)]
+    r.stop()
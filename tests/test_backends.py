@@ -0,0 +1,47 @@
+import pytest
+import os
+from blessedblocks.backends import AnsiSequences, AnsiBackend, NullBackend, RecordingBackend
+from blessedblocks.block import Grid
+from blessedblocks.blocks import BareBlock
+from blessedblocks.runner import Runner
+from blessed import Terminal
+
+term = Terminal(kind='xterm-256color', force_styling=True)
+def test_ansi_sequences_match_xterm():
+    seqs = AnsiSequences()
+    for name in ('red', 'on_blue', 'bright_green', 'on_bright_red', 'bold', 'underline',
+                 'bold_red_on_white', 'darkorange', 'on_darkorange'):
+        assert getattr(seqs, name) == getattr(term, name).replace('m\x1b[', ';'), name
+    assert seqs.move(3, 4) == term.move(3, 4)
+    assert seqs.move(3, 0) == '\x1b[4H'
+    assert seqs.move_x(5) == term.move_x(5)
+    assert seqs.clear_eol == term.clear_eol
+    assert seqs.nonsense == ''
+
+def test_ansi_backend_writes_to_fd():
+    r, w = os.pipe()
+    backend = AnsiBackend(fd=w, size=(10, 2))
+    assert backend.write('x·') == 3
+    os.close(w)
+    assert os.read(r, 10) == 'x·'.encode('utf-8')
+    assert (backend.width, backend.height) == (10, 2)
+
+def test_runner_draws_to_recording_backend():
+    backend = RecordingBackend(10, 2)
+    block = BareBlock(text='{t.red}hi')
+    r = Runner(Grid([1], {1: block}), backend=backend)
+    r.draw()
+    block.text = '{t.red}ho'
+    r.draw()
+    r.draw()
+    frames = [frame for _, frame in backend.recorded]
+    assert frames[0] == '\x1b[m\x1b[H\x1b[2J\x1b[31mhi\x1b[K\r\n\x1b[K\x1b[m'
+    assert frames[1] == '\x1b[H\x1b[31mho\x1b[K\x1b[m'
+    assert frames[2] == ''
+    assert backend.frames == 3
+    assert r.pacer.bytes == backend.bytes
+
+def test_null_backend_counts():
+    backend = NullBackend()
+    backend.write('abc')
+    assert (backend.frames, backend.bytes) == (1, 3)
@@ -0,0 +1,65 @@
+import pytest
+import socket
+from time import sleep
+from blessedblocks.block import Grid
+from blessedblocks.blocks import BareBlock
+from blessedblocks.broadcast import BroadcastBackend, _Viewer, messages, parse_address, KEYFRAME, DIFF
+from blessedblocks.runner import Runner
+
+def connect(backend):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(backend.address)
+    sock.settimeout(5)
+    return sock
+
+def wait_for_viewers(backend, n):
+    for _ in range(250):
+        if len(backend.viewers) >= n:
+            return
+        sleep(.02)
+
+def test_keyframe_then_diffs(tmp_path):
+    backend = BroadcastBackend(str(tmp_path / 'board.sock'), size=(10, 2))
+    block = BareBlock(text='hi')
+    r = Runner(Grid([1], {1: block}), backend=backend)
+    socks = []
+    try:
+        for _ in range(2):
+            socks.append(connect(backend))
+        wait_for_viewers(backend, 2)
+        r.draw()
+        block.text = 'ho'
+        r.draw()
+        for sock in socks:
+            received = messages(sock)
+            kind, width, height, frame = next(received)
+            assert (kind, width, height) == (KEYFRAME, 10, 2)
+            assert frame.startswith('\x1b[m\x1b[H\x1b[2J') and 'hi' in frame
+            assert next(received) == (DIFF, 10, 2, '\x1b[Hho\x1b[K')
+    finally:
+        r.stop()
+        for sock in socks:
+            sock.close()
+    assert not backend.viewers
+
+def test_slow_viewer_drops_to_keyframe():
+    sock, peer = socket.socketpair()
+    try:
+        viewer = _Viewer(sock, 2, lambda viewer: None)  # not started, so nothing is sent
+        assert viewer.send(b'd0', False)  # ignored until the first keyframe
+        assert viewer.send(b'k1', True)
+        assert viewer.send(b'd1', False)
+        assert not viewer.send(b'd2', False)  # full: falls behind
+        assert viewer.dropped == 1 and not viewer._pending
+        assert viewer.send(b'd3', False)
+        assert not viewer._pending
+        assert viewer.send(b'k2', True)
+        assert list(viewer._pending) == [b'k2']
+    finally:
+        sock.close()
+        peer.close()
+
+def test_parse_address():
+    assert parse_address('/tmp/board.sock') == '/tmp/board.sock'
+    assert parse_address('0.0.0.0:7000') == ('0.0.0.0', 7000)
+    assert parse_address(':7000') == ('localhost', 7000)
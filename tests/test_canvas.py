@@ -0,0 +1,29 @@
+import pytest
+np = pytest.importorskip('numpy')
+from blessedblocks.canvas import CanvasBlock
+
+def test_scatter_dots():
+    c = CanvasBlock(xlim=(0, 3), ylim=(0, 7))
+    c.plot([7, 0], x=[0, 3], scatter=True)
+    # top left dot of the first cell, bottom right dot of the second
+    assert c.display(2, 2, 0, 0) == ['{t.green}⠁{t.normal} ', ' {t.green}⢀{t.normal}']
+
+def test_line_is_joined():
+    c = CanvasBlock(ylim=(0, 3))
+    c.plot([0, 3], x=[0, 1], color='red')
+    # the bottom left dot, joined to the top by the right column of dots
+    assert c.display(1, 1, 0, 0) == ['{t.red}⣸{t.normal}']
+
+def test_last_series_colors_a_cell():
+    c = CanvasBlock(xlim=(0, 1), ylim=(0, 1))
+    c.plot([0, 0], x=[0, 1], color='red')
+    c.plot([1, 1], x=[0, 1], color='blue')
+    row = c.display(1, 1, 0, 0)[0]
+    assert row == '{t.blue}⣉{t.normal}'
+    c.plot([1, 1], x=[0, 1], replace=True)
+    assert c.display(1, 1, 0, 0) == ['{t.green}⠉{t.normal}']
+
+def test_heatmap():
+    c = CanvasBlock()
+    c.heatmap([[0, 1], [1, 0]], palette=['blue', 'red'])
+    assert c.display(2, 1, 0, 0) == ['{t.blue_on_red}▀{t.red_on_blue}▀{t.normal}']
@@ -0,0 +1,44 @@
+import pytest
+import time
+from threading import Event
+from blessedblocks.commands import CommandExecutor
+
+def run(handler, cmds, **kwargs):
+    reports = []
+    executor = CommandExecutor(handler, lambda cmd, status: reports.append((cmd, status)),
+                               **kwargs)
+    for cmd in cmds:
+        executor.submit(cmd)
+    executor.shutdown()
+    executor._thread.join(timeout=2)
+    return reports
+
+def test_commands_run_in_order():
+    ran = []
+    def handler(cmd):
+        ran.append(cmd)
+        return 'did ' + cmd
+    reports = run(handler, ['a', 'b', 'c'])
+    assert ran == ['a', 'b', 'c']
+    assert reports == [('a', 'Running: a'), ('a', 'did a'),
+                       ('b', 'Running: b'), ('b', 'did b'),
+                       ('c', 'Running: c'), ('c', 'did c')]
+
+def test_errors_are_reported():
+    def handler(cmd):
+        raise ValueError('bad')
+    assert run(handler, ['x']) == [('x', 'Running: x'), ('x', 'x: bad')]
+
+def test_slow_command_times_out():
+    release = Event()
+    ran = []
+    def handler(cmd):
+        if cmd == 'slow':
+            release.wait(2)
+        ran.append(cmd)
+    start = time.time()
+    reports = run(handler, ['slow', 'fast'], timeout=.1)
+    release.set()
+    assert ('slow', 'Timed out: slow') in reports
+    assert ('fast', None) in reports
+    assert time.time() - start < 1
@@ -0,0 +1,49 @@
+import pytest
+from blessedblocks.block import Grid
+from blessedblocks.blocks import BareBlock, FramedBlock
+from blessedblocks.backends import RecordingBackend
+from blessedblocks.runner import Runner
+
+class CountingBlock(BareBlock):
+    displays = 0
+    def display(self, width, height, x, y, term=None):
+        self.displays += 1
+        return super().display(width, height, x, y, term)
+
+def nested():
+    inner = CountingBlock(text='inner')
+    framed = FramedBlock(inner, no_borders=True)
+    outer = BareBlock(grid=Grid([1, 2], {1: framed, 2: CountingBlock(text='other')}))
+    return inner, framed, outer
+
+def test_nested_blocks_attached():
+    inner, framed, outer = nested()
+    r = Runner(Grid([1], {1: outer}), backend=RecordingBackend(20, 4))
+    assert inner.dirty_event_q is r.rebuild_plot_q
+    assert (outer.parent, outer.path) == (None, (1,))
+    assert (framed.parent, framed.path) == (outer, (1, 1))
+    assert (inner.parent, inner.path) == (framed, (1, 1, 'block'))
+
+def test_change_marks_ancestors():
+    inner, framed, outer = nested()
+    r = Runner(Grid([1], {1: outer}), backend=RecordingBackend(20, 4))
+    for block in (inner, framed, outer):
+        block._dirty = False
+    while not r.rebuild_plot_q.empty():
+        r.rebuild_plot_q.get()
+    inner.text = 'changed'
+    assert inner._dirty and framed._dirty and outer._dirty
+    assert r.rebuild_plot_q.qsize() == 1
+
+def test_clean_blocks_not_displayed_again():
+    changing, still = CountingBlock(text='a'), CountingBlock(text='b')
+    r = Runner(Grid([1, 2], {1: changing, 2: still}), backend=RecordingBackend(20, 2))
+    r.draw()
+    r.draw()
+    assert (changing.displays, still.displays) == (1, 1)
+    changing.text = 'c'
+    r.draw()
+    assert (changing.displays, still.displays) == (2, 1)
+    still.mark_dirty()
+    r.draw()
+    assert still.displays == 2
@@ -0,0 +1,68 @@
+import pytest
+from blessedblocks.encoder import Encoder, Style, NORMAL, runs
+from blessed import Terminal
+
+term = Terminal(kind='xterm-256color', force_styling=True)
+RED, GREEN, NORM, EL = term.red, term.green, term.normal, term.clear_eol
+
+def frame(encoder, segments, width=20, height=5):
+    encoder.begin_frame(width, height)
+    for segment in segments:
+        encoder.segment(*segment)
+    return encoder.end_frame()
+
+def encoder():
+    e = Encoder(term)
+    frame(e, [])  # get the initial clear out of the way
+    return e
+
+def test_runs():
+    assert runs('{t.red}a{{b{t.red}c{t.normal}}}') == ((Style('red', None, frozenset(), ()), 'a{bc'),
+                                                      (NORMAL, '}'))
+
+def test_first_frame_clears():
+    e = Encoder(term)
+    assert frame(e, [(0, 0, 'ab')]) == NORM + term.clear + 'ab'
+
+def test_redundant_sequences_dropped():
+    out = frame(encoder(), [(0, 0, '{t.red}ab{t.red}c{t.green}{t.red}d{t.normal}')])
+    assert out == RED + 'abcd' + NORM
+
+def test_style_carries_across_segments():
+    out = frame(encoder(), [(0, 0, '{t.red}ab'), (2, 0, '{t.red}cd')])
+    assert out == RED + 'abcd' + NORM
+
+def test_segments_start_normal():
+    out = frame(encoder(), [(0, 0, '{t.red}ab'), (2, 0, 'cd')])
+    assert out == RED + 'ab' + NORM + 'cd'
+
+def test_cursor_moves():
+    out = frame(encoder(), [(0, 0, 'ab'), (0, 1, 'cd'), (5, 1, 'ef'), (3, 3, 'gh')])
+    assert out == 'ab\r\ncd' + term.move_x(5) + 'ef' + term.move(3, 3) + 'gh'
+
+def test_unchanged_segments_skipped():
+    e = encoder()
+    frame(e, [(0, 0, 'ab'), (0, 1, 'cd')])
+    assert frame(e, [(0, 0, 'ab'), (0, 1, 'ce')]) == '\rce'
+
+def test_erase_to_end_of_line():
+    out = frame(encoder(), [(10, 0, 'ab' + ' ' * 8)])
+    assert out == term.move_x(10) + 'ab' + EL
+
+def test_no_erase_on_background():
+    out = frame(encoder(), [(10, 0, '{t.on_red}ab' + ' ' * 8)])
+    assert out == term.move_x(10) + term.on_red + 'ab' + ' ' * 8 + NORM
+
+def test_erase_and_skip_blanks():
+    out = frame(encoder(), [(0, 0, 'a' + ' ' * 12 + 'b')])
+    assert out == 'a' + term.ech(12) + term.cuf(12) + 'b'
+
+def test_hidden_columns():
+    e = encoder()
+    out = frame(e, [(0, 0, '{t.red}ab{t.green}c界d')], width=8)
+    out = frame(e, [(0, 0, '{t.red}ab{t.green}c界d')], width=8)
+    assert out == ''
+    hidden = [(1, 2), (4, 5)]  # b, and the right half of 界
+    e.invalidate()
+    out = frame(e, [(0, 0, '{t.red}ab{t.green}c界d', hidden)], width=8)
+    assert out == NORM + term.clear + RED + 'a' + term.move_x(2) + GREEN + 'c ' + term.move_x(5) + 'd' + NORM
@@ -0,0 +1,64 @@
+import pytest
+from time import sleep
+from blessedblocks.fileview import FileViewBlock
+
+@pytest.fixture
+def view(tmp_path):
+    path = tmp_path / 'big'
+    path.write_text(''.join('row {{{}}}\n'.format(i) for i in range(1000)))
+    view = FileViewBlock(str(path), chunk_size=100, checkpoint_rows=16)
+    assert view.wait_indexed(5)
+    yield view
+    view.close()
+
+def test_rows_in_view(view):
+    assert view.num_rows == 1000
+    assert view.display(8, 2, 0, 0) == ['row {{0}} ', 'row {{1}} ']
+    view.top = 998
+    assert view.display(10, 3, 0, 0) == ['row {{998}} ', 'row {{999}} ', ' ' * 10]
+
+def test_scrolling_commands(view):
+    view.display(10, 10, 0, 0)
+    view.handler('f')
+    view.handler('j')
+    assert view.top == 10
+    assert view.handler('k') == 'big: 10/1000'
+    view.handler('G')
+    assert view.display(10, 1, 0, 0) == ['row {{999}} ']
+    view.handler('g')
+    assert view.top == 0
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty'
+    path.write_text('')
+    view = FileViewBlock(str(path))
+    assert view.wait_indexed(1)
+    assert view.num_rows == 0
+    assert view.display(3, 1, 0, 0) == ['   ']
+    view.close()
+
+def test_sparse_index(view):
+    assert len(view._checkpoints) == 1000 // 16 + 1
+    view.top = 517
+    assert view.display(10, 2, 0, 0) == ['row {{517}} ', 'row {{518}} ']
+
+def test_indexes_only_as_far_as_scrolled(tmp_path):
+    path = tmp_path / 'big'
+    path.write_text(''.join('row {}\n'.format(i) for i in range(10000)))
+    view = FileViewBlock(str(path), chunk_size=100, checkpoint_rows=10)
+    for _ in range(100):
+        if view.num_rows > 10:
+            break
+        sleep(.01)
+    sleep(.05)
+    assert not view.indexed
+    assert view._indexed < view.size
+    assert view.display(8, 1, 0, 0) == ['row 0   ']
+    view.top = 5000  # past what's indexed, until the indexer catches up
+    for _ in range(500):
+        if view.num_rows > 5001:
+            break
+        sleep(.01)
+    assert view.display(8, 1, 0, 0) == ['row 5000']
+    assert not view.indexed
+    view.close()
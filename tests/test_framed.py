@@ -0,0 +1,72 @@
+import pytest
+from blessedblocks.block import Grid, SizePref
+from blessedblocks.blocks import BareBlock, FramedBlock
+from blessedblocks.runner import Runner
+from blessed import Terminal
+
+term = Terminal()
+def test_frame_around_text():
+    fb = FramedBlock(BareBlock(), text='abc', top_border='-', bottom_border='=',
+                     left_border='|', right_border='|', title='T', title_sep='~')
+    out = fb.display(7, 6, 0, 0)
+    print('\n' + '\n'.join(out).format(t=term))
+    assert out == ['|{t.normal}-----|',
+                   '|  {t.normal}T  |',
+                   '|{t.normal}~~~~~|',
+                   '|{t.normal}abc  |',
+                   '|{t.normal}     {t.normal}|',
+                   '|{t.normal}=====|']
+
+def test_no_borders():
+    fb = FramedBlock(BareBlock(), text='abc', no_borders=True, title='T')
+    out = fb.display(5, 3, 0, 0)
+    print('\n' + '\n'.join(out).format(t=term))
+    assert out == ['  {t.normal}T  ',
+                   '{t.normal}abc  ',
+                   '{t.normal}     {t.normal}']
+
+def test_text_rows_max():
+    fb = FramedBlock(BareBlock(h_sizepref=SizePref(hard_min=0, hard_max='text')),
+                     text='abc', left_border=None, right_border=None)
+    out = fb.display(3, 6, 0, 0)
+    assert out == ['{t.normal}···',
+                   '   ',
+                   '{t.normal}abc{t.normal}',
+                   '{t.normal}···',
+                   '   ',
+                   '   ']
+
+def test_border_change_clears_cache():
+    fb = FramedBlock(BareBlock(), text='abc', left_border=None, right_border=None)
+    assert fb.display(3, 3, 0, 0)[0] == '{t.normal}···'
+    fb.top_border = '{t.red}+'
+    assert fb.display(3, 3, 0, 0)[0] == '{t.red}+++{t.normal}'
+
+def test_plot_sizeprefs():
+    fb = FramedBlock(BareBlock(h_sizepref=SizePref(hard_min=2, hard_max=4)),
+                     title='T', title_sep='-')
+    r = Runner(Grid([1], {1: fb}))
+    plot = r._root_plot.subplots[0]
+    assert plot.block is fb
+    assert not plot.subplots
+    assert plot.w_sizepref == SizePref(hard_min=[3], hard_max=[float('inf')])
+    assert plot.h_sizepref == SizePref(hard_min=[6], hard_max=[8])
+
+def test_frame_around_grid():
+    inner = BareBlock(grid=Grid([(1, 2)], {1: BareBlock(text='a'), 2: BareBlock(text='b')}))
+    fb = FramedBlock(inner, title='T')
+    r = Runner(Grid([1], {1: fb}))
+    plot = r._root_plot.subplots[0]
+    assert plot.block is fb
+    assert len(plot.subplots) == 1
+    assert fb.inner_rect(0, 0, 10, 10) == (1, 2, 8, 7)
+
+def test_settings_of_framed_block():
+    inner = BareBlock(text='a')
+    fb = FramedBlock(inner)
+    assert not fb.volatile
+    inner.volatile = True
+    assert fb.volatile
+    gridded = BareBlock(grid=Grid([1], {1: BareBlock()}))
+    gridded.volatile = True  # the Runner displays it, and sees that itself
+    assert not FramedBlock(gridded).volatile
@@ -0,0 +1,88 @@
+import pytest
+import os
+import time
+from threading import Thread
+from blessed.keyboard import Keystroke
+from blessedblocks.backends import NullBackend
+from blessedblocks.block import Grid
+from blessedblocks.blocks import InputBlock
+from blessedblocks.keyboard import KeyReader
+from blessedblocks.runner import Runner
+
+class PipeTerm(object):
+    # Just enough of a Terminal to read keys written to a pipe
+    def __init__(self):
+        self._keyboard_fd, self.w = os.pipe()
+        os.set_blocking(self._keyboard_fd, False)
+    def inkey(self, timeout=None):
+        try:
+            c = os.read(self._keyboard_fd, 1).decode()
+        except BlockingIOError:
+            c = ''
+        return Keystroke(c)
+
+def test_read_drains_burst():
+    term = PipeTerm()
+    keys = KeyReader(term)
+    os.write(term.w, b'hello')
+    assert [str(k) for k in keys.read(timeout=1)] == list('hello')
+    assert keys.read(timeout=0) == []
+
+def test_wake_interrupts_read():
+    keys = KeyReader(PipeTerm())
+    result = []
+    reader = Thread(target=lambda: result.append(keys.read()))
+    start = time.time()
+    reader.start()
+    keys.wake()
+    reader.join(timeout=1)
+    assert result == [[]]
+    assert time.time() - start < .5
+
+class CountingInputBlock(InputBlock):
+    sets = 0
+    def _set_text(self, val):
+        self.sets += 1
+        InputBlock.text.fset(self, val)
+    text = property(InputBlock.text.fget, _set_text)
+
+def test_burst_is_one_update():
+    input_block = CountingInputBlock()
+    ran = []
+    r = Runner(Grid([1], {1: input_block}, cmds={'go'}, handler=ran.append),
+               backend=NullBackend())
+    input_block.text = ''
+    input_block.sets = 0
+    enter = Keystroke('\n', code=343, name='KEY_ENTER')
+    r._handle_keys(input_block, [Keystroke(c) for c in 'go'] + [enter] +
+                   [Keystroke(c) for c in 'xy'])
+    assert input_block.text == 'xy'
+    assert input_block.sets == 1
+    r._commands.shutdown()
+    r._commands._thread.join(timeout=1)
+    assert ran == ['go']
+
+def test_fast_command_keeps_its_status():
+    input_block = InputBlock(name='input')
+    r = Runner(Grid([1], {1: input_block}, cmds={'go'}, handler=lambda cmd: 'done'),
+               backend=NullBackend())
+    submit = r._commands.submit
+    def submit_and_finish(cmd):  # the command is done before the burst is
+        submit(cmd)
+        r._commands.shutdown()
+        r._commands._thread.join(timeout=1)
+    r._commands.submit = submit_and_finish
+    input_block.text = ''
+    enter = Keystroke('\n', code=343, name='KEY_ENTER')
+    r._handle_keys(input_block, [Keystroke(c) for c in 'go'] + [enter, Keystroke('x')])
+    assert input_block.status == 'done'
+    assert input_block.text == 'x'
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='counts fds in /proc')
+def test_stop_closes_wake_pipe():
+    before = len(os.listdir('/proc/self/fd'))
+    r = Runner(Grid([1], {1: InputBlock()}, cmds={'go'}, handler=lambda cmd: None),
+               backend=NullBackend())
+    r.start()
+    r.stop()
+    assert len(os.listdir('/proc/self/fd')) == before
@@ -0,0 +1,50 @@
+import pytest
+import logging
+from blessedblocks.log import LoggingBlock
+
+def record(msg, level=logging.INFO):
+    return logging.LogRecord('test', level, __file__, 1, msg, None, None)
+
+def test_ring_buffer_drops_oldest():
+    block = LoggingBlock(capacity=3, fmt='%(message)s')
+    for i in range(5):
+        block.add(record('m{}'.format(i)))
+    assert len(block) == 3
+    assert block.dropped == 2
+    assert block.counts['INFO'] == 5
+    assert block.display(4, 3, 0, 0) == ['m2  ', 'm3  ', 'm4  ']
+    block.clear()
+    assert (len(block), block.dropped, block.counts) == (0, 0, {})
+
+def test_newest_at_bottom_colored_by_level():
+    block = LoggingBlock(fmt='%(message)s')
+    block.add(record('ok'))
+    block.add(record('bad {x}', logging.ERROR))
+    rows = block.display(8, 3, 0, 0)
+    assert rows == [' ' * 8, 'ok      ', '{t.red}bad {{x}} {t.normal}']
+
+def test_only_shown_records_formatted():
+    block = LoggingBlock(fmt='%(message)s')
+    for i in range(10):
+        block.add(record('m{}'.format(i)))
+    block.display(4, 2, 0, 0)
+    assert [rows is not None for _, rows in block._records] == [False] * 8 + [True] * 2
+
+def test_burst_marks_dirty_once(monkeypatch):
+    block = LoggingBlock()
+    calls = []
+    monkeypatch.setattr(block, 'mark_dirty', lambda: calls.append(1))
+    for i in range(100):
+        block.add(record('m{}'.format(i)))
+    assert len(calls) == 1
+    block.display(20, 4, 0, 0)
+    block.add(record('again'))
+    assert len(calls) == 2
+
+def test_install_uninstall():
+    block = LoggingBlock(fmt='%(message)s').install('blessedblocks.test_log')
+    logger = logging.getLogger('blessedblocks.test_log')
+    logger.warning('seen')
+    block.uninstall()
+    logger.warning('not seen')
+    assert block.display(8, 1, 0, 0) == ['{t.yellow}seen    {t.normal}']
@@ -0,0 +1,54 @@
+import pytest
+from blessed.keyboard import Keystroke
+from blessedblocks.block import Grid
+from blessedblocks.blocks import BareBlock, FramedBlock
+from blessedblocks.backends import NullBackend
+from blessedblocks.mouse import MouseEvent, SpatialIndex, mouse_events, parse
+from blessedblocks.runner import Runner
+
+def test_parse():
+    assert parse('\x1b[<0;5;3M') == MouseEvent('left', 'press', 4, 2, 4, 2, False, False, False)
+    assert parse('\x1b[<18;1;1m') == MouseEvent('right', 'release', 0, 0, 0, 0, False, False, True)
+    assert parse('\x1b[<65;2;2M').button == 'scroll_down'
+    assert parse('\x1b[<35;2;2M') is None  # motion
+
+def test_mouse_events_among_keys():
+    report = '\x1b[<64;3;4M'
+    keys = [Keystroke('a'), Keystroke(report), Keystroke('b')]
+    keys += [Keystroke(c) for c in '\x1b[<0;1;1M']  # a report read a character at a time
+    keys += [Keystroke(c) for c in '\x1b[A']
+    events, others = mouse_events(keys)
+    assert [(e.button, e.x, e.y) for e in events] == [('scroll_up', 2, 3), ('left', 0, 0)]
+    assert ''.join(others) == 'ab\x1b[A'
+
+def test_spatial_index():
+    index = SpatialIndex([('a', 0, 0, 10, 5), ('b', 10, 0, 5, 5), ('c', 0, 5, 15, 2),
+                          ('d', 1, 1, 8, 3)])  # inside a
+    assert [index.block_at(x, 0) for x in (0, 9, 10, 14, 15)] == ['a', 'a', 'b', 'b', None]
+    assert [index.block_at(x, 2) for x in (0, 1, 8, 9)] == ['a', 'd', 'd', 'a']
+    assert index.block_at(3, 6) == 'c'
+    assert index.block_at(3, 7) is None and index.block_at(-1, 0) is None
+
+class ClickBlock(BareBlock):
+    def __init__(self, handle=True, **kwargs):
+        super().__init__(**kwargs)
+        self.handle = handle
+        self.events = []
+    def on_mouse(self, event):
+        self.events.append(event)
+        return self.handle
+
+def test_dispatch():
+    inner = ClickBlock(handle=False, text='inner')
+    framed = FramedBlock(inner)
+    outer = ClickBlock(grid=Grid([1], {1: framed}))
+    left = ClickBlock(text='left')
+    r = Runner(Grid([(1, 2)], {1: left, 2: outer}), backend=NullBackend(20, 10), mouse=True)
+    r.draw()
+    assert r.block_at(0, 0) == (left, (1,))
+    assert r.block_at(2, 7) == (inner, (2, 1, 'block'))
+    assert r.block_at(0, 5)[0] is framed  # the border
+    click = parse('\x1b[<0;3;8M')  # 2, 7
+    assert r._handle_mouse(click) is outer  # neither the inner nor the framed block handle it
+    assert inner.events[0][4:6] == (1, 0)
+    assert outer.events[0][4:6] == (2, 2)
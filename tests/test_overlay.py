@@ -0,0 +1,60 @@
+import pytest
+from time import sleep
+from blessedblocks.block import Grid
+from blessedblocks.blocks import BareBlock
+from blessedblocks.backends import RecordingBackend
+from blessedblocks.overlay import Overlay
+from blessedblocks.runner import Runner
+
+def test_rect():
+    overlay = Overlay(BareBlock(), 4, 2)
+    assert overlay.rect(10, 6) == (3, 2, 4, 2)
+    assert Overlay(BareBlock(), 20, 2, x=5, y=5).rect(10, 6) == (0, 4, 10, 2)
+
+def test_only_damage_repainted():
+    block = BareBlock(text='abcdefghij\nklmnopqrst\nuvwxyz0123')
+    backend = RecordingBackend(10, 3)
+    r = Runner(Grid([1], {1: block}), backend=backend)
+    r.draw()
+    overlay = r.show_overlay(Overlay(BareBlock(text='XY'), 2, 1, x=4, y=1))
+    r.draw()
+    block.text = 'abcdefghij\nKLMNOPQRST\nuvwxyz0123'
+    r.draw()
+    overlay.move(6, 1)
+    r.draw()
+    r.hide_overlay(overlay)
+    r.draw()
+    frames = [frame for _, frame in backend.recorded]
+    assert frames[1:] == ['\x1b[2Hklmn\x1b[7Gqrst\x1b[2;5HXY',  # only the row under it
+                          '\rKLMN\x1b[7GQRST',  # the overlay isn't written over
+                          '\x1b[2HKLMNOP\x1b[9GST\x1b[2;7HXY',
+                          '\rKLMNOPQRST']
+
+def test_stacking_and_clicks():
+    block = BareBlock(text='.' * 10)
+    r = Runner(Grid([1], {1: block}), backend=RecordingBackend(10, 1))
+    top, bottom = BareBlock(text='T'), BareBlock(text='BB')
+    r.show_overlay(Overlay(top, 1, 1, x=4, y=0, z=1))
+    r.show_overlay(Overlay(bottom, 2, 1, x=3, y=0))
+    frame = r.render_plot(r._root_plot, 0, 0, 10, 1)
+    assert frame.endswith('\x1b[6G.....\x1b[1;4HBT')  # T is above B
+    assert [r.block_at(x, 0)[0] for x in (2, 3, 4, 5)] == [block, bottom, top, block]
+
+def test_duration():
+    r = Runner(Grid([1], {1: BareBlock()}), backend=RecordingBackend(10, 1))
+    overlay = r.show_overlay(Overlay(BareBlock(text='!'), 1, 1), duration=.01)
+    sleep(.2)
+    assert overlay not in r._overlays
+
+def test_show_again_restarts_duration():
+    r = Runner(Grid([1], {1: BareBlock()}), backend=RecordingBackend(10, 1))
+    overlay = r.show_overlay(Overlay(BareBlock(text='!'), 1, 1), duration=.1)
+    sleep(.06)
+    r.show_overlay(overlay, duration=.1)
+    sleep(.06)  # past when the first timer would have hidden it
+    assert overlay in r._overlays
+    sleep(.15)
+    assert overlay not in r._overlays
+    r.show_overlay(overlay, duration=5)
+    r.stop()
+    assert not r._overlay_timers
@@ -0,0 +1,30 @@
+import pytest
+from blessedblocks.pacing import FramePacer
+
+def test_fast_output_unpaced():
+    pacer = FramePacer()
+    assert pacer.delay() == 0
+    pacer.wrote(1000, 0)
+    assert pacer.interval == 0
+    assert pacer.delay() == 0
+
+def test_max_frame_rate():
+    pacer = FramePacer(max_frame_rate=10)
+    pacer.wrote(1000, 0)
+    assert pacer.interval == pytest.approx(.1)
+    assert 0 < pacer.delay() <= .1
+
+def test_slow_output_lowers_frame_rate():
+    pacer = FramePacer(duty=.5, smoothing=1)
+    pacer.wrote(10000, .2)
+    assert pacer.interval == pytest.approx(.4)
+    assert pacer.throughput == pytest.approx(50000)
+    pacer.wrote(10000, 0)  # caught up
+    assert pacer.interval == 0
+
+def test_max_interval():
+    pacer = FramePacer(smoothing=1, max_interval=1)
+    pacer.wrote(10000, 5)
+    assert pacer.interval == 1
+    assert pacer.frames == 1
+    assert pacer.bytes == 10000
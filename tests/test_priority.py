@@ -0,0 +1,84 @@
+import pytest
+from time import sleep
+from blessedblocks.block import Grid
+from blessedblocks.blocks import BareBlock, FramedBlock
+from blessedblocks.backends import NullBackend
+from blessedblocks.runner import Runner
+
+class CountingBlock(BareBlock):
+    delay = 0
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.shown = []
+    def display(self, width, height, x, y, term=None):
+        sleep(self.delay)
+        self.shown.append(self.text)
+        return super().display(width, height, x, y, term)
+
+def test_max_refresh_rate():
+    block = CountingBlock(text='0')
+    block.max_refresh_rate = 10
+    r = Runner(Grid([1], {1: block}), backend=NullBackend(10, 1))
+    r.draw()
+    for i in range(1, 5):
+        block.text = str(i)
+        r.draw()
+    assert block.shown == ['0']  # held back
+    assert 0 < r._timeout() <= .1
+    sleep(r._timeout())
+    r.draw()
+    assert block.shown == ['0', '4']  # the latest
+    assert r._timeout() == .5
+
+def test_frame_budget():
+    slow, other, typing = CountingBlock(text='a'), CountingBlock(text='b'), CountingBlock(text='c')
+    slow.delay = .02
+    typing.priority = 1
+    r = Runner(Grid([1, 2, 3], {1: slow, 2: other, 3: typing}), backend=NullBackend(30, 1),
+               frame_budget=.01)
+    r.draw()  # blocks shown for the first time are never held back
+    for block in (slow, other, typing):
+        block.text += '2'
+    typing.delay = .02  # over budget before the others even start
+    r.draw()
+    assert (slow.shown, other.shown, typing.shown) == (['a'], ['b'], ['c', 'c2'])
+    assert 0 < r._timeout() <= .01  # the next frame shows them, after a rest
+    typing.delay = 0
+    r.draw()
+    assert (slow.shown[-1], typing.shown[-1]) == ('a2', 'c2')
+
+def test_held_back_block_not_starved():
+    noisy, quiet = CountingBlock(text='n'), CountingBlock(text='q')
+    r = Runner(Grid([1, 2], {1: noisy, 2: quiet}), backend=NullBackend(20, 1),
+               frame_budget=.01)
+    r.draw()
+    noisy.delay = .02  # over budget every frame
+    quiet.text = 'q2'
+    for i in range(3):
+        noisy.text = 'n{}'.format(i)
+        r.draw()
+    assert quiet.shown == ['q', 'q2']
+    assert len(noisy.shown) == 4  # and the noisy block is still shown too
+
+def test_framed_blocks():
+    slow, typing = CountingBlock(), CountingBlock()
+    r = Runner(Grid([1, 2], {1: FramedBlock(slow), 2: FramedBlock(typing)}),
+               backend=NullBackend(30, 4), frame_budget=.01)
+    slow.text, typing.text = 'a', 'c'  # after framing, which sets the text
+    r.draw()
+    slow.delay = typing.delay = .02
+    typing.priority = 10
+    slow.text, typing.text = 'a2', 'c2'
+    r.draw()
+    assert (slow.shown[-1], typing.shown[-1]) == ('a', 'c2')  # typing went first
+
+def test_framed_max_refresh_rate():
+    block = CountingBlock()
+    block.max_refresh_rate = 1
+    r = Runner(Grid([1], {1: FramedBlock(block)}), backend=NullBackend(10, 4))
+    block.text = '0'
+    r.draw()
+    for i in range(1, 4):
+        block.text = str(i)
+        r.draw()
+    assert block.shown[-1] == '0'
@@ -0,0 +1,60 @@
+import pytest
+import sys
+import time
+from blessedblocks.process import CommandBlock
+from blessedblocks.scheduler import Scheduler
+
+def wait_for(block, text, timeout=3):
+    end = time.time() + timeout
+    while time.time() < end:
+        block.poll()
+        if block.text == text:
+            return True
+        time.sleep(.01)
+    return False
+
+def python(code):
+    return [sys.executable, '-c', code]
+
+def test_streamed_rows_show_the_latest():
+    block = CommandBlock(python('for i in range(5): print(i)'))
+    block.poll()
+    assert wait_for(block, '0\n1\n2\n3\n4')
+    while block.returncode is None:
+        block.poll()
+    assert block.returncode == 0
+    assert block.text_rows(2) == ['3', '4']
+
+def test_only_complete_frames_are_shown():
+    code = ('import sys, time\n'
+            'for i in range(2): print("frame", i); print("row", i)\n'
+            'sys.stdout.flush(); print("frame", 2); sys.stdout.flush(); time.sleep(5)')
+    block = CommandBlock(python(code), frame_start='^frame ')
+    block.poll()
+    assert wait_for(block, 'frame 1\nrow 1')
+    block.stop()
+
+def test_screen_clears_start_frames():
+    block = CommandBlock(python('print("a\\x1b[H\\x1b[2Jb\\x0cc")'))
+    block.poll()
+    assert wait_for(block, 'c')
+
+def test_refresh_reruns_the_command():
+    scheduler = Scheduler()
+    class FakeRunner(object):
+        schedule = scheduler.schedule
+    block = CommandBlock(python('import time; print(time.monotonic())'), refresh=.05,
+                         poll_interval=.01)
+    block.start(FakeRunner())
+    time.sleep(.3)
+    first = block.text
+    time.sleep(.2)
+    assert block.text and block.text != first
+    scheduler.shutdown()
+    assert block._task.cancelled and block._proc is None
+
+def test_colors_become_tags():
+    block = CommandBlock(python('print("\\x1b[31mred\\nstill\\x1b[0m plain")'))
+    assert wait_for(block, '{t.red}red\n{t.red}still{t.normal} plain')
+    block = CommandBlock(python('print("\\x1b[31mred\\x1b[0m")'), ansi=False)
+    assert wait_for(block, 'red')
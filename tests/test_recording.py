@@ -0,0 +1,63 @@
+import pytest
+from time import monotonic
+from blessedblocks.block import Grid
+from blessedblocks.blocks import BareBlock
+from blessedblocks.backends import RecordingBackend
+from blessedblocks.recording import CastBackend, read_cast, replay
+from blessedblocks.runner import Runner
+
+def record(path):
+    block = BareBlock(text='hi')
+    local = RecordingBackend(10, 2)
+    backend = CastBackend(str(path), local)
+    r = Runner(Grid([1], {1: block}), backend=backend)
+    r.draw()
+    r.draw()  # nothing changed, nothing recorded
+    block.text = 'ho'
+    r.draw()
+    local.resize(12, 2)
+    r.draw()
+    r.stop()
+    return [frame for _, frame in local.recorded if frame]
+
+@pytest.mark.parametrize('name', ['session.cast', 'session.cast.gz'])
+def test_record(tmp_path, name):
+    frames = record(tmp_path / name)
+    header, events = read_cast(str(tmp_path / name))
+    assert (header['version'], header['width'], header['height']) == (2, 10, 2)
+    events = list(events)
+    assert [kind for _, kind, _ in events] == ['o', 'o', 'r', 'o']
+    assert [data for _, kind, data in events if kind == 'o'] == frames
+    assert events[2][2] == '12x2'
+    assert [seconds for seconds, _, _ in events] == sorted(seconds for seconds, _, _ in events)
+
+def test_replay(tmp_path):
+    frames = record(tmp_path / 'session.cast')
+    backend = RecordingBackend(10, 2)
+    assert replay(str(tmp_path / 'session.cast'), backend, speed=0) == \
+        (3, sum(len(f.encode('utf-8')) for f in frames))
+    assert [frame for _, frame in backend.recorded] == frames
+    assert backend.width == 12
+
+def test_replay_timing(tmp_path):
+    path = tmp_path / 'idle.cast'
+    path.write_text('{"version": 2, "width": 4, "height": 1}\n'
+                    '[0.0, "o", "a"]\n[0.1, "o", "b"]\n[5.0, "o", "c"]\n[5.06, "o", "d"]\n')
+    backend = RecordingBackend(4, 1)
+    replay(str(path), backend, speed=2, max_idle=.1)
+    times = [t - backend.recorded[0][0] for t, _ in backend.recorded]
+    assert times[1] == pytest.approx(.05, abs=.03)
+    assert times[2] == pytest.approx(.1, abs=.03)  # the idle time is cut to .1s, at double speed
+    assert times[3] == pytest.approx(.13, abs=.03)
+    backend = RecordingBackend(4, 1)
+    start = monotonic()
+    replay(str(path), backend, start=5.0)
+    assert [frame for _, frame in backend.recorded] == ['a', 'b', 'c', 'd']
+    assert monotonic() - start == pytest.approx(.06, abs=.03)
+
+def test_replay_resizes_to_recording(tmp_path):
+    path = tmp_path / 'small.cast'
+    path.write_text('{"version": 2, "width": 4, "height": 1}\n[0.0, "o", "a"]\n')
+    backend = RecordingBackend(30, 5)
+    replay(str(path), backend, speed=0)
+    assert (backend.width, backend.height) == (4, 1)
@@ -0,0 +1,46 @@
+import pytest
+import time
+from threading import Event
+from blessedblocks.scheduler import Scheduler
+
+def test_tasks_repeat_until_shutdown():
+    scheduler = Scheduler()
+    ran = []
+    task = scheduler.schedule(ran.append, .02, 'tick')
+    time.sleep(.15)
+    scheduler.shutdown()
+    count = len(ran)
+    assert count >= 3
+    assert task.cancelled
+    time.sleep(.05)
+    assert len(ran) == count
+
+def test_busy_task_skips_ticks():
+    scheduler = Scheduler()
+    release = Event()
+    task = scheduler.schedule(release.wait, .01, 1)
+    time.sleep(.1)
+    release.set()
+    scheduler.shutdown()
+    assert task.runs <= 1
+    assert task.skipped >= 3
+
+def test_threads_stay_bounded():
+    scheduler = Scheduler(workers=2)
+    tasks = [scheduler.schedule(lambda: None, .01) for _ in range(50)]
+    time.sleep(.1)
+    scheduler.shutdown()
+    assert len(scheduler._pool._threads) <= 2
+    assert all(t.runs for t in tasks)
+
+def test_cancel():
+    scheduler = Scheduler(jitter=0)
+    ran = []
+    task = scheduler.schedule(ran.append, .05, 1)
+    time.sleep(.02)
+    task.cancel()
+    time.sleep(.1)
+    scheduler.shutdown()
+    assert ran == [1]
+    with pytest.raises(RuntimeError):
+        scheduler.schedule(ran.append, 1, 2)
@@ -0,0 +1,68 @@
+import pytest
+import multiprocessing
+import pickle
+import struct
+from array import array
+from blessedblocks.blocks import BareBlock
+from blessedblocks.shared import SharedText, SharedSeries, SharedBridge
+
+def fill(series, n):
+    series.write([float(i) for i in range(n)])
+
+@pytest.fixture
+def segments():
+    made = []
+    def make(cls, capacity):
+        segment = cls(capacity)
+        made.append(segment)
+        return segment
+    yield make
+    for segment in made:
+        segment.close()
+        segment.unlink()
+
+def test_text(segments):
+    text = segments(SharedText, 8)
+    assert text.read() == (0, '')
+    text.write('héllo wörld')  # cut off at 8 bytes, in the middle of the ö
+    seq, value = text.read()
+    assert (seq, value) == (2, 'héllo w')
+    assert text.read(seq) is None
+
+def test_mid_write_not_read(segments):
+    text = segments(SharedText, 8)
+    text.write('a')
+    struct.pack_into('<Q', text._shm.buf, 0, 3)  # as if a write were under way
+    assert text.read() is None
+
+def test_series_from_another_process(segments):
+    series = segments(SharedSeries, 4)
+    attached = pickle.loads(pickle.dumps(series))
+    assert (attached.name, attached.capacity) == (series.name, 4)
+    attached.close()
+    worker = multiprocessing.get_context('spawn').Process(target=fill, args=(series, 6))
+    worker.start()
+    worker.join(10)
+    seq, values = series.read()
+    assert list(values) == [2.0, 3.0, 4.0, 5.0]
+
+def test_bridge(segments):
+    text, series = segments(SharedText, 64), segments(SharedSeries, 4)
+    block, got = BareBlock(), []
+    bridge = SharedBridge()
+    bridge.bind(text, block)
+    bridge.bind(series, got.append)
+    text.write('{t.red}hi')
+    assert bridge.poll() == 2
+    assert block.text == '{t.red}hi'
+    assert bridge.poll() == 0
+    series.write([1.5])
+    assert bridge.poll() == 1
+    assert [list(values) for values in got] == [[], [1.5]]
+
+def test_series_converts_other_buffers(segments):
+    series = segments(SharedSeries, 4)
+    series.write(array('i', [1, 2, 3]))
+    assert list(series.read()[1]) == [1.0, 2.0, 3.0]
+    series.write(memoryview(array('d', [1, 2, 3, 4]))[::2])  # not contiguous
+    assert list(series.read()[1]) == [1.0, 3.0]
@@ -0,0 +1,41 @@
+import pytest
+from queue import Queue
+from blessedblocks.sparkline import SparklineBlock
+
+def test_ring_buffer_keeps_the_newest():
+    s = SparklineBlock(capacity=4)
+    s.extend(range(6))
+    assert list(s.values()) == [2, 3, 4, 5]
+    assert len(s) == 4
+
+def test_columns_are_bucketed():
+    s = SparklineBlock(capacity=100, agg='max')
+    s.extend(range(10))
+    assert s.columns(20) == list(range(10))
+    assert s.columns(4) == [0, 3, 6, 9]
+    s = SparklineBlock(capacity=100, agg='mean')
+    s.extend(range(10))
+    assert s.columns(5) == [.5, 2.5, 4.5, 6.5, 8.5]
+
+def test_display():
+    s = SparklineBlock(low=0, high=8, thresholds=[(6, '{t.red}')])
+    s.extend([0, 4, 8])
+    assert s.display(5, 1, 0, 0) == ['   ▄{t.red}█{t.normal}']
+    assert s.display(3, 2, 0, 0) == ['  {t.red}█{t.normal}', ' █{t.red}█{t.normal}']
+
+def test_non_finite_samples_blank():
+    s = SparklineBlock()
+    s.extend([0, float('nan'), 8, float('inf')])
+    assert s.display(4, 1, 0, 0) == ['  █ ']
+    s.extend([float('nan')] * 4)
+    assert s.display(2, 1, 0, 0) == ['█ ']  # a bucket of only NaN is blank
+    s = SparklineBlock()
+    s.push(float('nan'))
+    assert s.display(2, 1, 0, 0) == ['  ']
+
+def test_push_redraws():
+    s = SparklineBlock()
+    s.dirty_event_q = q = Queue()
+    s.push(1.5)
+    assert not q.empty()
+    assert s.display(2, 1, 0, 0) == [' █']
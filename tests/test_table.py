@@ -0,0 +1,42 @@
+import pytest
+from queue import Queue
+from blessedblocks.table import TableBlock
+
+def table():
+    return TableBlock(['Planet', 'R (km)'], [['Sun', 696000], ['Earth', 6371], ['Moon', 1737]])
+
+def test_display():
+    assert table().display(16, 5, 0, 0) == ['{t.bold}Planet  R (km)  {t.normal}',
+                                            '------  ------  ',
+                                            'Sun     696000  ',
+                                            'Earth     6371  ',
+                                            'Moon      1737  ']
+
+def test_widths_follow_cells():
+    t = table()
+    t.set_cell('Moon', 1, 12345678)
+    assert t.widths == [6, 8]
+    t.set_cell('Moon', 1, 1)
+    assert t.widths == [6, 6]
+    t.upsert_row(['Mars', 3390])
+    t.delete_row('Sun')
+    assert t.widths == [6, 6]
+    assert t.display(14, 5, 0, 0)[2:] == ['Earth     6371', 'Moon         1', 'Mars      3390']
+
+def test_only_rows_in_view_redraw():
+    t = table()
+    t.display(16, 3, 0, 0)  # room for just the Sun
+    t.dirty_event_q = q = Queue()
+    t.set_cell('Moon', 1, 1738)
+    assert q.empty()
+    t.set_cell('Moon', 1, 1234567)  # wider
+    assert not q.empty()
+    q.get()
+    t.set_cell('Sun', 1, 696001)
+    assert not q.empty()
+
+def test_rows_are_cached():
+    t = table()
+    first = t.display(16, 5, 0, 0)
+    t._rows[0][0] = 'XXX'  # not through set_cell, so not noticed
+    assert t.display(16, 5, 0, 0) == first
@@ -0,0 +1,47 @@
+import pytest
+import os
+from blessedblocks.tail import TailBlock
+
+def append(path, text):
+    with open(path, 'a') as f:
+        f.write(text)
+
+def test_reads_only_the_end(tmp_path):
+    path = str(tmp_path / 'log')
+    append(path, ''.join('row {}\n'.format(i) for i in range(10000)))
+    block = TailBlock(path, max_rows=3, chunk_size=64)
+    block.poll()
+    assert block.text == 'row 9997\nrow 9998\nrow 9999'
+    assert block.bytes_read < 200
+
+def test_appended_rows(tmp_path):
+    path = str(tmp_path / 'log')
+    append(path, 'a\n')
+    block = TailBlock(path)
+    block.poll()
+    append(path, 'b\nc')  # c isn't complete yet
+    block.poll()
+    assert block.text == 'a\nb'
+    append(path, 'c\n')
+    block.poll()
+    assert block.text == 'a\nb\ncc'
+    assert block.bytes_read == len('a\nb\ncc\n')
+    assert block.text_rows(2) == ['b', 'cc']
+
+def test_rotation_and_truncation(tmp_path):
+    path = str(tmp_path / 'log')
+    block = TailBlock(path)
+    block.poll()  # not there yet
+    assert not block.text
+    append(path, 'old\n')
+    block.poll()
+    append(path, 'last')
+    os.rename(path, path + '.1')
+    append(path, 'new\n')
+    block.poll()
+    assert block.text == 'old\nlast\nnew'
+    with open(path, 'w') as f:
+        f.write('x\n')
+    block.poll()
+    assert block.text == 'old\nlast\nnew\nx'
+    block.stop()
@@ -0,0 +1,38 @@
+import pytest
+from blessedblocks.backends import AnsiSequences
+from blessedblocks.blocks import BareBlock
+from blessedblocks.encoder import Encoder
+from blessedblocks.line import Line
+from blessedblocks.width import width, fit_index, pad
+
+def test_width():
+    assert width('abc') == 3
+    assert width('日本') == 4
+    assert width('é') == 1  # e and a combining acute accent
+    assert width('') == 0
+
+def test_fit_and_pad():
+    assert fit_index('日本語', 5) == (2, 4)  # the third doesn't fit in the last column
+    assert fit_index('abc', 2) == (2, 2)
+    assert pad('日本語', 5) == '日本 '
+    assert pad('日', 5, '>') == '   日'
+    assert pad('日', 5, '^') == ' 日  '
+
+def test_line_of_wide_characters():
+    line = Line('{t.red}日本語', 5, '<')
+    assert line.plain == '日本 '
+    assert line.display == '{t.red}日本 '
+
+def test_text_columns():
+    block = BareBlock(text='日本\nab')
+    assert block.num_text_cols == 4
+    assert block.text == '日本\nab  '
+
+def test_encoder_tracks_wide_characters():
+    encoder = Encoder(AnsiSequences())
+    encoder.begin_frame(10, 2)
+    encoder.end_frame()
+    encoder.begin_frame(10, 2)
+    encoder.segment(0, 0, '日本')
+    encoder.segment(4, 0, 'x')  # right after the wide characters, no move needed
+    assert encoder.end_frame() == '日本x'